@@ -1,4 +1,39 @@
 from .modules._DataProductFile import MaxRetriesException
+from .modules._JsonLinesExporter import JsonLinesExporter
+from .modules._PrometheusExporter import PrometheusExporter
+from .modules._RateLimiter import RateLimiter
+from .modules._Reporter import (
+    CallbackReporter,
+    LoggingReporter,
+    PrintReporter,
+    Reporter,
+    TqdmReporter,
+)
+from .modules._ResponseCache import ResponseCache
+from .modules._RetryPolicy import RetryPolicy
 from .onc import ONC
 
-__all__ = ["ONC", "MaxRetriesException"]
+__all__ = [
+    "ONC",
+    "AsyncONC",
+    "CallbackReporter",
+    "JsonLinesExporter",
+    "LoggingReporter",
+    "MaxRetriesException",
+    "PrometheusExporter",
+    "PrintReporter",
+    "RateLimiter",
+    "Reporter",
+    "ResponseCache",
+    "RetryPolicy",
+    "TqdmReporter",
+]
+
+
+def __getattr__(name: str):
+    # AsyncONC is imported on first use, so "import onc" doesn't load httpx
+    if name == "AsyncONC":
+        from .asynconc import AsyncONC
+
+        return AsyncONC
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,1294 @@
+import asyncio
+import os
+import re
+from collections.abc import Callable
+from contextlib import AsyncExitStack
+from pathlib import Path
+from time import time
+from warnings import warn
+
+import requests
+from onc.modules._DataProductFile import MaxRetriesException, _DataProductFile
+from onc.modules._JsonDecoder import _jsonDecoder
+from onc.modules._MultiPage import _MultiPage, _newColumns, _PageMerger
+from onc.modules._OncArchive import _OncArchive
+from onc.modules._OncDelivery import (
+    _narrowBounds,
+    _nextProbes,
+    _OncDelivery,
+    _retryDelay,
+)
+from onc.modules._OncDiscovery import _OncDiscovery
+from onc.modules._OncRealTime import _OncRealTime
+from onc.modules._PollLog import _PollLog
+from onc.modules._PollScheduler import _PollScheduler
+from onc.modules._RateLimiter import RateLimiter
+from onc.modules._Reporter import Reporter, _reporter
+from onc.modules._RequestEvents import _HttpxTrace, _requestEvent, _runHooks
+from onc.modules._RetryPolicy import RetryPolicy
+from onc.modules._util import (
+    _acceptEncoding,
+    _createErrorMessage,
+    _discardPartial,
+    _finishSave,
+    _formatDuration,
+    _formatSize,
+    _hasPartials,
+    _isSaved,
+    _PartFile,
+    _partialSize,
+    _rangeHeaders,
+    _startSave,
+)
+
+try:
+    import httpx
+except ImportError:  # httpx is an optional dependency
+    httpx = None
+
+
+class AsyncONC:
+    """
+    An asyncio client for the Oceans 3.0 API.
+
+    ``AsyncONC`` provides awaitable equivalents of the discovery, real-time, archive and delivery methods
+    of ``ONC``, with the same parameters and results. Requests share one pooled ``httpx.AsyncClient``,
+    so many calls can run concurrently on a single event loop, for example with ``asyncio.gather``.
+    Progress messages go to the reporter, as in ``ONC``. As concurrent calls interleave them, a ``"logging"``
+    or callable reporter is better suited than ``"print"`` to many concurrent calls.
+    The ``cache``, ``orderJournal`` and ``archiveManifest`` options of ``ONC`` are not supported.
+
+    It requires the optional dependency group ``async`` (``pip install onc[async]``).
+
+    Parameters
+    ----------
+    token : str | None, default None
+        The ONC API token, which could be retrieved at https://data.oceannetworks.ca/Profile once logged in.
+        If None, it reads the environment variable "ONC_TOKEN".
+    production : bool, default True
+        Whether the ONC Production server URL is used for service requests.
+    showInfo : bool, default False
+        Whether verbose script messages are displayed, such as request url and processing time information.
+    showWarning : bool, default True
+        Whether warning messages are displayed.
+    outPath : str | Path, default "output"
+        The directory that files are saved to (relative to the current directory) when downloading files.
+    timeout : int, default 60
+        The number of seconds before a request to the API is canceled.
+    maxConnections : int, default 10
+        The maximum number of connections of the connection pool. Requests above this limit wait for a free connection.
+    chunkSize : int, default 1048576
+        The number of bytes written to disk at a time when downloading files.
+    retryPolicy : RetryPolicy | None, default None
+        How requests failing with a transient error are retried, as in ``ONC``. ``RetryPolicy()`` if None.
+    rateLimiter : RateLimiter | None, default None
+        Rate and concurrency limits applied to every request, as in ``ONC``. It can be shared with ``ONC`` objects.
+    compression : bool, default True
+        Whether compressed responses are accepted, as in ``ONC``.
+    jsonDecoder : str | Callable, default "auto"
+        The JSON decoder of the responses, as in ``ONC``.
+    hooks : list of Callable | None, default None
+        Functions called with an event dict after every request, as in ``ONC``.
+        ``connectTime`` is the duration of the DNS lookup, TCP and TLS handshakes if a new connection was opened.
+    reporter : str | Reporter | Callable, default "print"
+        Where the progress of paginated results, data product orders and file downloads goes, as in ``ONC``.
+    pollTimeout : float | None, default None
+        Maximum number of seconds waiting for a data product run or file to be ready, as in ``ONC``.
+
+    Examples
+    --------
+    >>> import asyncio
+    >>> from onc import AsyncONC
+    >>> async def main(deviceCodes):
+    ...     async with AsyncONC("YOUR_TOKEN_HERE") as onc:
+    ...         return await asyncio.gather(
+    ...             *(onc.getDeployments({"deviceCode": code}) for code in deviceCodes)
+    ...         )
+    >>> asyncio.run(main(["BPR-Folger-59", "BPR-Folger-60"]))  # doctest: +SKIP
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        token: str | None = None,
+        production: bool = True,
+        showInfo: bool = False,
+        showWarning: bool = True,
+        outPath: str | Path = "output",
+        timeout: int = 60,
+        maxConnections: int = 10,
+        chunkSize: int = 1024 * 1024,
+        retryPolicy: RetryPolicy | None = None,
+        rateLimiter: RateLimiter | None = None,
+        compression: bool = True,
+        jsonDecoder: str | Callable = "auto",
+        hooks: list[Callable[[dict], None]] | None = None,
+        reporter: str | Reporter | Callable = "print",
+        pollTimeout: float | None = None,
+    ):
+        if httpx is None:
+            raise ImportError(
+                "AsyncONC requires httpx. Install it with 'pip install onc[async]'."
+            )
+        if token is None or token == "":
+            token = os.environ.get("ONC_TOKEN")
+        if token is None or token == "":
+            raise ValueError(
+                "ONC API token is required. Please provide it as the first argument, "
+                "or set it as the environment variable 'ONC_TOKEN'."
+            )
+        self.token = re.sub(r"[^a-zA-Z0-9\-]+", "", token)
+        self.showInfo = showInfo
+        self.showWarning = showWarning
+        self.timeout = timeout
+        self.production = production
+        self.outPath = outPath
+        self.chunkSize = chunkSize
+        self.cache = None
+        self.jsonDecoder = _jsonDecoder(jsonDecoder)
+        self.reporter = _reporter(reporter)
+        self.pollTimeout = pollTimeout
+        self.retryPolicy = retryPolicy if retryPolicy is not None else RetryPolicy()
+        self.rateLimiter = rateLimiter
+        self.hooks = hooks if hooks is not None else []
+
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            headers={"Accept-Encoding": _acceptEncoding(compression)},
+            limits=httpx.Limits(
+                max_connections=maxConnections,
+                max_keepalive_connections=maxConnections,
+            ),
+        )
+
+        # Service objects of the synchronous client, used for their request-free helpers
+        self._discovery = _OncDiscovery(self)
+        self._delivery = _OncDelivery(self)
+        self._realTime = _OncRealTime(self)
+        self._archive = _OncArchive(self)
+        self._multiPage = _MultiPage(self._realTime)
+
+    @property
+    def outPath(self) -> Path:
+        """
+        Return the resolved directory path that files are saved to.
+        """
+        return self._out_path
+
+    @outPath.setter
+    def outPath(self, outPath: str | Path) -> None:
+        self._out_path = Path(outPath).resolve()
+
+    @property
+    def production(self) -> bool:
+        """
+        Return whether the requests are sent to the Production environment or not.
+        """
+        return self._production
+
+    @production.setter
+    def production(self, is_production: bool) -> None:
+        self._production = is_production
+
+        if is_production:
+            self.baseUrl = "https://data.oceannetworks.ca/"
+        else:
+            self.baseUrl = "https://qa.oceannetworks.ca/"
+
+    async def aclose(self) -> None:
+        """
+        Close the HTTP client and release its connections.
+
+        The AsyncONC object can also be used as an async context manager, which closes the client on exit.
+        """  # noqa: E501
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    # Discovery methods
+
+    async def getLocations(self, filters: dict | None = None):
+        """
+        Awaitable equivalent of ``ONC.getLocations``.
+        """
+        return await self._discoveryRequest(filters, "locations")
+
+    async def getLocationsTree(self, filters: dict | None = None):
+        """
+        Awaitable equivalent of ``ONC.getLocationsTree``.
+        """
+        return await self._discoveryRequest(filters, "locations/tree")
+
+    getLocationHierarchy = getLocationsTree
+
+    async def getDeployments(self, filters: dict | None = None):
+        """
+        Awaitable equivalent of ``ONC.getDeployments``.
+        """
+        return await self._discoveryRequest(filters, "deployments")
+
+    async def getDevices(self, filters: dict | None = None):
+        """
+        Awaitable equivalent of ``ONC.getDevices``.
+        """
+        return await self._discoveryRequest(filters, "devices")
+
+    async def getDeviceCategories(self, filters: dict | None = None):
+        """
+        Awaitable equivalent of ``ONC.getDeviceCategories``.
+        """
+        return await self._discoveryRequest(filters, "deviceCategories")
+
+    async def getProperties(self, filters: dict | None = None):
+        """
+        Awaitable equivalent of ``ONC.getProperties``.
+        """
+        return await self._discoveryRequest(filters, "properties")
+
+    async def getDataProducts(self, filters: dict | None = None):
+        """
+        Awaitable equivalent of ``ONC.getDataProducts``.
+        """
+        return await self._discoveryRequest(filters, "dataProducts")
+
+    async def getDataAvailability(self, filters: dict | None = None):
+        """
+        Awaitable equivalent of ``ONC.getDataAvailability``.
+        """
+        return await self._discoveryRequest(filters, "dataAvailability/dataproducts")
+
+    # Delivery methods
+
+    async def orderDataProduct(
+        self,
+        filters: dict,
+        maxRetries: int = 0,
+        downloadResultsOnly: bool = False,
+        includeMetadataFile: bool = True,
+        overwrite: bool = False,
+        maxWorkers: int = 4,
+    ):
+        """
+        Awaitable equivalent of ``ONC.orderDataProduct``.
+
+        The calling task waits for the product with ``asyncio.sleep``,
+        so several products can be ordered concurrently.
+        """
+        fileList = []
+        requestData = await self.requestDataProduct(filters)
+        runData = await self.runDataProduct(
+            requestData["dpRequestId"], waitComplete=True
+        )
+        for runId in runData["runIds"]:
+            fileList.extend(
+                await self._downloadDataProduct(
+                    runId,
+                    maxRetries,
+                    downloadResultsOnly,
+                    includeMetadataFile,
+                    overwrite,
+                    maxWorkers,
+                    runData["fileCount"] if len(runData["runIds"]) == 1 else 0,
+                )
+            )
+
+        if self.showInfo and not downloadResultsOnly:
+            self._delivery._reportProductOrderStats(fileList, runData)
+        return self._delivery._formatResult(fileList, runData)
+
+    async def orderDataProducts(
+        self,
+        filtersList: list[dict],
+        maxRetries: int = 0,
+        downloadResultsOnly: bool = False,
+        includeMetadataFile: bool = True,
+        overwrite: bool = False,
+        maxWorkers: int = 4,
+    ):
+        """
+        Awaitable equivalent of ``ONC.orderDataProducts``.
+
+        The products are polled concurrently by the event loop, and the files of each one
+        are downloaded as soon as it is complete.
+        """  # noqa: E501
+
+        async def order(filters: dict) -> dict:
+            dpRequestId, status, error = None, "error", None
+            fileList = []
+            runData = {"runIds": [], "fileCount": 0, "runTime": 0, "requestCount": 0}
+            try:
+                dpRequestId = (await self.requestDataProduct(filters))["dpRequestId"]
+                runData = await self.runDataProduct(dpRequestId, waitComplete=True)
+                fileCount = runData["fileCount"] if len(runData["runIds"]) == 1 else 0
+                for runId in runData["runIds"]:
+                    fileList.extend(
+                        await self._downloadDataProduct(
+                            runId,
+                            maxRetries,
+                            downloadResultsOnly,
+                            includeMetadataFile,
+                            overwrite,
+                            maxWorkers,
+                            fileCount,
+                        )
+                    )
+                status = "complete"
+            except (
+                requests.RequestException,
+                httpx.HTTPError,
+                MaxRetriesException,
+                TimeoutError,
+            ) as ex:
+                error = str(ex)
+                self._report(
+                    "message", f"   Data product {dpRequestId}: error ({error})"
+                )
+            return {
+                "dpRequestId": dpRequestId,
+                "status": status,
+                "error": error,
+            } | self._delivery._formatResult(fileList, runData)
+
+        return await _gather(order(filters) for filters in filtersList)
+
+    async def requestDataProduct(self, filters: dict):
+        """
+        Awaitable equivalent of ``ONC.requestDataProduct``.
+        """
+        url = f"{self.baseUrl}api/dataProductDelivery/request"
+        response = await self._doRequest(url, filters)
+
+        self._delivery._recordEstimate(response)
+        self._delivery._reportProductRequest(response)
+        return response
+
+    async def checkDataProduct(self, dpRequestId: int):
+        """
+        Awaitable equivalent of ``ONC.checkDataProduct``.
+        """
+        url = f"{self.baseUrl}api/dataProductDelivery/status"
+        return await self._doRequest(url, {"dpRequestId": dpRequestId})
+
+    async def runDataProduct(self, dpRequestId: int, waitComplete: bool = True):
+        """
+        Awaitable equivalent of ``ONC.runDataProduct``.
+        """
+        url = f"{self.baseUrl}api/dataProductDelivery/run"
+        filters = {"token": self.token, "dpRequestId": dpRequestId}
+        log = _PollLog(self.reporter)
+        self._report(
+            "message",
+            f"To cancel the running data product, run"
+            f" 'await onc.cancelDataProduct({dpRequestId})'",
+        )
+        runResult = {"runIds": [], "fileCount": 0, "runTime": 0, "requestCount": 0}
+        poll = self._delivery._pollScheduler(
+            self._delivery._readyTimes.get(dpRequestId)
+        )
+
+        status = ""
+        start = time()
+        while status != "complete":
+            response = await self._get(url, filters)
+            runResult["requestCount"] += 1
+            await self._raiseForStatus(response)
+            data = self.jsonDecoder(response.content)
+
+            if waitComplete:
+                status = data[0]["status"]
+                log.logMessage(data)
+                if status == "cancelled":
+                    break
+                if response.status_code != 200:
+                    await asyncio.sleep(poll.nextDelay(status))
+            else:
+                status = "complete"
+
+        if waitComplete:
+            log.done()
+        return self._delivery._recordRuns(dpRequestId, data, runResult, start)
+
+    async def cancelDataProduct(self, dpRequestId: int):
+        """
+        Awaitable equivalent of ``ONC.cancelDataProduct``.
+        """
+        url = f"{self.baseUrl}api/dataProductDelivery/cancel"
+        return await self._doRequest(url, {"dpRequestId": dpRequestId})
+
+    async def restartDataProduct(self, dpRequestId: int, waitComplete: bool = True):
+        """
+        Awaitable equivalent of ``ONC.restartDataProduct``.
+        """
+        url = f"{self.baseUrl}api/dataProductDelivery/restart"
+        data = await self._doRequest(url, {"dpRequestId": dpRequestId})
+        if waitComplete:
+            return await self.runDataProduct(dpRequestId, True)
+        return data
+
+    async def downloadDataProduct(
+        self,
+        runId: int,
+        maxRetries: int = 0,
+        downloadResultsOnly: bool = False,
+        includeMetadataFile: bool = True,
+        overwrite: bool = False,
+        maxWorkers: int = 4,
+    ):
+        """
+        Awaitable equivalent of ``ONC.downloadDataProduct``.
+
+        The first file is downloaded alone, then up to maxWorkers files concurrently.
+        """
+        return await self._downloadDataProduct(
+            runId,
+            maxRetries,
+            downloadResultsOnly,
+            includeMetadataFile,
+            overwrite,
+            maxWorkers,
+        )
+
+    async def _downloadDataProduct(
+        self,
+        runId: int,
+        maxRetries: int,
+        downloadResultsOnly: bool,
+        includeMetadataFile: bool,
+        overwrite: bool,
+        maxWorkers: int,
+        fileCount: int = 0,
+    ):
+        """
+        Download the files of a run: files 2 to fileCount concurrently if the
+        number of files is known (from runDataProduct), or batches of maxWorkers
+        files until one is not found otherwise.
+        """
+        if downloadResultsOnly:
+            if fileCount <= 0:
+                fileCount = await self._countFilesInProduct(runId, maxWorkers)
+            indexes = list(range(1, fileCount + 1))
+            if includeMetadataFile:
+                indexes.append("meta")
+
+            fileList = []
+            for index in indexes:
+                dpf = _DataProductFile(
+                    runId, str(index), self.baseUrl, self.token, None
+                )
+                dpf.setComplete()
+                fileList.append(dpf.getInfo())
+            return fileList
+
+        self._report(
+            "message", f"\nDownloading data product files with runId {runId}..."
+        )
+        maxWorkers = max(maxWorkers, 1)
+        semaphore = asyncio.Semaphore(maxWorkers)
+        options = (maxRetries, overwrite, _hasPartials(self.outPath))
+
+        async def download(index: int) -> dict | None:
+            async with semaphore:
+                info = await self._retryProductFile(runId, str(index), *options)
+            return info if info["status"] in ["complete", "skipped"] else None
+
+        fileList = []
+        if (info := await download(1)) is not None:
+            fileList.append(info)
+            if fileCount > 0:
+                infos = await _gather(download(i) for i in range(2, fileCount + 1))
+                fileList.extend(info for info in infos if info is not None)
+            else:
+                index = 2
+                while True:
+                    batch = range(index, index + maxWorkers)
+                    infos = await _gather(download(i) for i in batch)
+                    # files saved after a missing index are kept too
+                    fileList.extend(info for info in infos if info is not None)
+                    if None in infos:
+                        break
+                    index += maxWorkers
+
+        if includeMetadataFile:
+            try:
+                info = await self._retryProductFile(runId, "meta", *options)
+            except Exception as ex:
+                warn(
+                    f"Metadata file not downloaded.  Reason: {type(ex)}" + str(ex),
+                    RuntimeWarning,
+                    stacklevel=2,
+                )
+            else:
+                if info["status"] in ["complete", "skipped"]:
+                    fileList.append(info)
+
+        self._report("done", "", task="files")
+        return fileList
+
+    # Real-time methods
+
+    async def getScalardataByLocation(
+        self,
+        filters: dict = None,
+        allPages: bool = False,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+        columnar: bool = False,
+    ):
+        """
+        Awaitable equivalent of ``ONC.getScalardataByLocation``.
+
+        With shardBy, up to maxWorkers shards are paginated concurrently.
+        """
+        return await self._getDirectAllPages(
+            filters, "scalardata/location", allPages, shardBy, maxWorkers, columnar
+        )
+
+    async def getScalardataByDevice(
+        self,
+        filters: dict = None,
+        allPages: bool = False,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+        columnar: bool = False,
+    ):
+        """
+        Awaitable equivalent of ``ONC.getScalardataByDevice``.
+
+        With shardBy, up to maxWorkers shards are paginated concurrently.
+        """
+        return await self._getDirectAllPages(
+            filters, "scalardata/device", allPages, shardBy, maxWorkers, columnar
+        )
+
+    async def getScalardata(
+        self,
+        filters: dict = None,
+        allPages: bool = False,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+        columnar: bool = False,
+    ):
+        """
+        Awaitable equivalent of ``ONC.getScalardata``.
+        """
+        return await self._realTime._delegateByFilters(
+            byDevice=self.getScalardataByDevice,
+            byLocation=self.getScalardataByLocation,
+            filters=filters,
+            allPages=allPages,
+            shardBy=shardBy,
+            maxWorkers=maxWorkers,
+            columnar=columnar,
+        )
+
+    async def iterScalardata(self, filters: dict = None, columnar: bool = False):
+        """
+        Asynchronous generator equivalent of ``ONC.iterScalardata``.
+        """
+        service = self._byFilters(filters, "scalardata")
+        if columnar:
+            _newColumns()  # fail early if numpy is missing
+        async for page in self._iterDirectPages(filters, service):
+            if columnar:
+                _newColumns().append(page).toResponse(page)
+            yield page
+
+    async def getRawdataByLocation(
+        self,
+        filters: dict = None,
+        allPages: bool = False,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+    ):
+        """
+        Awaitable equivalent of ``ONC.getRawdataByLocation``.
+        """
+        return await self._getDirectAllPages(
+            filters, "rawdata/location", allPages, shardBy, maxWorkers
+        )
+
+    async def getRawdataByDevice(
+        self,
+        filters: dict = None,
+        allPages: bool = False,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+    ):
+        """
+        Awaitable equivalent of ``ONC.getRawdataByDevice``.
+        """
+        return await self._getDirectAllPages(
+            filters, "rawdata/device", allPages, shardBy, maxWorkers
+        )
+
+    async def getRawdata(
+        self,
+        filters: dict = None,
+        allPages: bool = False,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+    ):
+        """
+        Awaitable equivalent of ``ONC.getRawdata``.
+        """
+        return await self._realTime._delegateByFilters(
+            byDevice=self.getRawdataByDevice,
+            byLocation=self.getRawdataByLocation,
+            filters=filters,
+            allPages=allPages,
+            shardBy=shardBy,
+            maxWorkers=maxWorkers,
+        )
+
+    async def iterRawdata(self, filters: dict = None):
+        """
+        Asynchronous generator equivalent of ``ONC.iterRawdata``.
+        """
+        service = self._byFilters(filters, "rawdata")
+        async for page in self._iterDirectPages(filters, service):
+            yield page
+
+    async def getSensorCategoryCodes(self, filters: dict):
+        """
+        Awaitable equivalent of ``ONC.getSensorCategoryCodes``.
+        """
+        updated_filters = filters | {"returnOptions": "excludeScalarData"}
+        return (await self.getScalardata(updated_filters, False))["sensorData"]
+
+    # Archive file methods
+
+    async def getArchivefileByLocation(
+        self, filters: dict = None, allPages: bool = False
+    ):
+        """
+        Awaitable equivalent of ``ONC.getArchivefileByLocation``.
+        """
+        return await self._getList(filters, "archivefile/location", allPages)
+
+    async def getArchivefileByDevice(
+        self, filters: dict = None, allPages: bool = False
+    ):
+        """
+        Awaitable equivalent of ``ONC.getArchivefileByDevice``.
+        """
+        return await self._getList(filters, "archivefile/device", allPages)
+
+    async def getArchivefile(self, filters: dict = None, allPages: bool = False):
+        """
+        Awaitable equivalent of ``ONC.getArchivefile``.
+        """
+        return await self._archive._delegateByFilters(
+            byDevice=self.getArchivefileByDevice,
+            byLocation=self.getArchivefileByLocation,
+            filters=filters,
+            allPages=allPages,
+        )
+
+    async def iterArchivefile(self, filters: dict = None):
+        """
+        Asynchronous generator equivalent of ``ONC.iterArchivefile``.
+        """
+        service = self._byFilters(filters, "archivefile")
+        url = self._archive._serviceUrl(service)
+        filters2 = filters.copy()
+        filters2["token"] = self.token
+        extension = filters2.pop("extension", None)
+        async for page, _ in self._iterPages(service, url, filters2, extension):
+            yield page
+
+    async def getArchivefileUrls(
+        self, filters: dict = None, allPages: bool = False
+    ) -> list[str]:
+        """
+        Awaitable equivalent of ``ONC.getArchivefileUrls``.
+        """
+        fileList = (await self.getArchivefile(filters, allPages))["files"]
+        return list(map(self.getArchivefileUrl, fileList))
+
+    def getArchivefileUrl(self, filename: str = "") -> str:
+        """
+        Return an archivefile absolute download URL for a filename.
+        """
+        return self._archive.getArchivefileUrl(filename)
+
+    async def downloadArchivefile(self, filename: str = "", overwrite: bool = False):
+        """
+        Awaitable equivalent of ``ONC.downloadArchivefile``.
+        """
+        url = self._archive._serviceUrl("archivefile/download")
+        filters = {"token": self.token, "filename": filename}
+        if not overwrite and _isSaved(self.outPath / filename):
+            raise FileExistsError(self.outPath / filename)
+
+        # Resume from a partial file left by an interrupted download, if any
+        offset = _partialSize(self.outPath, filename)
+        response = await self._get(url, filters, _rangeHeaders(offset), stream=True)
+        if response.status_code == 416:
+            # The partial file doesn't match the archived file, start over
+            await response.aclose()
+            _discardPartial(self.outPath, filename)
+            response = await self._get(url, filters, stream=True)
+        if response.status_code not in (200, 206):
+            await response.aread()
+            await response.aclose()
+            raise requests.HTTPError(_createErrorMessage(response))
+
+        saved = await self._saveAsFile(response, filename, overwrite)
+        self._log(
+            f"Downloaded {_formatSize(saved['size'])}"
+            f" in {_formatDuration(saved['downloadTime'])}"
+            f" ({_formatSize(saved['throughput'])}/s,"
+            f" {_formatSize(saved['transferSize'])} received)"
+        )
+        return self._archive._fileInfo(str(response.url), filename, saved)
+
+    async def downloadDirectArchivefile(
+        self,
+        filters: dict,
+        overwrite: bool = False,
+        allPages: bool = False,
+        maxWorkers: int = 1,
+    ):
+        """
+        Awaitable equivalent of ``ONC.downloadDirectArchivefile``.
+
+        Up to maxWorkers files are downloaded concurrently, one at a time by default as in ``ONC``.
+        """  # noqa: E501
+        # make sure we only get a simple list of files
+        filters = {k: v for k, v in filters.items() if k != "returnOptions"}
+        dataRows = await self.getArchivefile(filters, allPages)
+        n = len(dataRows["files"])
+        self._report("message", f"Obtained a list of {n} files to download.")
+
+        semaphore = asyncio.Semaphore(max(maxWorkers, 1))
+
+        async def download(i: int, filename: str):
+            fields = {"file": filename, "index": i + 1, "total": n}
+            if not overwrite and _isSaved(self.outPath / filename):
+                self._report(
+                    "file",
+                    f'   Skipping "{filename}": File already exists.',
+                    status="skipped",
+                    **fields,
+                )
+                return self._archive._fileInfo(
+                    self.getArchivefileUrl(filename), filename
+                )
+            async with semaphore:
+                info = await self.downloadArchivefile(filename, overwrite)
+            self._report(
+                "file",
+                f'   ({i + 1} of {n}) Downloaded file: "{filename}"',
+                status="downloaded",
+                **fields,
+            )
+            return info
+
+        start = time()
+        downInfos = await _gather(
+            download(i, filename) for i, filename in enumerate(dataRows["files"])
+        )
+        wallTime = time() - start
+
+        downloaded = [info for info in downInfos if info["status"] != "skipped"]
+        size = sum(info["size"] for info in downloaded)
+        downloadTime = sum(info["downloadTime"] for info in downloaded)
+        self._archive._reportDownloads(
+            len(downloaded), size, downloadTime, wallTime, maxWorkers
+        )
+
+        return {
+            "downloadResults": downInfos,
+            "stats": {
+                "totalSize": size,
+                "downloadTime": downloadTime,
+                "wallTime": round(wallTime, 3),
+                "fileCount": len(downloaded),
+            },
+        }
+
+    # Requests
+
+    def _log(self, message: str):
+        if self.showInfo:
+            print(message)
+
+    def _report(self, event: str, message: str, **fields):
+        """
+        Pass a progress event to the reporter (see ``Reporter``).
+        """
+        self.reporter.report(event, message, **fields)
+
+    async def _get(
+        self,
+        url: str,
+        filters: dict,
+        headers: dict | None = None,
+        stream: bool = False,
+        method: str = "GET",
+        page: int | None = None,
+    ):
+        """
+        Send a request, optionally without reading the body (see httpx streaming).
+        Transient failures are retried according to the retry policy.
+        The request (with its retries) is reported to the hooks, with the page number.
+        """
+        # match the query strings built by requests
+        params = {
+            key: str(value) if isinstance(value, bool) else value
+            for key, value in filters.items()
+            if value is not None
+        }
+        trace = _HttpxTrace()
+        request = self.client.build_request(
+            method, url, params=params, headers=headers, extensions={"trace": trace}
+        )
+
+        policy = self.retryPolicy
+        attempt = 1
+        start = time()
+        while True:
+            limit = AsyncExitStack()
+            if self.rateLimiter:
+                await limit.enter_async_context(self.rateLimiter.limitAsync())
+            trace.clear()
+            try:
+                response = await self.client.send(request, stream=stream)
+            except httpx.TransportError as error:
+                await limit.aclose()
+                if not policy.shouldRetry(method, attempt):
+                    event = _requestEvent(
+                        method,
+                        str(request.url),
+                        start,
+                        connectTime=trace.connectTime(),
+                        retries=attempt - 1,
+                        page=page,
+                        error=type(error).__name__,
+                    )
+                    _runHooks(self.hooks, event)
+                    raise
+                delay = policy.delay(attempt)
+                reason = type(error).__name__
+            except BaseException:
+                await limit.aclose()
+                raise
+            else:
+                if not policy.shouldRetry(method, attempt, response.status_code):
+                    if self.hooks:
+                        self._emit(response, start, trace, attempt, page, stream)
+                    if stream:
+                        # the body is read later, hold the slot until then
+                        _releaseOnClose(response, limit)
+                    else:
+                        await limit.aclose()
+                    return response
+                delay = policy.delay(attempt, response.headers.get("Retry-After"))
+                reason = f"HTTP status {response.status_code}"
+                await response.aclose()
+                await limit.aclose()
+
+            policy._logRetry(url, delay, reason, attempt)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _emit(self, response, start, trace, attempt, page, stream) -> None:
+        """
+        Pass the event of a completed request to the hooks
+        The bytes of a streamed body are its Content-Length, as it isn't read yet
+        """
+        if stream:
+            length = response.headers.get("Content-Length")
+            bytesReceived = int(length) if length is not None else None
+        else:
+            bytesReceived = response.num_bytes_downloaded
+        event = _requestEvent(
+            response.request.method,
+            str(response.url),
+            start,
+            status=response.status_code,
+            ttfb=trace.ttfb(),
+            connectTime=trace.connectTime(),
+            bytesReceived=bytesReceived,
+            retries=attempt - 1,
+            page=page,
+        )
+        _runHooks(self.hooks, event)
+
+    async def _raiseForStatus(self, response) -> None:
+        """
+        Raise an HTTPError like the synchronous client for error responses.
+        """
+        if response.is_success:
+            return
+        await response.aread()
+        await response.aclose()
+        raise requests.HTTPError(_createErrorMessage(response))
+
+    async def _doRequest(
+        self,
+        url: str,
+        filters: dict | None = None,
+        getTime: bool = False,
+        page: int | None = None,
+    ):
+        """
+        Return the json-encoded content of a GET request with the token added,
+        and its timing and transfer information as a tuple if getTime is True,
+        in the format of ``_OncService._doRequest``.
+        """
+        filters = filters if filters is not None else {}
+        filters["token"] = self.token
+        self._log(f"Requesting URL:\n{url}")
+
+        start = time()
+        response = await self._get(url, filters, page=page)
+        responseTime = time() - start
+        await self._raiseForStatus(response)
+        timing = {
+            "responseTime": responseTime,
+            "transferSize": response.num_bytes_downloaded,
+            "size": len(response.content),
+        }
+        self._log(
+            f"Web Service response time: {_formatDuration(responseTime)}, received"
+            f" {_formatSize(timing['transferSize'])}"
+            f" ({_formatSize(timing['size'])} decompressed)"
+        )
+
+        jsonResult = self._discovery._parseResponse(response, url, filters)
+        return (jsonResult, timing) if getTime else jsonResult
+
+    async def _discoveryRequest(self, filters: dict | None, service: str):
+        filters = filters or {}
+        result = await self._doRequest(self._discovery._serviceUrl(service), filters)
+        self._discovery._sanitizeBooleans(result)
+        return result
+
+    def _byFilters(self, filters: dict, prefix: str) -> str:
+        """
+        Return the "device" or "location" service of prefix for the filters.
+        """
+        return self._realTime._delegateByFilters(
+            byDevice=lambda filters: f"{prefix}/device",
+            byLocation=lambda filters: f"{prefix}/location",
+            filters=filters,
+        )
+
+    # Pagination
+
+    async def _iterPages(self, service: str, url: str, filters: dict, extension: str):
+        """
+        Yield a tuple (jsonResponse, timing) for each page, following the
+        "next" parameters of the previous page until there are no more pages.
+        """
+        page = 0
+        while filters is not None:
+            page += 1
+            response, timing = await self._doRequest(
+                url, filters, getTime=True, page=page
+            )
+            if service.startswith("archivefile"):
+                response = self._archive._filterByExtension(response, extension)
+            yield response, timing
+            nextPage = response["next"]
+            filters = None if nextPage is None else nextPage["parameters"]
+
+    async def _iterDirectPages(self, filters: dict, service: str):
+        filters = self._realTime._prepareFilters(filters)
+        url = self._realTime._serviceUrl(service)
+        async for page, _ in self._iterPages(service, url, filters, None):
+            yield page
+
+    async def _getAllPages(
+        self,
+        service: str,
+        url: str,
+        filters: dict,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+        columnar: bool = False,
+    ):
+        """
+        Request all pages (of all time shards if shardBy is provided)
+        and concatenate them into the first one.
+        """
+        extension = None
+        if service.startswith("archivefile"):
+            extension = filters.pop("extension", None)
+
+        shards = [filters]
+        if shardBy is not None:
+            shards = self._multiPage._shardFilters(filters, shardBy)
+        semaphore = asyncio.Semaphore(max(maxWorkers, 1))
+        mp = self._multiPage
+
+        async def getShard(shardFilters: dict):
+            async with semaphore:
+                merger = _PageMerger(mp, service)
+                async for page, _ in self._iterPages(
+                    service, url, shardFilters, extension
+                ):
+                    merger.add(page)
+                return merger.result()
+
+        # Merge the shards in time order as they complete
+        start = time()
+        merger = _PageMerger(mp, service, columnar)
+        tasks = [asyncio.ensure_future(getShard(shard)) for shard in shards]
+        try:
+            for task in tasks:
+                merger.add(await task)
+        except BaseException:
+            await _cancel(tasks)
+            raise
+        response = merger.result()
+
+        self._report(
+            "message",
+            f"   ({mp._rowCount(response, service):d} samples)"
+            f" Completed in {_formatDuration(time() - start)}.",
+        )
+        response["next"] = None
+        return response
+
+    async def _getDirectAllPages(
+        self,
+        filters: dict,
+        service: str,
+        allPages: bool,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+        columnar: bool = False,
+    ):
+        filters = self._realTime._prepareFilters(filters)
+        url = self._realTime._serviceUrl(service)
+
+        if columnar and filters.get("outputFormat", "array") != "array":
+            raise ValueError("The columnar mode requires outputFormat 'array'.")
+
+        if allPages:
+            return await self._getAllPages(
+                service, url, filters, shardBy, maxWorkers, columnar
+            )
+        result = await self._doRequest(url, filters)
+        if columnar:
+            _newColumns().append(result).toResponse(result)
+        return result
+
+    async def _getList(self, filters: dict, service: str, allPages: bool):
+        url = self._archive._serviceUrl(service)
+        filters2 = filters.copy()
+        filters2["token"] = self.token
+
+        if allPages:
+            return await self._getAllPages(service, url, filters2)
+        extension = filters2.pop("extension", None)
+        result = await self._doRequest(url, filters2)
+        return self._archive._filterByExtension(result, extension)
+
+    # Downloads
+
+    async def _saveAsFile(self, response, fileName: str, overwrite: bool) -> dict:
+        """
+        Asynchronous equivalent of ``saveAsFile`` for a streamed httpx response.
+
+        The file is written in a worker thread, so the event loop isn't blocked.
+        """
+        try:
+            filePath, offset, expectedSize = _startSave(
+                response, self.outPath, fileName, overwrite
+            )
+        except (FileExistsError, requests.ConnectionError):
+            await response.aclose()
+            raise
+
+        start = time()
+        try:
+            part = await asyncio.to_thread(_PartFile, filePath, offset, self.chunkSize)
+            try:
+                async for chunk in response.aiter_bytes(self.chunkSize):
+                    await asyncio.to_thread(part.write, chunk)
+            finally:
+                await asyncio.to_thread(part.close)
+            transferSize = response.num_bytes_downloaded
+        finally:
+            await response.aclose()
+
+        return await asyncio.to_thread(
+            _finishSave, response, part, transferSize, expectedSize, start
+        )
+
+    async def _retryProductFile(
+        self,
+        runId: int,
+        index: str,
+        maxRetries: int,
+        overwrite: bool,
+        findPartial: bool = False,
+    ) -> dict:
+        """
+        Download a data product file, retrying an interrupted download according
+        to the retry policy. It is resumed from its partial file.
+        """
+        # one scheduler for all attempts, so retries keep the backoff and deadline
+        poll = self._delivery._pollScheduler(self._delivery._runReadyTimes.get(runId))
+        attempt = 1
+        filePath = ""
+        while True:
+            dpf = _DataProductFile(
+                runId,
+                index,
+                self.baseUrl,
+                self.token,
+                None,
+                self.reporter,
+                self.jsonDecoder,
+            )
+            # the file name learned by an interrupted attempt resumes its partial file
+            dpf._filePath = filePath
+            try:
+                return await self._downloadProductFile(
+                    dpf, poll, maxRetries, overwrite, findPartial
+                )
+            except (httpx.TransportError, requests.ConnectionError) as error:
+                filePath = dpf._filePath
+                delay = _retryDelay(self.retryPolicy, runId, index, attempt, error)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _downloadProductFile(
+        self,
+        dpf: _DataProductFile,
+        poll: _PollScheduler,
+        maxRetries: int,
+        overwrite: bool,
+        findPartial: bool,
+    ) -> dict:
+        """
+        Asynchronous equivalent of ``_DataProductFile.download``.
+
+        Return the file information, in the format of ``_DataProductFile.getInfo``.
+        """
+        log = _PollLog(self.reporter)
+        url, filters = dpf._baseUrl, dpf._filters
+        if not dpf._filePath and findPartial:
+            response = await self._get(url, filters, method="HEAD")
+            dpf._filePath = dpf._fileName(response)
+        offset = dpf._resumeOffset(self.outPath)
+
+        dpf._status = 202
+        while dpf._status == 202:
+            response = await self._get(url, filters, _rangeHeaders(offset), stream=True)
+            dpf._downloadUrl = str(response.url)
+            dpf._status = response.status_code
+            dpf._retries += 1
+            if maxRetries > 0 and dpf._retries > maxRetries:
+                await response.aclose()
+                raise MaxRetriesException(maxRetries)
+
+            if dpf._status not in (200, 206):
+                await response.aread()
+                await response.aclose()
+                if dpf._status == 416:
+                    # The partial file doesn't match the product file, start over
+                    _discardPartial(self.outPath, dpf._filePath)
+                    offset = 0
+                    dpf._status = 202
+                    continue
+                message = dpf._handleStatus(response, log)
+                if message is not None:
+                    await asyncio.sleep(poll.nextDelay(message))
+                continue
+
+            dpf._filePath = dpf.extractNameFromHeader(response)
+            dpf._status = 200
+            dpf._downloaded = True
+            log.done()
+            try:
+                dpf._setSaved(
+                    await self._saveAsFile(response, dpf._filePath, overwrite)
+                )
+            except FileExistsError:
+                dpf._setExists()
+
+        return dpf.getInfo()
+
+    async def _countFilesInProduct(self, runId: int, maxWorkers: int = 4) -> int:
+        """
+        Asynchronous equivalent of ``_OncDelivery._countFilesInProduct``.
+        """
+        fileCounts = self._delivery._fileCounts
+        if runId in fileCounts:
+            return fileCounts[runId]
+
+        n = 0
+        if await self._productFileExists(runId, 1):
+            low, high = 1, None
+            while high is None or high - low > 1:
+                indexes = _nextProbes(low, high, max(maxWorkers, 1))
+                found = await _gather(
+                    self._productFileExists(runId, index) for index in indexes
+                )
+                low, high = _narrowBounds(low, high, indexes, found)
+            n = low
+
+        fileCounts[runId] = n
+        return n
+
+    async def _productFileExists(self, runId: int, index: int) -> bool:
+        """
+        Return True if the run has a file at index, waiting while it's not complete.
+        """
+        url = f"{self.baseUrl}api/dataProductDelivery/download"
+        filters = {"token": self.token, "dpRunId": runId, "index": index}
+        poll = self._delivery._pollScheduler(self._delivery._runReadyTimes.get(runId))
+        while True:
+            response = await self._get(url, filters, method="HEAD")
+            if response.status_code != 202:
+                return response.status_code == 200
+            await asyncio.sleep(poll.nextDelay("running"))
+
+
+def _releaseOnClose(response, held: AsyncExitStack) -> None:
+    """
+    Release the rate limiter slot held for a streamed response when it is closed
+    httpx closes a streamed response once its body is read
+    """
+    aclose = response.aclose
+
+    async def acloseAndRelease():
+        try:
+            await aclose()
+        finally:
+            await held.aclose()
+
+    response.aclose = acloseAndRelease
+
+
+async def _gather(coroutines):
+    """
+    Run coroutines concurrently and return their results in order.
+
+    If one fails, the others are cancelled before the exception is raised.
+    """
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        await _cancel(tasks)
+        raise
+
+
+async def _cancel(tasks: list) -> None:
+    """
+    Cancel the tasks and wait until they are done.
+    """
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+
+class _ArchiveManifest:
+    """
+    An index of the archived files downloaded in an outPath
+    Records the size, modification time, checksum and source URL of each file, so
+    whether a file was already downloaded is a lookup instead of a stat of the file
+    The index is a JSON file, loaded once and replaced atomically when saved
+    """
+
+    def __init__(self, path: Path):
+        """
+        @param path: The manifest file, created when it is first saved
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = None  # filename -> entry, loaded on first use
+        self._changed = False
+
+    def get(self, filename: str) -> dict | None:
+        """
+        Returns the entry of a file, or None if it isn't in the manifest
+        """
+        with self._lock:
+            return self._load().get(filename)
+
+    def add(
+        self,
+        filename: str,
+        size: int,
+        mtime: float,
+        checksum: str | None,
+        url: str,
+        **fields,
+    ):
+        """
+        @param checksum: SHA-256 hex digest of the file, or None if unknown
+                         (for a file found in outPath instead of downloaded)
+        @param url: Download URL of the file, without the token
+        @param fields: Other fields of the entry, e.g. the dateFrom of the file
+        """
+        entry = {"size": size, "mtime": mtime, "sha256": checksum, "url": url}
+        with self._lock:
+            self._load()[filename] = entry | fields
+            self._changed = True
+
+    def remove(self, filename: str):
+        with self._lock:
+            if self._load().pop(filename, None) is not None:
+                self._changed = True
+
+    def filenames(self) -> list[str]:
+        with self._lock:
+            return list(self._load())
+
+    def save(self):
+        """
+        Writes the manifest if it changed, replacing the file atomically
+        """
+        with self._lock:
+            if not self._changed:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tempPath = self.path.with_name(f"{self.path.name}.tmp")
+            tempPath.write_text(json.dumps(self._entries))
+            os.replace(tempPath, self.path)
+            self._changed = False
+
+    def _load(self) -> dict:
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.path.read_text())
+            except (FileNotFoundError, json.JSONDecodeError):
+                # a missing or unreadable manifest is rebuilt from the files found
+                self._entries = {}
+        return self._entries
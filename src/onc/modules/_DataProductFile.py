@@ -1,11 +1,20 @@
+import json
+from collections.abc import Callable
 from pathlib import Path
-from time import sleep
 from warnings import warn
 
 import requests
 
 from ._PollLog import _PollLog
-from ._util import _createErrorMessage, saveAsFile
+from ._PollScheduler import _PollScheduler
+from ._Reporter import Reporter
+from ._util import (
+    _createErrorMessage,
+    _discardPartial,
+    _partialSize,
+    _rangeHeaders,
+    saveAsFile,
+)
 
 
 class MaxRetriesException(RuntimeError):
@@ -19,15 +28,33 @@ class _DataProductFile:
     Is able to poll and wait if required
     """
 
-    def __init__(self, dpRunId: int, index: str, baseUrl: str, token: str):
+    def __init__(
+        self,
+        dpRunId: int,
+        index: str,
+        baseUrl: str,
+        token: str,
+        session: requests.Session,
+        reporter: Reporter | None = None,
+        jsonDecoder: Callable[[bytes], object] | None = None,
+    ):
+        """
+        @param jsonDecoder: Decoder of the JSON body of the responses (see
+                            _jsonDecoder), json.loads if None
+        """
+        self._session = session
+        self._reporter = reporter if reporter is not None else Reporter()
+        self._decode = jsonDecoder if jsonDecoder is not None else json.loads
         self._retries = 0
         self._status = 202
         self._downloaded = False
         self._baseUrl = f"{baseUrl}api/dataProductDelivery/download"
         self._filePath = ""
         self._fileSize = 0
+        self._transferSize = 0
         self._runningTime = 0
         self._downloadingTime = 0
+        self._sha256 = None
 
         self._filters = {
             "token": token,
@@ -40,22 +67,38 @@ class _DataProductFile:
     def download(
         self,
         timeout: int,
-        pollPeriod: float,
+        poll: _PollScheduler,
         outPath: Path,
         maxRetries: int,
         overwrite: bool,
+        chunkSize: int = 1024 * 1024,
+        findPartial: bool = False,
     ):
         """
         Download a file for the data product at runId
         Can poll, wait and retry if the file is not ready to download
+        A partial file left by an interrupted download is resumed with a Range
+        header on the first request, if the file name is known from a previous
+        attempt or, if findPartial, from a HEAD request
         Return the file information
         """
-        log = _PollLog(True)
+        log = _PollLog(self._reporter)
+        if not self._filePath and findPartial:
+            response = self._session.head(
+                self._baseUrl, params=self._filters, timeout=timeout
+            )
+            self._filePath = self._fileName(response)
+        offset = self._resumeOffset(outPath)
+
         self._status = 202
         while self._status == 202:
             # Run timed request
-            response = requests.get(
-                self._baseUrl, self._filters, timeout=timeout, stream=True
+            response = self._session.get(
+                self._baseUrl,
+                params=self._filters,
+                timeout=timeout,
+                stream=True,
+                headers=_rangeHeaders(offset),
             )
 
             self._downloadUrl = response.url
@@ -63,45 +106,111 @@ class _DataProductFile:
             self._retries += 1
 
             if maxRetries > 0 and self._retries > maxRetries:
+                response.close()
                 raise MaxRetriesException(maxRetries)
 
-            if self._status == 200:
-                self._downloaded = True
-                filename = self.extractNameFromHeader(response)
-                self._filePath = filename
-                try:
-                    self._fileSize, self._downloadingTime = saveAsFile(
-                        response, outPath, filename, overwrite
-                    )
-                except FileExistsError:
-                    if self._retries > 1:
-                        print("")
-                    print(f'   Skipping "{self._filePath}": File already exists.')
-                    self._status = 777
-
-            elif self._status == 202:  # Still processing, wait and retry
-                log.logMessage(response.json())
-                sleep(pollPeriod)
-
-            elif self._status == 204:  # No data found
-                print("   No data found.")
-
-            elif self._status == 404:  # Index too high, no more files to download
-                log.printNewLine()
-                pass
-
-            elif self._status == 410:  # Status 410: gone (file deleted from FTP)
-                warn(
-                    "   FTP Error: File not found. If the product order is recent,"
-                    "retry downloading using the method downloadProduct"
-                    f"with the runId: {self._filters['dpRunId']}",
-                    stacklevel=2,
+            if self._status not in (200, 206):
+                # read the short body, so the connection goes back to the pool
+                _ = response.content
+                response.close()
+                if self._status == 416:
+                    # The partial file doesn't match the product file, start over
+                    _discardPartial(outPath, self._filePath)
+                    offset = 0
+                    self._status = 202
+                    continue
+                message = self._handleStatus(response, log)
+                if message is not None:
+                    poll.wait(message)
+                continue
+
+            self._filePath = self.extractNameFromHeader(response)
+            self._status = 200
+            self._downloaded = True
+            log.done()
+            try:
+                self._setSaved(
+                    saveAsFile(response, outPath, self._filePath, overwrite, chunkSize)
                 )
-            else:
-                raise requests.HTTPError(_createErrorMessage(response))
+            except FileExistsError:
+                self._setExists()
 
         return self._status
 
+    def _fileName(self, response) -> str:
+        """
+        Returns the file name of a read response (e.g. to a HEAD request),
+        or "" if the file is not ready
+        """
+        if response.status_code != 200:
+            return ""
+        return self.extractNameFromHeader(response)
+
+    def _resumeOffset(self, outPath: Path) -> int:
+        """
+        Returns the offset to request the file from, the size of the partial file
+        left by an interrupted download, or 0 if the file name is unknown
+        """
+        if not self._filePath:
+            return 0
+        return _partialSize(outPath, self._filePath)
+
+    def _handleStatus(self, response, log: _PollLog) -> str | None:
+        """
+        Handles a read response without the file (status other than 200)
+        Returns the message to wait with if the file is still being generated (202),
+        or None if there is no file to download
+        """
+        if self._status == 202:  # Still processing, wait and retry
+            return log.logMessage(self._decode(response.content))
+
+        log.done()
+        if self._status == 204:  # No data found
+            self._reporter.report("message", "   No data found.")
+
+        elif self._status == 404:  # Index too high, no more files to download
+            pass
+
+        elif self._status == 410:  # Status 410: gone (file deleted from FTP)
+            warn(
+                "   FTP Error: File not found. If the product order is recent,"
+                "retry downloading using the method downloadProduct"
+                f"with the runId: {self._filters['dpRunId']}",
+                stacklevel=3,
+            )
+        else:
+            raise requests.HTTPError(_createErrorMessage(response))
+        return None
+
+    def _setSaved(self, saved: dict):
+        """
+        Records the result of saveAsFile for the downloaded file
+        """
+        self._fileSize = saved["size"]
+        self._transferSize = saved["transferSize"]
+        self._downloadingTime = saved["downloadTime"]
+        self._sha256 = saved["sha256"]
+        self._reportFile("downloaded", f'   Downloaded file: "{self._filePath}"')
+
+    def _setExists(self):
+        """
+        Sets the file as skipped, since it already exists in outPath
+        """
+        self._status = 777
+        self._reportFile(
+            "skipped", f'   Skipping "{self._filePath}": File already exists.'
+        )
+
+    def _reportFile(self, status: str, message: str):
+        self._reporter.report(
+            "file",
+            message,
+            file=self._filePath,
+            index=self._filters["index"],
+            total=None,
+            status=status,
+        )
+
     def extractNameFromHeader(self, response):
         """
         Returns the file name from the response.
@@ -113,6 +222,15 @@ class _DataProductFile:
     def setComplete(self):
         self._status = 200
 
+    def setSkipped(self, filePath: str, fileSize: int):
+        """
+        Sets the file as skipped, since it was already downloaded
+        """
+        self._status = 777
+        self._filePath = filePath
+        self._fileSize = fileSize
+        self._reportFile("skipped", f'   Skipping "{filePath}": Already downloaded.')
+
     def getInfo(self):
         errorCodes = {
             "200": "complete",
@@ -132,6 +250,7 @@ class _DataProductFile:
             "url": self._downloadUrl,
             "status": txtStatus,
             "size": self._fileSize,
+            "transferSize": self._transferSize,
             "file": self._filePath,
             "index": self._filters["index"],
             "downloaded": self._downloaded,
@@ -0,0 +1,56 @@
+import json
+from collections.abc import Callable
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # msgspec is an optional dependency
+    msgspec = None
+
+
+def _jsonDecoder(decoder: str | Callable = "auto") -> Callable[[bytes], object]:
+    """
+    Returns a function decoding the JSON body (bytes) of a response
+    @param decoder: "auto" (orjson, then msgspec if installed, then the standard
+                    library), "orjson", "msgspec", "json", or a function of bytes
+    """
+    if callable(decoder):
+        return decoder
+
+    if decoder == "auto":
+        decoder = "orjson" if orjson else "msgspec" if msgspec else "json"
+
+    if decoder == "json":
+        return json.loads
+    elif decoder == "orjson":
+        if orjson is None:
+            raise ImportError("The 'orjson' JSON decoder requires orjson.")
+        return _withFallback(orjson.loads, ValueError)
+    elif decoder == "msgspec":
+        if msgspec is None:
+            raise ImportError("The 'msgspec' JSON decoder requires msgspec.")
+        return _withFallback(msgspec.json.decode, msgspec.DecodeError)
+
+    raise ValueError(
+        f"Invalid jsonDecoder '{decoder}'. "
+        "Supported values are 'auto', 'orjson', 'msgspec', 'json' or a function."
+    )
+
+
+def _withFallback(loads: Callable, error: type) -> Callable[[bytes], object]:
+    """
+    Returns loads, falling back to the standard library for the documents it rejects
+    with error (e.g. NaN values, or integers larger than 64 bits)
+    """
+
+    def decode(content: bytes):
+        try:
+            return loads(content)
+        except error:
+            return json.loads(content)
+
+    return decode
@@ -0,0 +1,41 @@
+import json
+import threading
+from pathlib import Path
+from typing import TextIO
+
+
+class JsonLinesExporter:
+    """
+    A request hook writing every request event as a line of JSON.
+
+    Pass it to ``ONC`` or ``AsyncONC`` with ``hooks=[exporter]``. Each line is the event dict described in ``ONC``,
+    e.g. to compute latency percentiles per endpoint offline with pandas. One exporter can be shared
+    by several clients and threads.
+
+    Parameters
+    ----------
+    file : str | Path | TextIO
+        The file the events are appended to, or a text stream (e.g. ``sys.stderr``).
+
+    Examples
+    --------
+    >>> import pandas as pd
+    >>> from onc import ONC, JsonLinesExporter
+    >>> onc = ONC("YOUR_TOKEN_HERE", hooks=[JsonLinesExporter("requests.jsonl")])  # doctest: +SKIP
+    >>> events = pd.read_json("requests.jsonl", lines=True)  # doctest: +SKIP
+    >>> events.groupby("service")["totalTime"].quantile([0.5, 0.95, 0.99])  # doctest: +SKIP
+    """  # noqa: E501
+
+    def __init__(self, file: str | Path | TextIO):
+        self.file = file if hasattr(file, "write") else Path(file)
+        self._lock = threading.Lock()
+
+    def __call__(self, event: dict) -> None:
+        line = json.dumps(event) + "\n"
+        with self._lock:
+            if isinstance(self.file, Path):
+                with open(self.file, "a") as file:
+                    file.write(line)
+            else:
+                self.file.write(line)
+                self.file.flush()
@@ -1,13 +1,28 @@
 import math
 import re
 import weakref
+from concurrent.futures import ThreadPoolExecutor
 from time import time
 
 import dateutil.parser
 import humanize
 
+from ..util.util import (
+    daterangeByDay,
+    daterangeByMonth,
+    daterangeByWeek,
+    daterangeByYear,
+)
 from ._util import _formatDuration
 
+# Date range splitters for time-sharded downloads, by shardBy value
+_daterangeBy = {
+    "day": daterangeByDay,
+    "week": daterangeByWeek,
+    "month": daterangeByMonth,
+    "year": daterangeByYear,
+}
+
 
 # Handles data multi-page downloads (scalardata, rawdata, archivefiles)
 class _MultiPage:
@@ -15,10 +30,23 @@ class _MultiPage:
         self.parent = weakref.ref(parent)
         self.result = None
 
-    def getAllPages(self, service: str, url: str, filters: dict):
+    def getAllPages(
+        self,
+        service: str,
+        url: str,
+        filters: dict,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+        columnar: bool = False,
+    ):
         """
         Requests all pages from the service, with the url and filters
         Multiple pages will be downloaded until completed
+        @param shardBy: If provided ("day", "week", "month" or "year"), the date range
+                        is split into time shards that are downloaded concurrently
+        @param maxWorkers: Number of shards downloaded at the same time
+        @param columnar: If True (scalardata only), pages are accumulated into typed
+                         NumPy arrays per sensor instead of lists
         @return: Service response with concatenated data for all pages obtained
         """
         # pop archivefiles extension
@@ -27,15 +55,28 @@ class _MultiPage:
             extension = filters["extension"]
             del filters["extension"]
 
+        if shardBy is not None:
+            shards = self._shardFilters(filters, shardBy)
+            if len(shards) > 1:
+                return self._getShardedPages(
+                    service, url, shards, extension, shardBy, maxWorkers, columnar
+                )
+
         # download first page
+        report = self.parent()._report
         start = time()
-        response, responseTime = self._doPageRequest(url, filters, service, extension)
+        pages = self._iterPages(service, url, filters, extension)
+        response, timing = next(pages)
+        responseTime = timing["responseTime"]
         rNext = response["next"]
 
+        columns = _newColumns().append(response) if columnar else None
+
         if rNext is not None:
-            print(
-                "Data quantity is greater than the row limit and",
-                "will be downloaded in multiple pages.",
+            report(
+                "message",
+                "Data quantity is greater than the row limit and"
+                " will be downloaded in multiple pages.",
             )
 
             pageCount = 1
@@ -43,80 +84,247 @@ class _MultiPage:
             if pageEstimate > 0:
                 # Exclude the first page when calculating the time estimation
                 timeEstimate = _formatDuration((pageEstimate - 1) * responseTime)
-                print(
-                    f"Downloading time for the first page: {humanize.naturaldelta(responseTime)}"  # noqa: E501
+                report(
+                    "message",
+                    f"Downloading time for the first page: {humanize.naturaldelta(responseTime)}",  # noqa: E501
                 )
-                print(f"Estimated approx. {pageEstimate} pages in total.")
-                print(
-                    f"Estimated approx. {timeEstimate} to complete for the rest of the pages."  # noqa: E501
+                report("message", f"Estimated approx. {pageEstimate} pages in total.")
+                report(
+                    "message",
+                    f"Estimated approx. {timeEstimate} to complete for the rest of the pages.\n",  # noqa: E501
                 )
 
             # keep downloading pages until next is None
-            print("")
+            sensorIndex = {}
             while rNext is not None:
                 pageCount += 1
-                rowCount = self._rowCount(response, service)
-
-                print(f"   ({rowCount} samples) Downloading page {pageCount}...")
-                nextResponse, nextTime = self._doPageRequest(
-                    url, rNext["parameters"], service, extension
+                if columns is not None:
+                    rowCount = columns.rowCount()
+                else:
+                    rowCount = self._rowCount(response, service)
+
+                report(
+                    "page",
+                    f"   ({rowCount} samples) Downloading page {pageCount}...",
+                    service=service,
+                    page=pageCount,
+                    pageEstimate=pageEstimate if pageEstimate > 0 else None,
+                    rowCount=rowCount,
                 )
+                nextResponse, _ = next(pages)
                 rNext = nextResponse["next"]
 
                 # concatenate new data obtained
-                self._catenateData(response, nextResponse, service)
+                if columns is not None:
+                    columns.append(nextResponse)
+                else:
+                    self._catenateData(response, nextResponse, service, sensorIndex)
+
+            if columns is not None:
+                columns.toResponse(response)
 
             totalTime = _formatDuration(time() - start)
-            print(
+            report("done", "", task="pages")
+            report(
+                "message",
                 f"   ({self._rowCount(response, service):d} samples)"
-                f" Completed in {totalTime}."
+                f" Completed in {totalTime}.",
             )
             response["next"] = None
 
+        elif columns is not None:
+            columns.toResponse(response)
+
+        return response
+
+    def iterPages(self, service: str, url: str, filters: dict):
+        """
+        Requests all pages from the service, with the url and filters
+        Yields each page response as soon as it is downloaded, without concatenating
+        them, so that pages can be processed and discarded one at a time
+        """
+        # pop archivefiles extension
+        extension = None
+        if service.startswith("archivefile") and "extension" in filters:
+            extension = filters["extension"]
+            del filters["extension"]
+
+        for response, _ in self._iterPages(service, url, filters, extension):
+            yield response
+
+    def _iterPages(self, service: str, url: str, filters: dict, extension: str):
+        """
+        Yields a tuple (jsonResponse, timing) for each page, following the
+        "next" parameters of the previous page until there are no more pages
+        """
+        page = 1
+        response, timing = self._doPageRequest(url, filters, service, extension, page)
+        yield response, timing
+
+        while response["next"] is not None:
+            page += 1
+            response, timing = self._doPageRequest(
+                url, response["next"]["parameters"], service, extension, page
+            )
+            yield response, timing
+
+    def _shardFilters(self, filters: dict, shardBy: str) -> list[dict]:
+        """
+        Splits the dateFrom/dateTo range of the filters into time shards
+        Returns a list of filters, one per shard, in time order
+        """
+        if shardBy not in _daterangeBy:
+            raise ValueError(
+                f"Invalid shardBy '{shardBy}'. "
+                f"Supported values are {', '.join(_daterangeBy)}."
+            )
+        if not filters.get("dateFrom") or not filters.get("dateTo"):
+            raise ValueError("Both 'dateFrom' and 'dateTo' are required by shardBy.")
+
+        try:
+            dateFrom = dateutil.parser.parse(filters["dateFrom"], ignoretz=True)
+            dateTo = dateutil.parser.parse(filters["dateTo"], ignoretz=True)
+        except (ValueError, OverflowError) as err:
+            raise ValueError(
+                "shardBy requires absolute ISO 8601 'dateFrom' and 'dateTo' dates."
+            ) from err
+
+        return [
+            filters | {"dateFrom": shard["begin"], "dateTo": shard["end"]}
+            for shard in _daterangeBy[shardBy](dateFrom, dateTo)
+            if shard["begin"] != shard["end"]
+        ]
+
+    def _getShardedPages(
+        self,
+        service: str,
+        url: str,
+        shards: list[dict],
+        extension: str,
+        shardBy: str,
+        maxWorkers: int,
+        columnar: bool = False,
+    ):
+        """
+        Downloads all pages of every time shard concurrently
+        Each shard is paginated on its own, and the results are merged in time order
+        @return: Service response with concatenated data for all shards
+        """
+        start = time()
+        self.parent()._report(
+            "message",
+            f"Downloading {len(shards)} time shards (by {shardBy})"
+            f" with {maxWorkers} concurrent workers.",
+        )
+
+        # Merge the shards in time order as they complete
+        merger = _PageMerger(self, service, columnar)
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            for shardResponse in executor.map(
+                lambda shardFilters: self._getShard(
+                    service, url, shardFilters, extension
+                ),
+                shards,
+            ):
+                merger.add(shardResponse)
+        response = merger.result()
+
+        totalTime = _formatDuration(time() - start)
+        self.parent()._report(
+            "message",
+            f"   ({self._rowCount(response, service):d} samples)"
+            f" Completed in {totalTime}.",
+        )
+        response["next"] = None
         return response
 
+    def _getShard(self, service: str, url: str, filters: dict, extension: str):
+        """
+        Requests all pages of a single time shard, without progress messages
+        """
+        merger = _PageMerger(self, service)
+        for response, _ in self._iterPages(service, url, filters, extension):
+            merger.add(response)
+        return merger.result()
+
+    def _isEmpty(self, response, service: str) -> bool:
+        """
+        Returns True if the response has no data rows
+        """
+        if service.startswith("scalardata"):
+            return not response.get("sensorData")
+        elif service.startswith("rawdata"):
+            return not response.get("data") or not response["data"].get("times")
+        elif service.startswith("archivefile"):
+            return not response.get("files")
+        return True
+
     def _doPageRequest(
-        self, url: str, filters: dict, service: str, extension: str = None
+        self,
+        url: str,
+        filters: dict,
+        service: str,
+        extension: str = None,
+        page: int | None = None,
     ):
         """
         Wraps the _doRequest method
         Performs additional processing of the response for certain services
         @param extension: Only provide for archivefiles filtering
-        Returns a tuple (jsonResponse, duration)
+        @param page: Page number, reported to the request hooks
+        Returns a tuple (jsonResponse, timing)
         """
+        response, timing = self.parent()._doRequest(
+            url, filters, getTime=True, page=page
+        )
         if service.startswith("archivefile"):
-            response, duration = self.parent()._doRequest(url, filters, getTime=True)
             response = self.parent()._filterByExtension(response, extension)
-        else:
-            response, duration = self.parent()._doRequest(url, filters, getTime=True)
 
-        return response, duration
+        return response, timing
 
-    def _catenateData(self, response: object, nextResponse: object, service: str):
+    def _catenateData(
+        self,
+        response: object,
+        nextResponse: object,
+        service: str,
+        sensorIndex: dict | None = None,
+    ):
         """
         Concatenates the data results from nextResponse into response
         Compatible with the row structure of different services
+        @param sensorIndex: The scalardata sensors of response by sensorCode, kept by
+                            the caller for the life of the merge so it is built once
         """
         if service.startswith("scalardata"):
-            keys = response["sensorData"][0]["data"].keys()
-
-            for sensorData in response["sensorData"]:
-                sensorCode = sensorData["sensorCode"]
-
-                nextSensor = next(
-                    ns
-                    for ns in nextResponse["sensorData"]
-                    if ns["sensorCode"] == sensorCode
+            nextSensors = nextResponse.get("sensorData") or []
+            if not response.get("sensorData"):
+                response["sensorData"] = nextSensors
+                return
+
+            if sensorIndex is None:
+                sensorIndex = {}
+            if not sensorIndex:
+                sensorIndex.update(
+                    (sensorData["sensorCode"], sensorData)
+                    for sensorData in response["sensorData"]
                 )
-                for key in keys:
-                    sensorData["data"][key] += nextSensor["data"][key]
+            for nextSensor in nextSensors:
+                sensorData = sensorIndex.get(nextSensor["sensorCode"])
+                if sensorData is None:
+                    # sensor not present in the previous pages
+                    response["sensorData"].append(nextSensor)
+                    sensorIndex[nextSensor["sensorCode"]] = nextSensor
+                else:
+                    _extendColumns(sensorData["data"], nextSensor["data"])
 
         elif service.startswith("rawdata"):
-            for key in response["data"]:
-                response["data"][key] += nextResponse["data"][key]
+            if not response.get("data"):
+                response["data"] = nextResponse.get("data")
+            elif nextResponse.get("data"):
+                _extendColumns(response["data"], nextResponse["data"])
 
         elif service.startswith("archivefile"):
-            response["files"] += nextResponse["files"]
+            response["files"].extend(nextResponse["files"])
 
     def _estimatePages(self, response: object, service: str):
         """
@@ -154,6 +362,9 @@ class _MultiPage:
         """
         Returns the number of records in the response
         """
+        if self._isEmpty(response, service):
+            return 0
+
         if service.startswith("scalardata"):
             return len(response["sensorData"][0]["data"]["sampleTimes"])
 
@@ -202,3 +413,76 @@ class _MultiPage:
         dateFirst = dateutil.parser.parse(first)
         dateLast = dateutil.parser.parse(last)
         return dateLast - dateFirst
+
+
+class _PageMerger:
+    """
+    Merges pages (or the responses of time shards) added in time order
+    into the first non-empty one, as soon as they are added
+    """
+
+    def __init__(self, multiPage: _MultiPage, service: str, columnar: bool = False):
+        """
+        @param columnar: If True (scalardata only), the data is accumulated
+                         into typed NumPy arrays per sensor instead of lists
+        """
+        self._multiPage = multiPage
+        self._service = service
+        self._columns = _newColumns() if columnar else None
+        self._sensorIndex = {}
+        self._first = None
+        self._response = None
+
+    def add(self, page: dict):
+        if self._first is None:
+            self._first = page
+        if self._multiPage._isEmpty(page, self._service):
+            return
+        if self._columns is not None:
+            self._columns.append(page)
+        if self._response is None:
+            self._response = page
+        elif self._columns is None:
+            self._multiPage._catenateData(
+                self._response, page, self._service, self._sensorIndex
+            )
+
+    def result(self) -> dict:
+        """
+        Returns the merged response, or the first page if all pages are empty
+        """
+        if self._response is None:
+            return self._first
+        if self._columns is not None:
+            self._columns.toResponse(self._response)
+        return self._response
+
+
+def _extendColumns(data: dict, nextData: dict):
+    """
+    Extends each column list of data with the rows of the same column in nextData
+    Columns missing on either side are padded with None to keep rows aligned
+    """
+    rowCount = len(next(iter(data.values()), []))
+    nextRowCount = len(next(iter(nextData.values()), []))
+
+    for key, column in data.items():
+        nextColumn = nextData.get(key)
+        if nextColumn is None:
+            column.extend([None] * nextRowCount)
+        else:
+            column.extend(nextColumn)
+
+    for key, nextColumn in nextData.items():
+        if key not in data:
+            data[key] = [None] * rowCount + nextColumn
+
+
+def _newColumns():
+    """
+    Returns an empty columnar buffer
+    Imported here so numpy is only loaded when the columnar result mode is used
+    """
+    from ._ScalarColumns import _ScalarColumns
+
+    return _ScalarColumns()
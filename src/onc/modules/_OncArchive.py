@@ -1,12 +1,32 @@
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
+from time import time
 
+import dateutil.parser
 import humanize
 import requests
 
+from ._ArchiveManifest import _ArchiveManifest
 from ._MultiPage import _MultiPage
 from ._OncService import _OncService
-from ._util import _createErrorMessage, _formatDuration, saveAsFile
+from ._util import (
+    _createErrorMessage,
+    _discardPartial,
+    _formatDuration,
+    _formatSize,
+    _isSaved,
+    _partialSize,
+    _rangeHeaders,
+    saveAsFile,
+)
+
+# File names of the manifest, and of the high-water marks of syncArchivefiles,
+# in outPath
+_manifestFileName = ".onc-manifest.json"
+_syncMarksFileName = ".onc-sync.json"
 
 
 class _OncArchive(_OncService):
@@ -17,6 +37,8 @@ class _OncArchive(_OncService):
     def __init__(self, parent: object):
         super().__init__(parent)
 
+        self._archiveManifest = None
+
     def getArchivefileByLocation(self, filters: dict, allPages: bool):
         """
         Return a list of archived files for a device category in a location.
@@ -41,6 +63,16 @@ class _OncArchive(_OncService):
             allPages=allPages,
         )
 
+    def iterArchivefile(self, filters: dict):
+        """
+        Return a generator of archived file list pages, from a device or a location.
+        """
+        return self._delegateByFilters(
+            byDevice=lambda filters: self._iterList(filters, "archivefile/device"),
+            byLocation=lambda filters: self._iterList(filters, "archivefile/location"),
+            filters=filters,
+        )
+
     def getArchivefileUrls(self, filters: dict, allPages: bool) -> list[str]:
         file_list: list[str] = self.getArchivefile(filters, allPages)["files"]
         return list(map(self.getArchivefileUrl, file_list))
@@ -54,6 +86,18 @@ class _OncArchive(_OncService):
         return f"{url}?filename={filename}&token={token}"
 
     def downloadArchivefile(self, filename: str = "", overwrite: bool = False):
+        info, saved = self._downloadArchivefile(filename, overwrite)
+        manifest = self._manifest()
+        if manifest is not None:
+            # saved with the next batch of downloads, or when the ONC object is closed
+            self._addToManifest(manifest, filename, saved["sha256"])
+        return info
+
+    def _downloadArchivefile(self, filename: str, overwrite: bool):
+        """
+        Downloads an archived file
+        Returns the file information, and the result of saveAsFile
+        """
         url = self._serviceUrl("archivefile/download")
 
         filters = {
@@ -61,42 +105,63 @@ class _OncArchive(_OncService):
             "filename": filename,
         }
 
+        outPath: Path = self._config("outPath")
+        if not overwrite and _isSaved(outPath / filename):
+            raise FileExistsError(outPath / filename)
+
+        # Resume from a partial file left by an interrupted download, if any
+        offset = _partialSize(outPath, filename)
+
         # Download the archived file with filename (response contents is binary)
-        response = requests.get(
-            url, filters, timeout=self._config("timeout"), stream=True
+        response = self._config("session").get(
+            url,
+            params=filters,
+            timeout=self._config("timeout"),
+            stream=True,
+            headers=_rangeHeaders(offset),
         )
+        if response.status_code == 416:
+            # The partial file doesn't match the archived file, start over
+            response.close()
+            _discardPartial(outPath, filename)
+            response = self._config("session").get(
+                url, params=filters, timeout=self._config("timeout"), stream=True
+            )
         status = response.status_code
 
-        if response.ok:
+        if status in (200, 206):
             # Save file to output path
-            outPath: Path = self._config("outPath")
-            size, downloadTime = saveAsFile(response, outPath, filename, overwrite)
+            saved = saveAsFile(
+                response, outPath, filename, overwrite, self._config("chunkSize")
+            )
+            size, downloadTime = saved["size"], saved["downloadTime"]
+            self._log(
+                f"Downloaded {_formatSize(size)} in {_formatDuration(downloadTime)}"
+                f" ({_formatSize(saved['throughput'])}/s,"
+                f" {_formatSize(saved['transferSize'])} received)"
+            )
 
         else:
             msg = _createErrorMessage(response)
+            response.close()
             raise requests.HTTPError(msg)
 
-        # Prepare a readable status
-        txtStatus = "error"
-        if status == 200:
-            txtStatus = "completed"
-
-        return {
-            "url": response.url,
-            "status": txtStatus,
-            "size": size,
-            "downloadTime": downloadTime,
-            "file": filename,
-        }
+        return self._fileInfo(response.url, filename, saved), saved
 
     def downloadDirectArchivefile(
-        self, filters: dict, overwrite: bool = False, allPages: bool = False
+        self,
+        filters: dict,
+        overwrite: bool = False,
+        allPages: bool = False,
+        maxWorkers: int = 1,
     ):
         """
         Download a list of archived files that match the filters provided.
 
         This function invokes the method ``getArchivefile`` to obtain a list of files,
         and the method ``downloadArchivefile`` to download all files found.
+        If maxWorkers is greater than 1, files are downloaded concurrently
+        on a thread pool of that size.
 
         See https://wiki.oceannetworks.ca/display/O2A/archivefiles
         for usage and available filters.
@@ -109,47 +174,339 @@ class _OncArchive(_OncService):
         dataRows = self.getArchivefile(filters, allPages)
 
         n = len(dataRows["files"])
-        print(f"Obtained a list of {n} files to download.")
-
-        # Download the files obtained
-        tries = 1
-        successes = 0
-        size = 0
-        time = 0
-        downInfos = []
-        for filename in dataRows["files"]:
+        self._report("message", f"Obtained a list of {n} files to download.")
+
+        # Decide which files to download, keeping a slot per file
+        # so results are reported in the original order
+        manifest = self._manifest()
+        savedFiles = self._savedFiles()
+        downInfos = [None] * n
+        pending = []
+        for i, filename in enumerate(dataRows["files"]):
             # only download if file doesn't exist (or overwrite is True)
-            outPath: Path = self._config("outPath")
-            filePath = outPath / filename
-            fileExists = os.path.exists(filePath)
-
-            if not fileExists or os.path.getsize(filePath) == 0 or overwrite:
-                print(f'   ({tries} of {n}) Downloading file: "{filename}"')
-                downInfo = self.downloadArchivefile(filename, overwrite)
-                size += downInfo["size"]
-                time += downInfo["downloadTime"]
-                downInfos.append(downInfo)
-                successes += 1
-                tries += 1
+            if overwrite or not self._isDownloaded(filename, manifest, savedFiles):
+                pending.append((i, filename))
             else:
-                print(f'   Skipping "{filename}": File already exists.')
-                downInfo = {
-                    "url": self.getArchivefileUrl(filename),
-                    "status": "skipped",
-                    "size": 0,
-                    "downloadTime": 0,
-                    "file": filename,
-                }
-                downInfos.append(downInfo)
-
-        print(f"{successes} files ({humanize.naturalsize(size)}) downloaded")
-        print(f"Total Download Time: {_formatDuration(time)}")
+                self._report(
+                    "file",
+                    f'   Skipping "{filename}": File already exists.',
+                    file=filename,
+                    index=i + 1,
+                    total=n,
+                    status="skipped",
+                )
+                downInfos[i] = self._fileInfo(
+                    self.getArchivefileUrl(filename), filename
+                )
+
+        def download(i: int, filename: str):
+            info, saved = self._downloadArchivefile(filename, overwrite)
+            if manifest is not None:
+                self._addToManifest(manifest, filename, saved["sha256"])
+            self._report(
+                "file",
+                f'   ({i + 1} of {n}) Downloaded file: "{filename}"',
+                file=filename,
+                index=i + 1,
+                total=n,
+                status="downloaded",
+            )
+            return info
+
+        # Download the files obtained
+        start = time()
+        try:
+            infos = self._downloadEach(download, pending, maxWorkers)
+            for (i, _), info in zip(pending, infos, strict=True):
+                downInfos[i] = info
+        finally:
+            # keep the files downloaded so far, even if a download failed
+            if manifest is not None:
+                manifest.save()
+        wallTime = time() - start
+
+        successes = len(pending)
+        size = sum(downInfos[i]["size"] for i, _ in pending)
+        downloadTime = sum(downInfos[i]["downloadTime"] for i, _ in pending)
+
+        self._reportDownloads(successes, size, downloadTime, wallTime, maxWorkers)
+
+        return {
+            "downloadResults": downInfos,
+            "stats": {
+                "totalSize": size,
+                "downloadTime": downloadTime,
+                "wallTime": round(wallTime, 3),
+                "fileCount": successes,
+            },
+        }
+
+    def syncArchivefiles(
+        self,
+        filters: dict,
+        since: str | None = None,
+        prune: bool = False,
+        maxWorkers: int = 4,
+    ):
+        """
+        Mirrors the archived files that match the filters into outPath
+        Lists the files from since, or from the high-water mark of the last sync with
+        the same filters, and downloads the new files and the files whose size or
+        dateFrom changed, according to the manifest of outPath
+        If prune, the files synced before in the listed time window that are not
+        listed anymore are deleted
+        """
+        outPath: Path = self._config("outPath")
+        manifest = self._manifest(required=True)
+        key = _syncKey(filters)
+        marksPath = outPath / _syncMarksFileName
+        marks = _readMarks(marksPath)
+
+        listFilters = {k: v for k, v in filters.items() if k != "returnOptions"}
+        listFilters["returnOptions"] = "all"
+        since = since or marks.get(key)
+        if since is not None:
+            listFilters["dateFrom"] = since
+        listFilters.setdefault("dateTo", _utcNow())
+        dateFrom, dateTo = listFilters.get("dateFrom"), listFilters["dateTo"]
+
+        rows = self.getArchivefile(listFilters, allPages=True)["files"]
+        savedFiles = self._savedFiles()
+        pending = [
+            row for row in rows if self._isChanged(row, manifest, key, savedFiles)
+        ]
+        n = len(pending)
+        self._report(
+            "message",
+            f"Obtained a list of {len(rows)} files from {dateFrom or 'the start'}"
+            f" to {dateTo}, {n} new or changed.",
+        )
+
+        def download(i: int, row: dict):
+            filename = row["filename"]
+            info, saved = self._downloadArchivefile(filename, overwrite=True)
+            self._addToManifest(
+                manifest, filename, saved["sha256"], dateFrom=row["dateFrom"], sync=key
+            )
+            self._report(
+                "file",
+                f'   ({i + 1} of {n}) Downloaded file: "{filename}"',
+                file=filename,
+                index=i + 1,
+                total=n,
+                status="downloaded",
+            )
+            return info
+
+        start = time()
+        pruned = []
+        try:
+            downInfos = self._downloadEach(download, enumerate(pending), maxWorkers)
+            if prune:
+                listed = {row["filename"] for row in rows}
+                pruned = self._pruneSynced(manifest, key, listed, dateFrom, dateTo)
+        finally:
+            manifest.save()
+        wallTime = time() - start
+
+        # The last file may still grow, so the next sync lists it again
+        if rows:
+            marks[key] = max((row["dateFrom"] for row in rows), key=_parseDate)
+            _writeMarks(marksPath, marks)
+
+        size = sum(info["size"] for info in downInfos)
+        downloadTime = sum(info["downloadTime"] for info in downInfos)
+        self._report("done", "", task="files")
+        self._report(
+            "message",
+            f"{n} files ({humanize.naturalsize(size)}) downloaded,"
+            f" {len(pruned)} pruned",
+        )
+        self._report("message", f"Elapsed Time: {_formatDuration(wallTime)}")
 
         return {
             "downloadResults": downInfos,
-            "stats": {"totalSize": size, "downloadTime": time, "fileCount": successes},
+            "pruned": pruned,
+            "stats": {
+                "totalSize": size,
+                "downloadTime": downloadTime,
+                "wallTime": round(wallTime, 3),
+                "fileCount": n,
+                "skipped": len(rows) - n,
+                "dateFrom": dateFrom,
+                "dateTo": dateTo,
+            },
+        }
+
+    def _reportDownloads(
+        self,
+        successes: int,
+        size: int,
+        downloadTime: float,
+        wallTime: float,
+        maxWorkers: int,
+    ):
+        """
+        Reports the totals of the files downloaded by downloadDirectArchivefile
+        """
+        self._report("done", "", task="files")
+        self._report(
+            "message", f"{successes} files ({humanize.naturalsize(size)}) downloaded"
+        )
+        self._report("message", f"Total Download Time: {_formatDuration(downloadTime)}")
+        if maxWorkers > 1:
+            self._report("message", f"Elapsed Time: {_formatDuration(wallTime)}")
+
+    def _isChanged(
+        self, row: dict, manifest: _ArchiveManifest, key: str, savedFiles: set
+    ) -> bool:
+        """
+        Returns True if the archived file of a row of the list (with returnOptions
+        "all") is not in outPath, or differs by size or dateFrom from the manifest
+        @param savedFiles: The file names in outPath, from _savedFiles
+        """
+        filename = row["filename"]
+        if filename not in savedFiles:
+            return True
+        entry = manifest.get(filename)
+        if entry is None:
+            # a file downloaded before outPath had a manifest, checked once
+            filePath = self._config("outPath") / filename
+            if filePath.stat().st_size != row["fileSize"]:
+                return True
+            self._addToManifest(
+                manifest, filename, None, dateFrom=row["dateFrom"], sync=key
+            )
+            return False
+        # entries added by downloadDirectArchivefile have no dateFrom
+        return (
+            entry["size"] != row["fileSize"]
+            or entry.get("dateFrom", row["dateFrom"]) != row["dateFrom"]
+        )
+
+    def _pruneSynced(
+        self,
+        manifest: _ArchiveManifest,
+        key: str,
+        listed: set,
+        dateFrom: str | None,
+        dateTo: str,
+    ) -> list[str]:
+        """
+        Deletes the files synced with the key, in the time window from dateFrom to
+        dateTo, that are not listed anymore
+        Returns their file names
+        """
+        begin = _parseDate(dateFrom) if dateFrom is not None else None
+        end = _parseDate(dateTo)
+        pruned = []
+        for filename in manifest.filenames():
+            entry = manifest.get(filename)
+            if entry.get("sync") != key or filename in listed:
+                continue
+            fileFrom = _parseDate(entry["dateFrom"])
+            if (begin is not None and fileFrom < begin) or fileFrom >= end:
+                continue
+            (self._config("outPath") / filename).unlink(missing_ok=True)
+            manifest.remove(filename)
+            pruned.append(filename)
+            self._report("message", f'   Pruned file: "{filename}"')
+        return pruned
+
+    def _downloadEach(self, download, items, maxWorkers: int) -> list:
+        """
+        Calls download with each item (a tuple of arguments), on a pool of
+        maxWorkers threads if maxWorkers > 1
+        Returns the results in the order of the items
+        """
+        items = list(items)
+        if maxWorkers <= 1 or len(items) <= 1:
+            return [download(*item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            futures = [executor.submit(download, *item) for item in items]
+            try:
+                return [future.result() for future in futures]
+            except BaseException:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+
+    def _fileInfo(self, url: str, filename: str, saved: dict | None = None) -> dict:
+        """
+        Returns the information of a downloaded file, or of a skipped file if
+        saved (the result of saveAsFile) is None
+        """
+        return {
+            "url": url,
+            "status": "skipped" if saved is None else "completed",
+            "size": 0 if saved is None else saved["size"],
+            "transferSize": 0 if saved is None else saved["transferSize"],
+            "downloadTime": 0 if saved is None else saved["downloadTime"],
+            "file": filename,
         }
 
+    def _manifest(self, required: bool = False) -> _ArchiveManifest | None:
+        """
+        Returns the manifest of outPath, or None if it's disabled
+        @param required: If True, returns the manifest even if it's disabled
+        """
+        if not required and not self._config("archiveManifest"):
+            return None
+        path = self._config("outPath") / _manifestFileName
+        if self._archiveManifest is None or self._archiveManifest.path != path:
+            self._archiveManifest = _ArchiveManifest(path)
+        return self._archiveManifest
+
+    def _isDownloaded(
+        self, filename: str, manifest: _ArchiveManifest | None, savedFiles: set
+    ) -> bool:
+        """
+        Returns True if the file was already downloaded to outPath
+        Files of the manifest are skipped without a stat. Files missing from the
+        manifest are checked in outPath, and added to the manifest if they are
+        found. Files of the manifest deleted from outPath are removed from it
+        @param savedFiles: The file names in outPath, from _savedFiles
+        """
+        if filename not in savedFiles:
+            if manifest is not None:
+                manifest.remove(filename)
+            return False
+        if manifest is not None and manifest.get(filename) is not None:
+            return True
+
+        if os.path.getsize(self._config("outPath") / filename) == 0:
+            return False
+        if manifest is not None:
+            self._addToManifest(manifest, filename, None)
+        return True
+
+    def _savedFiles(self) -> set:
+        """
+        Returns the names of the files in outPath, listed with a single directory scan
+        """
+        try:
+            with os.scandir(self._config("outPath")) as entries:
+                return {entry.name for entry in entries if entry.is_file()}
+        except FileNotFoundError:
+            return set()
+
+    def _saveManifest(self):
+        """
+        Writes the manifest if files were added to it since it was saved
+        """
+        if self._archiveManifest is not None:
+            self._archiveManifest.save()
+
+    def _addToManifest(
+        self, manifest: _ArchiveManifest, filename: str, checksum: str | None, **fields
+    ):
+        """
+        Adds a file of outPath to the manifest, with its size and modification time
+        """
+        stat = (self._config("outPath") / filename).stat()
+        url = f"{self._serviceUrl('archivefile/download')}?filename={filename}"
+        manifest.add(filename, stat.st_size, stat.st_mtime, checksum, url, **fields)
+
     def _getList(
         self, filters: dict, service: str = "location", allPages: bool = False
     ):
@@ -175,6 +532,15 @@ class _OncArchive(_OncService):
             result = self._filterByExtension(result, extension)
         return result
 
+    def _iterList(self, filters: dict, service: str):
+        """
+        Return a generator yielding archived file list pages as they are downloaded.
+        """
+        url = self._serviceUrl(service)
+        filters2 = filters.copy()
+        filters2["token"] = self._config("token")
+        return _MultiPage(self).iterPages(service, url, filters2)
+
     def _filterByExtension(self, results: dict, extension: str):
         """
         Filter results to only those where filenames end with the extension
@@ -204,3 +570,43 @@ class _OncArchive(_OncService):
         results["files"] = filtered
 
         return results
+
+
+def _syncKey(filters: dict) -> str:
+    """
+    Returns the key of the high-water mark of a sync: the filters without the token
+    and the time window
+    """
+    ignored = ("token", "dateFrom", "dateTo", "returnOptions")
+    return json.dumps(
+        {k: v for k, v in filters.items() if k not in ignored}, sort_keys=True
+    )
+
+
+def _readMarks(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _writeMarks(path: Path, marks: dict):
+    """
+    Writes the high-water marks, replacing the file atomically
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tempPath = path.with_name(f"{path.name}.tmp")
+    tempPath.write_text(json.dumps(marks, indent=2))
+    os.replace(tempPath, path)
+
+
+def _parseDate(date: str) -> datetime:
+    return dateutil.parser.parse(date, ignoretz=True)
+
+
+def _utcNow() -> str:
+    """
+    Returns the current UTC time in the format of the API, e.g. 2020-01-01T00:00:00.000Z
+    """
+    now = datetime.now(timezone.utc)
+    return now.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
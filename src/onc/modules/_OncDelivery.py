@@ -1,14 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
+from itertools import repeat
+from pathlib import Path
 from time import sleep, time
 from warnings import warn
 
 import humanize
 import requests
 
-from ._DataProductFile import _DataProductFile
+from ._DataProductFile import MaxRetriesException, _DataProductFile
 from ._OncService import _OncService
+from ._OrderJournal import _OrderJournal
 from ._PollLog import _PollLog
-from ._util import _createErrorMessage, _formatSize
+from ._PollScheduler import _parseProcessingTime, _PollScheduler
+from ._ProductOrder import _ProductOrder
+from ._RetryPolicy import RetryPolicy
+from ._util import _createErrorMessage, _formatDuration, _formatSize, _hasPartials
+
+# File name of the order journal in outPath
+_journalFileName = "onc-orders.jsonl"
+
+# Errors interrupting a file download, which can be resumed
+_interruptedDownloadErrors = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
 
 
 class _OncDelivery(_OncService):
@@ -19,9 +36,15 @@ class _OncDelivery(_OncService):
     def __init__(self, parent: object):
         super().__init__(parent)
 
-        # Default seconds to wait between consecutive download tries of a file
-        # (when no estimate processing time is available)
-        self.pollPeriod = 2.0
+        # Estimated epoch time the data products are ready at, by dpRequestId,
+        # and by runId once they run
+        self._readyTimes = {}
+        self._runReadyTimes = {}
+
+        # Number of files of the data product runs counted, by runId
+        self._fileCounts = {}
+
+        self._orderJournal = None
 
     def orderDataProduct(
         self,
@@ -30,14 +53,101 @@ class _OncDelivery(_OncService):
         downloadResultsOnly: bool,
         includeMetadataFile: bool,
         overwrite: bool,
+        maxWorkers: int = 4,
     ):
-        fileList = []
         # Request the product
-        requestData = self.requestDataProduct(filters)
+        dpRequestId = self.requestDataProduct(filters)["dpRequestId"]
+        journal = self._journal()
+        if journal is not None:
+            journal.request(
+                dpRequestId,
+                filters,
+                _orderOptions(downloadResultsOnly, includeMetadataFile),
+            )
+
+        return self._fulfilOrder(
+            dpRequestId,
+            None,
+            maxRetries,
+            downloadResultsOnly,
+            includeMetadataFile,
+            overwrite,
+            maxWorkers,
+        )
+
+    def resumeOrders(self, maxRetries: int, overwrite: bool, maxWorkers: int = 4):
+        """
+        Continues the orders of the journal that are not complete, without
+        requesting their data products again
+        Files already downloaded are kept if their size and modification time
+        match the journal
+        Returns the result of each order, in the format of orderDataProducts
+        """
+        journal = self._journal()
+        if journal is None:
+            raise ValueError(
+                "Resuming orders requires an order journal. "
+                "Create the ONC object with orderJournal=True."
+            )
+
+        results = []
+        for dpRequestId, order in journal.orders().items():
+            if order["complete"]:
+                continue
+            self._report("message", f"\nResuming data product request {dpRequestId}")
+            runData = None
+            if order["runIds"]:
+                runData = {
+                    "runIds": order["runIds"],
+                    "fileCount": order["fileCount"],
+                    "runTime": 0,
+                    "requestCount": 0,
+                }
+            status, error = "complete", None
+            result = self._formatResult([], {"runTime": 0, "requestCount": 0})
+            try:
+                result = self._fulfilOrder(
+                    dpRequestId,
+                    runData,
+                    maxRetries,
+                    order["options"]["downloadResultsOnly"],
+                    order["options"]["includeMetadataFile"],
+                    overwrite,
+                    maxWorkers,
+                )
+            except (requests.RequestException, MaxRetriesException, TimeoutError) as ex:
+                status, error = "error", str(ex)
+                self._report(
+                    "message", f"   Data product {dpRequestId}: error ({error})"
+                )
+            results.append(
+                {"dpRequestId": dpRequestId, "status": status, "error": error} | result
+            )
+        return results
+
+    def _fulfilOrder(
+        self,
+        dpRequestId: int,
+        runData: dict | None,
+        maxRetries: int,
+        downloadResultsOnly: bool,
+        includeMetadataFile: bool,
+        overwrite: bool,
+        maxWorkers: int,
+    ):
+        """
+        Runs the data product of an order and downloads its files
+        @param runData: The runs of the product if it already runs (when resumed),
+                        or None to run it
+        """
+        fileList = []
+        journal = self._journal()
 
         if downloadResultsOnly:
             # Only run and return links
-            runData = self.runDataProduct(requestData["dpRequestId"], waitComplete=True)
+            runData = self.runDataProduct(dpRequestId, waitComplete=True)
+            if journal is not None:
+                journal.run(dpRequestId, runData["runIds"], runData["fileCount"])
             for runId in runData["runIds"]:
                 fileList.extend(
                     self._infoForProductFiles(
@@ -46,19 +156,28 @@ class _OncDelivery(_OncService):
                 )
         else:
             # Run and download files
-            runData = self.runDataProduct(
-                requestData["dpRequestId"], waitComplete=False
-            )
+            if runData is None:
+                runData = self.runDataProduct(dpRequestId, waitComplete=False)
+                if journal is not None:
+                    journal.run(dpRequestId, runData["runIds"], runData["fileCount"])
+            # fileCount is the one of the first run, and unknown until it's complete
+            fileCount = runData["fileCount"] if len(runData["runIds"]) == 1 else 0
             for runId in runData["runIds"]:
                 fileList.extend(
                     self._downloadProductFiles(
-                        runId, includeMetadataFile, maxRetries, overwrite
+                        runId,
+                        includeMetadataFile,
+                        maxRetries,
+                        overwrite,
+                        fileCount,
+                        maxWorkers,
                     )
                 )
 
-            print("")
-            self._printProductOrderStats(fileList, runData)
+            self._reportProductOrderStats(fileList, runData)
 
+        if journal is not None:
+            journal.complete(dpRequestId)
         return self._formatResult(fileList, runData)
 
     def requestDataProduct(self, filters: dict):
@@ -69,8 +188,8 @@ class _OncDelivery(_OncService):
         url = f"{self._config('baseUrl')}api/dataProductDelivery/request"
         response = self._doRequest(url, filters)
 
-        self._estimatePollPeriod(response)
-        self._printProductRequest(response)
+        self._recordEstimate(response)
+        self._reportProductRequest(response)
         return response
 
     def checkDataProduct(self, dpRequestId: int):
@@ -88,56 +207,206 @@ class _OncDelivery(_OncService):
         Return a dictionary with information of the run process.
         """
         status = ""
-        log = _PollLog(True)
-        print(
-            f"To cancel the running data product, run 'onc.cancelDataProduct({dpRequestId})'"  # noqa: E501
+        log = _PollLog(self._config("reporter"))
+        self._report(
+            "message",
+            f"To cancel the running data product, run 'onc.cancelDataProduct({dpRequestId})'",  # noqa: E501
         )
-        url = f"{self._config('baseUrl')}api/dataProductDelivery/run"
         runResult = {"runIds": [], "fileCount": 0, "runTime": 0, "requestCount": 0}
+        poll = self._pollScheduler(self._readyTimes.get(dpRequestId))
 
         start = time()
         while status != "complete":
-            response = requests.get(
-                url,
-                {
-                    "token": self._config("token"),
-                    "dpRequestId": dpRequestId,
-                },
-                timeout=self._config("timeout"),
-            )
-            code = response.status_code
+            code, data = self._runRequest(dpRequestId)
             runResult["requestCount"] += 1
 
-            if response.ok:
-                data = response.json()
-            else:
-                raise requests.HTTPError(_createErrorMessage(response))
-
             if waitComplete:
                 status = data[0]["status"]
                 log.logMessage(data)
                 if status == "cancelled":
                     break
                 if code != 200:
-                    sleep(self.pollPeriod)
+                    poll.wait(status)
             else:
                 status = "complete"
 
-        # self.print(data)
-        # print('got filecount {}'.format(data[0]['fileCount']))
+        # end the status line after the process finishes
+        if waitComplete:
+            log.done()
+
+        return self._recordRuns(dpRequestId, data, runResult, start)
+
+    def _recordRuns(self, dpRequestId: int, data: list, runResult: dict, start: float):
+        """
+        Completes the run result with the runs of the last "run" response
+        The runs are polled around the time their request is estimated to be ready
+        """
         runResult["fileCount"] = data[0]["fileCount"]
         runResult["runTime"] = time() - start
 
-        # print a new line after the process finishes
-        if waitComplete:
-            print("")
-
         # gather a list of runIds
         for run in data:
             runResult["runIds"].append(run["dpRunId"])
+            if dpRequestId in self._readyTimes:
+                self._runReadyTimes[run["dpRunId"]] = self._readyTimes[dpRequestId]
 
         return runResult
 
+    def _runRequest(self, dpRequestId: int):
+        """
+        Sends a request to the "run" method, which starts the run of a product
+        request, or returns its status if it is already running
+        Returns a tuple of the response status code and the list of runs
+        """
+        url = f"{self._config('baseUrl')}api/dataProductDelivery/run"
+        response = self._config("session").get(
+            url,
+            params={
+                "token": self._config("token"),
+                "dpRequestId": dpRequestId,
+            },
+            timeout=self._config("timeout"),
+        )
+        if not response.ok:
+            raise requests.HTTPError(_createErrorMessage(response))
+        return response.status_code, self._config("jsonDecoder")(response.content)
+
+    def orderDataProducts(
+        self,
+        filtersList: list[dict],
+        maxRetries: int,
+        downloadResultsOnly: bool,
+        includeMetadataFile: bool,
+        overwrite: bool,
+        maxWorkers: int = 4,
+    ):
+        """
+        Orders several data products at once
+        All the products are requested, then a single loop runs and polls the
+        products that are not complete, each at its own poll period, and hands every
+        completed product to a pool of maxWorkers threads that download its files
+        Returns one result per filters, in the format of orderDataProduct,
+        with the dpRequestId, the final status and the error message of the order
+        """
+        orders = [_ProductOrder(filters) for filters in filtersList]
+        start = time()
+
+        with ThreadPoolExecutor(max_workers=max(maxWorkers, 1)) as executor:
+            try:
+                options = _orderOptions(downloadResultsOnly, includeMetadataFile)
+                list(executor.map(self._requestOrder, orders, repeat(options)))
+
+                downloads = []
+                running = [order for order in orders if order.isRunning()]
+                while running:
+                    for order in running:
+                        if order.nextPoll <= time():
+                            self._pollOrder(order)
+                        if order.status == "complete":
+                            download = executor.submit(
+                                self._downloadOrder,
+                                order,
+                                maxRetries,
+                                downloadResultsOnly,
+                                includeMetadataFile,
+                                overwrite,
+                            )
+                            downloads.append(download)
+
+                    running = [order for order in running if order.isRunning()]
+                    if running:
+                        nextPoll = min(order.nextPoll for order in running)
+                        sleep(max(nextPoll - time(), 0))
+
+                for download in downloads:
+                    download.result()
+            except BaseException:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+
+        self._reportBatchStats(orders, time() - start)
+        return [
+            {
+                "dpRequestId": order.dpRequestId,
+                "status": order.status,
+                "error": order.error,
+            }
+            | self._formatResult(order.fileList, order.runData)
+            for order in orders
+        ]
+
+    def _requestOrder(self, order: _ProductOrder, options: dict):
+        """
+        Requests the data product of a batch order
+        @param options: The options of the order recorded in the journal
+        """
+        try:
+            response = self.requestDataProduct(order.filters)
+        except requests.RequestException as error:
+            order.fail(error)
+            self._report("message", f"   Data product request failed: {error}")
+            return
+        order.dpRequestId = response["dpRequestId"]
+        order.scheduler = self._pollScheduler(self._readyTimes.get(order.dpRequestId))
+        journal = self._journal()
+        if journal is not None:
+            journal.request(order.dpRequestId, order.filters, options)
+
+    def _pollOrder(self, order: _ProductOrder):
+        """
+        Runs or polls the data product of a batch order
+        """
+        try:
+            _, data = self._runRequest(order.dpRequestId)
+            changed = order.update(data)
+        except (requests.RequestException, TimeoutError) as error:
+            order.fail(error)
+        else:
+            if not changed:
+                return
+            journal = self._journal()
+            if order.status == "complete" and journal is not None:
+                runData = order.runData
+                journal.run(order.dpRequestId, runData["runIds"], runData["fileCount"])
+        self._report(
+            "message",
+            f"   Data product {order.dpRequestId}: {order.error or order.status}",
+        )
+
+    def _downloadOrder(
+        self,
+        order: _ProductOrder,
+        maxRetries: int,
+        downloadResultsOnly: bool,
+        includeMetadataFile: bool,
+        overwrite: bool,
+    ):
+        """
+        Downloads the files of a completed batch order, or their information
+        """
+        runData = order.runData
+        # fileCount is the one of the first run
+        fileCount = runData["fileCount"] if len(runData["runIds"]) == 1 else 0
+        try:
+            for runId in runData["runIds"]:
+                if downloadResultsOnly:
+                    files = self._infoForProductFiles(
+                        runId, fileCount, includeMetadataFile, 1
+                    )
+                else:
+                    files = self._downloadProductFiles(
+                        runId, includeMetadataFile, maxRetries, overwrite, fileCount, 1
+                    )
+                order.fileList.extend(files)
+            journal = self._journal()
+            if journal is not None:
+                journal.complete(order.dpRequestId)
+        except (requests.RequestException, MaxRetriesException, TimeoutError) as error:
+            order.fail(error)
+            self._report(
+                "message", f"   Data product {order.dpRequestId}: error ({error})"
+            )
+
     def cancelDataProduct(self, dpRequestId: int):
         url = f"{self._config('baseUrl')}api/dataProductDelivery/cancel"
         filters = {
@@ -163,15 +432,18 @@ class _OncDelivery(_OncService):
         downloadResultsOnly: bool,
         includeMetadataFile: bool,
         overwrite: bool,
+        maxWorkers: int = 4,
     ):
         """
         Wrapper for downloadProductFiles that downloads data products with a runId.
         """
         if downloadResultsOnly:
-            fileData = self._infoForProductFiles(runId, 0, includeMetadataFile)
+            fileData = self._infoForProductFiles(
+                runId, 0, includeMetadataFile, maxWorkers
+            )
         else:
             fileData = self._downloadProductFiles(
-                runId, includeMetadataFile, maxRetries, overwrite
+                runId, includeMetadataFile, maxRetries, overwrite, 0, maxWorkers
             )
 
         return fileData
@@ -183,78 +455,186 @@ class _OncDelivery(_OncService):
         maxRetries: int,
         overwrite: bool,
         fileCount: int = 0,
+        maxWorkers: int = 4,
     ):
-        fileList = []
-        index = 1
-        baseUrl = self._config("baseUrl")
-        token = self._config("token")
-
-        # keep increasing index until fileCount or until we get 404
-        doLoop = True
-        timeout = self._config("timeout")
-        print(f"\nDownloading data product files with runId {runId}...")
-
-        dpf = _DataProductFile(runId, str(index), baseUrl, token)
-
-        # loop thorugh file indexes
-        while doLoop:
-            # stop after too many retries
-            status = dpf.download(
-                timeout,
-                self.pollPeriod,
-                self._config("outPath"),
-                maxRetries,
-                overwrite,
-            )
-
-            if status == 200 or status == 777:
-                # file was downloaded (200), or skipped before downloading (777)
-                fileList.append(dpf.getInfo())
-                index += 1
-                dpf = _DataProductFile(runId, str(index), baseUrl, token)
+        """
+        Downloads the files of a data product run, up to maxWorkers at the same time
+        The first file is downloaded alone, since it waits until the run is complete
+        @param fileCount: Number of files of the run if known (e.g. from
+                          runDataProduct), otherwise the files are downloaded in
+                          batches of maxWorkers indexes until one is not found
+        """
+        self._report(
+            "message", f"\nDownloading data product files with runId {runId}..."
+        )
+        # Files resumed from their partial file need a HEAD request to learn their
+        # name, so it's only sent if there are partial files in outPath
+        options = (maxRetries, overwrite, _hasPartials(self._config("outPath")))
 
-            elif status != 202 or (fileCount > 0 and index >= fileCount):
-                # no more files to download
-                doLoop = False
+        fileList = []
+        maxWorkers = max(maxWorkers, 1)
+        info = self._downloadProductFile(runId, "1", *options)
+        if info is not None:
+            fileList.append(info)
+
+            with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+                try:
+                    if fileCount > 0:
+                        infos = self._downloadProductFileBatch(
+                            executor, runId, range(2, fileCount + 1), *options
+                        )
+                        fileList.extend(info for info in infos if info is not None)
+                    else:
+                        index = 2
+                        while True:
+                            infos = self._downloadProductFileBatch(
+                                executor,
+                                runId,
+                                range(index, index + maxWorkers),
+                                *options,
+                            )
+                            # files saved after a missing index are kept too
+                            fileList.extend(info for info in infos if info is not None)
+                            if None in infos:
+                                break
+                            index += maxWorkers
+                except BaseException:
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    raise
 
         # get metadata if required
         if getMetadata:
-            dpf = _DataProductFile(runId, "meta", baseUrl, token)
             try:
-                status = dpf.download(
-                    timeout,
-                    self.pollPeriod,
-                    self._config("outPath"),
-                    maxRetries,
-                    overwrite,
-                )
-                if status == 200 or status == 777:
-                    fileList.append(dpf.getInfo())
-                    doLoop = False
+                info = self._downloadProductFile(runId, "meta", *options)
+                if info is not None:
+                    fileList.append(info)
             except Exception as ex:
                 warn(
                     f"Metadata file not downloaded.  Reason: {type(ex)}" + str(ex),
                     RuntimeWarning,
                     stacklevel=2,
                 )
+                dpf = self._productFile(runId, "meta")
                 fileList.append(dpf.getInfo())
 
+        self._report("done", "", task="files")
         return fileList
 
-    def _infoForProductFiles(self, dpRunId: int, fileCount: int, getMetadata: bool):
+    def _downloadProductFileBatch(
+        self,
+        executor: ThreadPoolExecutor,
+        runId: int,
+        indexes: range,
+        maxRetries: int,
+        overwrite: bool,
+        findPartial: bool,
+    ) -> list:
+        """
+        Downloads the files at indexes concurrently
+        Returns their information in index order, None for the files not found
+        """
+        futures = [
+            executor.submit(
+                self._downloadProductFile,
+                runId,
+                str(index),
+                maxRetries,
+                overwrite,
+                findPartial,
+            )
+            for index in indexes
+        ]
+        return [future.result() for future in futures]
+
+    def _downloadProductFile(
+        self,
+        runId: int,
+        index: str,
+        maxRetries: int,
+        overwrite: bool,
+        findPartial: bool = False,
+    ) -> dict | None:
+        """
+        Downloads a single data product file, polling until it is ready
+        A download interrupted by a connection error is retried according to the
+        retry policy of the session, and resumed from its partial file
+        @param findPartial: If True, the partial file of a previous process is
+                            looked for, with a HEAD request to learn the file name
+        Returns the file information, or None if there is no file at index
+        """
+        journal = self._journal()
+        if journal is not None:
+            record = journal.downloadedFile(runId, index, self._config("outPath"))
+            if record is not None:
+                dpf = self._productFile(runId, index)
+                dpf.setSkipped(record["file"], record["size"])
+                return dpf.getInfo()
+
+        session = self._config("session")
+        policy = session.retryPolicy
+        # one scheduler for all attempts, so retries keep the backoff and deadline
+        poll = self._pollScheduler(self._runReadyTimes.get(runId))
+        attempt = 1
+        filePath = ""
+        while True:
+            dpf = self._productFile(runId, index)
+            # the file name learned by an interrupted attempt resumes its partial file
+            dpf._filePath = filePath
+            try:
+                status = dpf.download(
+                    self._config("timeout"),
+                    poll,
+                    self._config("outPath"),
+                    maxRetries,
+                    overwrite,
+                    self._config("chunkSize"),
+                    findPartial,
+                )
+            except _interruptedDownloadErrors as error:
+                filePath = dpf._filePath
+                delay = _retryDelay(policy, runId, index, attempt, error)
+                if delay is None:
+                    raise
+                sleep(delay)
+                attempt += 1
+                continue
+
+            # file was downloaded (200), or skipped before downloading (777)
+            if status not in (200, 777):
+                return None
+            info = dpf.getInfo()
+            if journal is not None:
+                journal.file(runId, info, self._config("outPath"), dpf._sha256)
+            return info
+
+    def _productFile(self, runId: int, index: str) -> _DataProductFile:
+        return _DataProductFile(
+            runId,
+            index,
+            self._config("baseUrl"),
+            self._config("token"),
+            self._config("session"),
+            self._config("reporter"),
+            self._config("jsonDecoder"),
+        )
+
+    def _infoForProductFiles(
+        self, dpRunId: int, fileCount: int, getMetadata: bool, maxWorkers: int = 4
+    ):
         """
         Returns a list of information dictionaries for each file available for download.
 
         Returned rows will have the same structure as those returned by
         _DataProductFile.getInfo().
         """
-        print(
-            f"\nObtaining download information for data product files with runId {dpRunId}..."  # noqa: E501
+        self._report(
+            "message",
+            f"\nObtaining download information for data product files with runId {dpRunId}...",  # noqa: E501
         )
 
         # If we don't know the fileCount, get it from the server (takes longer)
         if fileCount <= 0:
-            fileCount = self._countFilesInProduct(dpRunId)
+            fileCount = self._countFilesInProduct(dpRunId, maxWorkers)
 
         # Build a file list of data product file information
         fileList = []
@@ -268,97 +648,124 @@ class _OncDelivery(_OncService):
                 index=str(index),
                 baseUrl=self._config("baseUrl"),
                 token=self._config("token"),
+                session=self._config("session"),
             )
             dpf.setComplete()
             fileList.append(dpf.getInfo())
 
         return fileList
 
-    def _countFilesInProduct(self, runId: int):
+    def _countFilesInProduct(self, runId: int, maxWorkers: int = 4):
         """
         Count the number of files available for download.
 
-        Given a runId, polls the "download" method to count files.
-        Uses HTTP HEAD to avoid downloading the files.
+        Given a runId, sends HEAD requests to the "download" method to find the
+        highest index of a file, by exponential probing then a search splitting the
+        remaining range, with up to maxWorkers concurrent requests per round.
+        The first request waits until the run is complete.
+        The count is cached per runId.
+        """
+        if runId in self._fileCounts:
+            return self._fileCounts[runId]
+
+        n = 0
+        if self._productFileExists(runId, 1):
+            low, high = 1, None
+            with ThreadPoolExecutor(max_workers=max(maxWorkers, 1)) as executor:
+                while high is None or high - low > 1:
+                    indexes = _nextProbes(low, high, max(maxWorkers, 1))
+                    found = executor.map(
+                        lambda index: self._productFileExists(runId, index), indexes
+                    )
+                    low, high = _narrowBounds(low, high, indexes, found)
+            n = low
+
+        self._fileCounts[runId] = n
+        self._report("message", f"   {n} files available for download")
+        return n
+
+    def _productFileExists(self, runId: int, index: int) -> bool:
+        """
+        Returns True if the run has a file at index, waiting while the run is
+        not complete
         """
         url = f"{self._config('baseUrl')}api/dataProductDelivery/download"
         filters = {
             "token": self._config("token"),
             "dpRunId": runId,
-            "index": 1,
+            "index": index,
         }
-        status = 200
-        n = 0
-
-        while status == 200 or status == 202:
-            response = requests.head(
+        poll = self._pollScheduler(self._runReadyTimes.get(runId))
+        while True:
+            response = self._config("session").head(
                 url, params=filters, timeout=self._config("timeout")
             )
-            status = response.status_code
+            if response.status_code != 202:
+                return response.status_code == 200
+            # If the file is still running, wait
+            poll.wait("running")
 
-            if status == 202:
-                # If the file is still running, wait
-                sleep(self.pollPeriod)
-            elif status == 200:
-                # count successful HEAD request
-                filters["index"] += 1
-                n += 1
-
-        print(f"   {n} files available for download")
-        return n
-
-    def _printProductRequest(self, response):
+    def _reportProductRequest(self, response):
         """
-        Prints the information after a data product request.
+        Reports the information after a data product request.
 
         The request response format might differ depending on the
         product source (archive or generated on the fly).
         """
         isGenerated = "estimatedFileSize" in response
-        print(f"Request Id: {response['dpRequestId']}")
+        self._report("message", f"Request Id: {response['dpRequestId']}")
 
         if isGenerated:
             size = response["estimatedFileSize"]  # API returns it as a formatted string
-            print(f"Estimated File Size: {size}")
+            self._report("message", f"Estimated File Size: {size}")
             if "estimatedProcessingTime" in response:
-                print(
-                    f"Estimated Processing Time: {response['estimatedProcessingTime']}"
+                self._report(
+                    "message",
+                    f"Estimated Processing Time: {response['estimatedProcessingTime']}",
                 )
         else:
             size = _formatSize(response["fileSize"])
-            print(f"File Size: {size}")
-            print("Data product is ready for download.")
+            self._report("message", f"File Size: {size}")
+            self._report("message", "Data product is ready for download.")
 
-    def _estimatePollPeriod(self, response):
+    def _recordEstimate(self, response):
         """
-        Parse estimated processing time and set polling.
+        Records when the data product of a request is estimated to be ready,
+        which the poll scheduler uses to poll it around that time
 
-        Sets a poll period adequate to the estimated processing time.
-        Longer processing times require longer poll periods to
-        avoid going over maxRetries.
+        Archived data products have no estimatedProcessingTime, and are
+        polled with the default backoff.
+        """
+        processingTime = _parseProcessingTime(response)
+        if processingTime is not None:
+            self._readyTimes[response["dpRequestId"]] = time() + processingTime
 
-        Does not work for archived data products because the response
-        does not include estimatedProcessingTime.
+    def _journal(self) -> _OrderJournal | None:
+        """
+        Returns the order journal, or None if it's disabled
         """
-        if "estimatedProcessingTime" in response:
-            txtEstimated = response["estimatedProcessingTime"]
-            parts = txtEstimated.split(" ")
-            if len(parts) == 2:
-                unit = parts[1]
-                factor = 1
-                if unit == "min":
-                    factor = 60
-                elif unit == "hour":
-                    factor = 3600
-                total = factor * int(parts[0])
-                self.pollPeriod = max(0.02 * total, 1.0)  # poll every 2%
+        orderJournal = self._config("orderJournal")
+        if not orderJournal:
+            return None
+        if orderJournal is True:
+            path = self._config("outPath") / _journalFileName
+        else:
+            path = Path(orderJournal).resolve()
+        if self._orderJournal is None or self._orderJournal.path != path:
+            self._orderJournal = _OrderJournal(path)
+        return self._orderJournal
 
-                # set an upper limit to pollPeriod [sec]
-                self.pollPeriod = min(self.pollPeriod, 10)
+    def _pollScheduler(self, readyAt: float | None = None) -> _PollScheduler:
+        """
+        Returns the scheduler of a poll loop, with the deadline set by pollTimeout
+        """
+        pollTimeout = self._config("pollTimeout")
+        deadline = time() + pollTimeout if pollTimeout is not None else None
+        return _PollScheduler(readyAt, deadline)
 
-    def _printProductOrderStats(self, fileList: list, runInfo: dict):
+    def _reportProductOrderStats(self, fileList: list, runInfo: dict):
         """
-        Prints a formatted representation of the total time and size downloaded
+        Reports a formatted representation of the total time and size downloaded
         after the product order finishes
         """
         downloadCount = 0
@@ -371,23 +778,40 @@ class _OncDelivery(_OncService):
                 downloadCount += 1
                 downloadTime += file["fileDownloadTime"]
 
-        # Print run time
+        # Report run time
         runTime = timedelta(seconds=runInfo["runTime"])
-        print(f"Total run time: {humanize.naturaldelta(runTime)}")
+        self._report("message", f"\nTotal run time: {humanize.naturaldelta(runTime)}")
 
         if downloadCount > 0:
-            # Print download time
+            # Report download time
             if downloadTime < 1.0:
                 txtDownTime = f"{downloadTime:.3f} seconds"
             else:
                 txtDownTime = humanize.naturaldelta(downloadTime)
-            print(f"Total download Time: {txtDownTime}")
+            self._report("message", f"Total download Time: {txtDownTime}")
 
-            # Print size and count of files
+            # Report size and count of files
             natural_size = humanize.naturalsize(size, binary=True)
-            print(f"{downloadCount} files ({natural_size}) downloaded")
+            self._report(
+                "message", f"{downloadCount} files ({natural_size}) downloaded"
+            )
         else:
-            print("No files downloaded.")
+            self._report("message", "No files downloaded.")
+
+    def _reportBatchStats(self, orders: list[_ProductOrder], wallTime: float):
+        """
+        Reports the number of products completed and files downloaded by a batch
+        """
+        complete = sum(order.status == "complete" for order in orders)
+        files = [file for order in orders for file in order.fileList]
+        downloaded = [file for file in files if file["downloaded"]]
+        size = humanize.naturalsize(sum(file["size"] for file in files), binary=True)
+        self._report(
+            "message",
+            f"\n{complete} of {len(orders)} data products complete,"
+            f" {len(downloaded)} files ({size}) downloaded"
+            f" in {_formatDuration(wallTime)}",
+        )
 
     def _formatResult(self, fileList: list, runInfo: dict):
         size = 0
@@ -410,3 +834,59 @@ class _OncDelivery(_OncService):
         }
 
         return result
+
+
+def _nextProbes(low: int, high: int | None, count: int) -> list[int]:
+    """
+    Returns up to count file indexes to probe when counting the files of a run
+    @param low: Highest index known to have a file
+    @param high: Lowest index known to have no file, or None if not found yet
+    While high is unknown, the indexes double from low (exponential probing),
+    then they split the range between low and high into count + 1 parts
+    """
+    if high is None:
+        return [low * 2**i for i in range(1, count + 1)]
+    if high - low - 1 <= count:
+        return list(range(low + 1, high))
+    return sorted({low + (high - low) * i // (count + 1) for i in range(1, count + 1)})
+
+
+def _narrowBounds(
+    low: int, high: int | None, indexes: list[int], found
+) -> tuple[int, int | None]:
+    """
+    Returns the (low, high) bounds of _nextProbes updated with the probe results
+    @param found: For each of indexes, True if it has a file
+    """
+    for index, exists in zip(indexes, found, strict=True):
+        if exists:
+            low = max(low, index)
+        elif high is None or index < high:
+            high = index
+    return low, high
+
+
+def _retryDelay(
+    policy: RetryPolicy, runId: int, index: str, attempt: int, error: Exception
+) -> float | None:
+    """
+    Returns the seconds to wait before retrying an interrupted download of a file,
+    or None if the retry policy allows no more attempts
+    """
+    if not policy.shouldRetry("GET", attempt):
+        return None
+    delay = policy.delay(attempt)
+    policy._logRetry(
+        f"file {index} of run {runId}", delay, type(error).__name__, attempt
+    )
+    return delay
+
+
+def _orderOptions(downloadResultsOnly: bool, includeMetadataFile: bool) -> dict:
+    """
+    Returns the options of an order recorded in the journal, to resume it the same way
+    """
+    return {
+        "downloadResultsOnly": downloadResultsOnly,
+        "includeMetadataFile": includeMetadataFile,
+    }
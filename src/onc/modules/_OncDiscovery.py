@@ -1,3 +1,6 @@
+import json
+from time import time
+
 from ._OncService import _OncService
 
 
@@ -14,8 +17,49 @@ class _OncDiscovery(_OncService):
         url = self._serviceUrl(service)
         filters["token"] = self._config("token")
 
-        result = self._doRequest(url, filters)
+        cache = self._config("cache")
+        if cache is None or cache.ttlFor(service) <= 0:
+            result = self._doRequest(url, filters)
+            self._sanitizeBooleans(result)
+            return result
+
+        return self._cachedRequest(cache, url, filters, service)
+
+    def _cachedRequest(self, cache, url: str, filters: dict, service: str):
+        """
+        Return a discovery response from the cache if it is fresh.
+
+        Expired responses are revalidated with a conditional request when
+        the server provided an ETag or Last-Modified header, otherwise requested again.
+        """
+        key = cache.key(service, filters, self._config("baseUrl"))
+        entry = cache.get(key)
+        if entry is not None and entry["expires"] > time():
+            self._log(f"Using cached response for {service}")
+            return json.loads(entry["body"])
+
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["lastModified"]:
+                headers["If-Modified-Since"] = entry["lastModified"]
+
+        response, _ = self._sendRequest(url, filters, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            self._log(f"Cached response for {service} is still valid")
+            cache.refresh(key, service)
+            return json.loads(entry["body"])
+
+        result = self._parseResponse(response, url, filters)
         self._sanitizeBooleans(result)
+        cache.set(
+            key,
+            service,
+            json.dumps(result),
+            etag=response.headers.get("ETag"),
+            lastModified=response.headers.get("Last-Modified"),
+        )
         return result
 
     def getLocations(self, filters: dict):
@@ -1,6 +1,6 @@
 from typing import Any
 
-from ._MultiPage import _MultiPage
+from ._MultiPage import _MultiPage, _newColumns
 from ._OncService import _OncService
 
 
@@ -12,86 +12,207 @@ class _OncRealTime(_OncService):
     def __init__(self, config: dict):
         super().__init__(config)
 
-    def getScalardataByLocation(self, filters: dict, allPages: bool):
+    def getScalardataByLocation(
+        self,
+        filters: dict,
+        allPages: bool,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+        columnar: bool = False,
+    ):
         """
         Return scalar data readings from a device category in a location.
 
         See https://wiki.oceannetworks.ca/display/O2A/scalardata+service
         for usage and available filters
         """
-        return self._getDirectAllPages(filters, "scalardata/location", allPages)
+        return self._getDirectAllPages(
+            filters, "scalardata/location", allPages, shardBy, maxWorkers, columnar
+        )
 
-    def getScalardataByDevice(self, filters: dict, allPages: bool):
+    def getScalardataByDevice(
+        self,
+        filters: dict,
+        allPages: bool,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+        columnar: bool = False,
+    ):
         """
         Return scalar data readings from a device.
 
         See https://wiki.oceannetworks.ca/display/O2A/scalardata+service
         for usage and available filters.
         """
-        return self._getDirectAllPages(filters, "scalardata/device", allPages)
+        return self._getDirectAllPages(
+            filters, "scalardata/device", allPages, shardBy, maxWorkers, columnar
+        )
 
-    def getScalardata(self, filters: dict, allPages: bool):
+    def getScalardata(
+        self,
+        filters: dict,
+        allPages: bool,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+        columnar: bool = False,
+    ):
         return self._delegateByFilters(
             byDevice=self.getScalardataByDevice,
             byLocation=self.getScalardataByLocation,
             filters=filters,
             allPages=allPages,
+            shardBy=shardBy,
+            maxWorkers=maxWorkers,
+            columnar=columnar,
         )
 
-    def getRawdataByLocation(self, filters: dict, allPages: bool):
+    def getRawdataByLocation(
+        self,
+        filters: dict,
+        allPages: bool,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+    ):
         """
         Return raw data readings from a device category in a location.
 
         See https://wiki.oceannetworks.ca/display/O2A/rawdata+service
         for usage and available filters.
         """
-        return self._getDirectAllPages(filters, "rawdata/location", allPages)
+        return self._getDirectAllPages(
+            filters, "rawdata/location", allPages, shardBy, maxWorkers
+        )
 
-    def getRawdataByDevice(self, filters: dict, allPages: bool):
+    def getRawdataByDevice(
+        self,
+        filters: dict,
+        allPages: bool,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+    ):
         """
         Return raw data readings from an device.
 
         See https://wiki.oceannetworks.ca/display/O2A/rawdata+service
         for usage and available filters.
         """
-        return self._getDirectAllPages(filters, "rawdata/device", allPages)
+        return self._getDirectAllPages(
+            filters, "rawdata/device", allPages, shardBy, maxWorkers
+        )
 
-    def getRawdata(self, filters: dict, allPages: bool):
+    def getRawdata(
+        self,
+        filters: dict,
+        allPages: bool,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+    ):
         return self._delegateByFilters(
             byDevice=self.getRawdataByDevice,
             byLocation=self.getRawdataByLocation,
             filters=filters,
             allPages=allPages,
+            shardBy=shardBy,
+            maxWorkers=maxWorkers,
+        )
+
+    def iterScalardata(self, filters: dict, columnar: bool = False):
+        """
+        Return a generator of scalar data pages, from a device or a location.
+
+        If columnar is True, each page is converted to typed NumPy arrays per sensor.
+        """
+        pages = self._delegateByFilters(
+            byDevice=lambda filters: self._iterDirectPages(
+                filters, "scalardata/device"
+            ),
+            byLocation=lambda filters: self._iterDirectPages(
+                filters, "scalardata/location"
+            ),
+            filters=filters,
+        )
+        if columnar:
+            _newColumns()  # fail early if numpy is missing
+            return (_newColumns().append(page).toResponse(page) for page in pages)
+        return pages
+
+    def iterRawdata(self, filters: dict):
+        """
+        Return a generator of raw data pages, from a device or a location.
+        """
+        return self._delegateByFilters(
+            byDevice=lambda filters: self._iterDirectPages(filters, "rawdata/device"),
+            byLocation=lambda filters: self._iterDirectPages(
+                filters, "rawdata/location"
+            ),
+            filters=filters,
         )
 
     def getSensorCategoryCodes(self, filters: dict):
         updated_filters = filters | {"returnOptions": "excludeScalarData"}
         return self.getScalardata(updated_filters, False)["sensorData"]
 
-    def _getDirectAllPages(self, filters: dict, service: str, allPages: bool) -> Any:
+    def _getDirectAllPages(
+        self,
+        filters: dict,
+        service: str,
+        allPages: bool,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+        columnar: bool = False,
+    ) -> Any:
         """
         Keeps downloading all scalar or raw data pages until finished.
 
         Automatically translates sensorCategoryCodes to a string if a list is provided.
+        If shardBy is provided, the date range is split into time shards
+        that are downloaded concurrently by up to maxWorkers threads.
+        If columnar is True, scalar data is returned as typed NumPy arrays per sensor.
 
         Returns
         -------
             The full stitched data.
         """
         # prepare filters for first page request
-        filters = filters or {}
+        filters = self._prepareFilters(filters)
         url = self._serviceUrl(service)
-        filters["token"] = self._config("token")
 
-        # if sensorCategoryCodes is an array, join it into a comma-separated string
-        if "sensorCategoryCodes" in filters and isinstance(
-            filters["sensorCategoryCodes"], list
-        ):
-            filters["sensorCategoryCodes"] = ",".join(filters["sensorCategoryCodes"])
+        if columnar:
+            if filters.get("outputFormat", "array") != "array":
+                raise ValueError("The columnar mode requires outputFormat 'array'.")
+            columns = _newColumns()
 
         if allPages:
             mp = _MultiPage(self)
-            result = mp.getAllPages(service, url, filters)
+            result = mp.getAllPages(
+                service, url, filters, shardBy, maxWorkers, columnar
+            )
         else:
             result = self._doRequest(url, filters)
+            if columnar:
+                columns.append(result).toResponse(result)
         return result
+
+    def _iterDirectPages(self, filters: dict, service: str):
+        """
+        Return a generator yielding scalar or raw data pages as they are downloaded.
+        """
+        filters = self._prepareFilters(filters)
+        url = self._serviceUrl(service)
+        return _MultiPage(self).iterPages(service, url, filters)
+
+    def _prepareFilters(self, filters: dict) -> dict:
+        """
+        Add the token to the filters.
+
+        Automatically translates sensorCategoryCodes to a string if a list is provided.
+        """
+        filters = filters or {}
+        filters["token"] = self._config("token")
+
+        # if sensorCategoryCodes is an array, join it into a comma-separated string
+        if "sensorCategoryCodes" in filters and isinstance(
+            filters["sensorCategoryCodes"], list
+        ):
+            filters["sensorCategoryCodes"] = ",".join(filters["sensorCategoryCodes"])
+        return filters
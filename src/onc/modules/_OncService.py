@@ -6,7 +6,7 @@ from urllib import parse
 
 import requests
 
-from ._util import _createErrorMessage, _formatDuration
+from ._util import _createErrorMessage, _formatDuration, _formatSize, _transferSize
 
 logging.basicConfig(format="%(levelname)s: %(message)s")
 
@@ -19,7 +19,13 @@ class _OncService:
     def __init__(self, parent: object):
         self.parent = weakref.ref(parent)
 
-    def _doRequest(self, url: str, filters: dict | None = None, getTime: bool = False):
+    def _doRequest(
+        self,
+        url: str,
+        filters: dict | None = None,
+        getTime: bool = False,
+        page: int | None = None,
+    ):
         """
         Generic request wrapper for making simple web service requests.
 
@@ -30,17 +36,47 @@ class _OncService:
         filters : dict of {str: str} or None, optional
             Dictionary of parameters to append to the request.
         getTime : bool, default False
-            If True, also return response time as a tuple.
+            If True, also return the timing and transfer information as a tuple.
+        page : int or None, optional
+            Page number of a paginated result, reported to the request hooks.
 
         Returns
         -------
         jsonResult : Any
             The json-encoded content of a response.
-        responseTime : str, optional
-            Running time of the response. Only available when getTime is True.
-        """
+        timing : dict, optional
+            Only available when getTime is True. A dict with the running time of the response
+            in seconds ("responseTime"), and the bytes of the body received ("transferSize")
+            and after decompression ("size").
+        """  # noqa: E501
         if filters is None:
             filters = {}
+        response, responseTime = self._sendRequest(url, filters, page=page)
+        jsonResult = self._parseResponse(response, url, filters)
+
+        if getTime:
+            return jsonResult, {
+                "responseTime": responseTime,
+                "transferSize": _transferSize(response),
+                "size": len(response.content),
+            }
+        else:
+            return jsonResult
+
+    def _sendRequest(
+        self,
+        url: str,
+        filters: dict,
+        headers: dict | None = None,
+        page: int | None = None,
+    ):
+        """
+        Send a GET request with the token added to the filters.
+
+        Raise an HTTPError for error responses, and return a tuple
+        of the response and its running time.
+        A "304 Not Modified" response to a conditional request is returned as is.
+        """
         filters["token"] = self._config("token")
         timeout = self._config("timeout")
 
@@ -48,19 +84,33 @@ class _OncService:
         self._log(f"Requesting URL:\n{url}?{txtParams}")
 
         start = time()
-        response = requests.get(url, filters, timeout=timeout)
+        response = self._config("session").get(
+            url, params=filters, timeout=timeout, headers=headers, page=page
+        )
         responseTime = time() - start
 
-        if response.ok:
-            jsonResult = response.json()
-        else:
+        if not response.ok:
             status = response.status_code
             if status in [400, 401]:
                 msg = _createErrorMessage(response)
                 raise requests.HTTPError(msg)
             else:
                 response.raise_for_status()
-        self._log(f"Web Service response time: {_formatDuration(responseTime)}")
+        self._log(
+            f"Web Service response time: {_formatDuration(responseTime)}, received"
+            f" {_formatSize(_transferSize(response))}"
+            f" ({_formatSize(len(response.content))} decompressed)"
+        )
+
+        return response, responseTime
+
+    def _parseResponse(self, response: requests.Response, url: str, filters: dict):
+        """
+        Return the json-encoded content of a response.
+
+        Log the warning messages of the response if showWarning is True.
+        """
+        jsonResult = self._config("jsonDecoder")(response.content)
 
         # Log warning messages only when showWarning is True
         # and jsonResult["messages"] is not an empty list
@@ -82,10 +132,7 @@ class _OncService:
                 f"there are several warning messages:\n{long_message}\n"
             )
 
-        if getTime:
-            return jsonResult, responseTime
-        else:
-            return jsonResult
+        return jsonResult
 
     def _serviceUrl(self, service: str):
         """
@@ -123,6 +170,12 @@ class _OncService:
         if self._config("showInfo"):
             print(message)
 
+    def _report(self, event: str, message: str, **fields):
+        """
+        Passes a progress event to the reporter of the parent (see Reporter)
+        """
+        self._config("reporter").report(event, message, **fields)
+
     def _config(self, key: str):
         """
         Returns a property from the parent (ONC class)
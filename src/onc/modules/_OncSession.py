@@ -0,0 +1,226 @@
+import weakref
+from collections.abc import Callable
+from contextlib import ExitStack
+from time import sleep, time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from ._RateLimiter import RateLimiter
+from ._RequestEvents import _requestEvent, _runHooks
+from ._RetryPolicy import RetryPolicy
+from ._util import _acceptEncoding, _transferSize
+
+
+class _OncSession(requests.Session):
+    """
+    A pooled HTTP session shared by all the service classes of an ONC object.
+
+    Connections are kept alive and reused across page requests, polls and file
+    downloads, which avoids a new TCP and TLS handshake for every request.
+    Transient failures are retried according to the retry policy, and every attempt
+    is throttled by the rate limiter, if any. The in-flight slot of a streamed
+    response is held until the response is closed.
+    Every request (with its retries) is reported to the request hooks.
+    """
+
+    def __init__(
+        self,
+        poolConnections: int = 10,
+        poolMaxsize: int = 10,
+        poolBlock: bool = False,
+        keepAlive: bool = True,
+        retryPolicy: RetryPolicy | None = None,
+        rateLimiter: RateLimiter | None = None,
+        compression: bool = True,
+        hooks: list[Callable[[dict], None]] | None = None,
+    ):
+        """
+        @param poolConnections: Number of per-host connection pools to cache
+        @param poolMaxsize: Maximum number of connections kept open to a single host
+        @param poolBlock: If True, a request waits for a free connection when
+                          poolMaxsize connections to the host are in use, instead
+                          of opening an extra connection that is not kept
+        @param keepAlive: If False, ask the server to close the connection after
+                          each request
+        @param retryPolicy: Retry policy of transient failures, RetryPolicy() if None
+        @param rateLimiter: Rate and concurrency limits shared with other sessions,
+                            or None
+        @param compression: If True, accept gzip, deflate (and br if a brotli decoder
+                            is installed) compressed responses
+        @param hooks: Functions called with an event dict after each request
+        """
+        super().__init__()
+        adapter = _TimedAdapter(
+            pool_connections=poolConnections,
+            pool_maxsize=poolMaxsize,
+            pool_block=poolBlock,
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+        if not keepAlive:
+            self.headers["Connection"] = "close"
+        self.headers["Accept-Encoding"] = _acceptEncoding(compression)
+
+        self.retryPolicy = retryPolicy if retryPolicy is not None else RetryPolicy()
+        self.rateLimiter = rateLimiter
+        self.requestHooks = hooks if hooks is not None else []
+
+    def request(
+        self, method: str, url: str, *args, page: int | None = None, **kwargs
+    ) -> requests.Response:
+        """
+        Send a request, retrying it on transient failures
+        @param page: Page number of a paginated result, reported to the hooks
+        """
+        policy = self.retryPolicy
+        attempt = 1
+        start = time()
+        while True:
+            with ExitStack() as limit:
+                if self.rateLimiter:
+                    limit.enter_context(self.rateLimiter.limit())
+                try:
+                    response = super().request(method, url, *args, **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as error:
+                    if not policy.shouldRetry(method, attempt):
+                        self._emit(
+                            method, url, kwargs, start, attempt, page, error=error
+                        )
+                        raise
+                    delay = policy.delay(attempt)
+                    reason = type(error).__name__
+                else:
+                    if not policy.shouldRetry(method, attempt, response.status_code):
+                        self._emit(method, url, kwargs, start, attempt, page, response)
+                        if kwargs.get("stream"):
+                            # the body is read later, hold the slot until then
+                            _releaseOnClose(response, limit.pop_all())
+                        return response
+                    delay = policy.delay(attempt, response.headers.get("Retry-After"))
+                    reason = f"HTTP status {response.status_code}"
+                    response.close()
+
+            policy._logRetry(url, delay, reason, attempt)
+            sleep(delay)
+            attempt += 1
+
+    def _emit(
+        self,
+        method: str,
+        url: str,
+        kwargs: dict,
+        start: float,
+        attempt: int,
+        page: int | None,
+        response: requests.Response | None = None,
+        error: Exception | None = None,
+    ) -> None:
+        """
+        Pass the event of a completed request to the hooks, if any
+        The bytes of a streamed body are its Content-Length, as it isn't read yet
+        """
+        if not self.requestHooks:
+            return
+
+        if response is None:
+            request = requests.Request(method, url, params=kwargs.get("params"))
+            event = _requestEvent(
+                method,
+                request.prepare().url,
+                start,
+                retries=attempt - 1,
+                page=page,
+                error=type(error).__name__,
+            )
+        else:
+            if kwargs.get("stream"):
+                length = response.headers.get("Content-Length")
+                bytesReceived = int(length) if length is not None else None
+            else:
+                bytesReceived = _transferSize(response)
+            event = _requestEvent(
+                method,
+                response.url,
+                start,
+                status=response.status_code,
+                ttfb=response.elapsed.total_seconds(),
+                connectTime=getattr(response, "connectTime", None),
+                bytesReceived=bytesReceived,
+                retries=attempt - 1,
+                page=page,
+            )
+        _runHooks(self.requestHooks, event)
+
+
+def _releaseOnClose(response: requests.Response, held: ExitStack) -> None:
+    """
+    Release the rate limiter slot held for a streamed response when it is closed,
+    or garbage collected if it never is
+    """
+    close = response.close
+
+    def closeAndRelease():
+        try:
+            close()
+        finally:
+            held.close()
+
+    response.close = closeAndRelease
+    weakref.finalize(response, held.close)
+
+
+class _TimedConnection:
+    """
+    Mixin of the urllib3 connections that records how long opening them took
+    """
+
+    # Seconds the DNS lookup, TCP and TLS handshakes took, until it is reported
+    connectTime = None
+
+    def connect(self):
+        start = time()
+        super().connect()
+        self.connectTime = time() - start
+
+
+class _TimedHTTPConnection(_TimedConnection, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnection, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """
+    An HTTPAdapter that sets the connectTime attribute of each response to the
+    seconds taken to open its connection, or None if a pooled connection was reused
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+    def build_response(self, req, resp) -> requests.Response:
+        response = super().build_response(req, resp)
+        connection = getattr(resp, "connection", None)
+        response.connectTime = getattr(connection, "connectTime", None)
+        if connection is not None and response.connectTime is not None:
+            # report the time once, later requests reuse the open connection
+            connection.connectTime = None
+        return response
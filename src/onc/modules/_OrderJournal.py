@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+from pathlib import Path
+from time import time
+
+
+class _OrderJournal:
+    """
+    A JSON-lines log of the data product orders, which survives a restart
+    Each line records a step of an order: the request, its runs, each file
+    downloaded with its size, modification time and checksum, and the completion
+    of the order
+    Replaying the lines gives the orders to resume (see _OncDelivery.resumeOrders)
+    The lines of an order are removed once it is complete
+    """
+
+    def __init__(self, path: Path):
+        """
+        @param path: The journal file, created on the first order
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._files = None  # (runId, index) -> last file record, loaded on first use
+
+    def request(self, dpRequestId: int, filters: dict, options: dict):
+        """
+        @param filters: The filters of the request, the token is not recorded
+        @param options: The options of the order needed to resume it,
+                        e.g. includeMetadataFile
+        """
+        filters = {key: value for key, value in filters.items() if key != "token"}
+        self._append("request", dpRequestId, filters=filters, options=options)
+
+    def run(self, dpRequestId: int, runIds: list, fileCount: int):
+        self._append("run", dpRequestId, runIds=runIds, fileCount=fileCount)
+
+    def file(self, runId: int, info: dict, outPath: Path, checksum: str | None):
+        """
+        Records a file downloaded (or skipped) by a run
+        @param checksum: SHA-256 hex digest of the file returned by saveAsFile, or
+                         None if the file was already in outPath
+        """
+        stat = (outPath / info["file"]).stat()
+        record = self._append(
+            "file",
+            None,
+            runId=runId,
+            index=str(info["index"]),
+            file=info["file"],
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            sha256=checksum,
+        )
+        with self._lock:
+            if self._files is not None:
+                self._files[(runId, record["index"])] = record
+
+    def complete(self, dpRequestId: int):
+        """
+        Records the completion of an order, and compacts the journal by removing
+        the lines of the completed orders
+        """
+        self._append("complete", dpRequestId)
+        with self._lock:
+            self._compact()
+
+    def orders(self) -> dict:
+        """
+        Replays the journal
+        Returns the orders by dpRequestId, as dicts with the keys filters, options,
+        runIds, fileCount, files (the last record of each (runId, index)) and complete
+        """
+        orders = {}
+        files = {}  # (runId, index) -> record
+        if not self.path.exists():
+            self._files = files
+            return orders
+
+        with self._lock, open(self.path) as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # line cut short by a crash
+                event = record["event"]
+                if event == "request":
+                    orders[record["dpRequestId"]] = {
+                        "filters": record["filters"],
+                        "options": record["options"],
+                        "runIds": [],
+                        "fileCount": 0,
+                        "files": {},
+                        "complete": False,
+                    }
+                elif event == "file":
+                    files[(record["runId"], record["index"])] = record
+                elif record["dpRequestId"] in orders:
+                    order = orders[record["dpRequestId"]]
+                    if event == "run":
+                        order["runIds"] = record["runIds"]
+                        order["fileCount"] = record["fileCount"]
+                    elif event == "complete":
+                        order["complete"] = True
+
+            self._files = files
+
+        for order in orders.values():
+            order["files"] = {
+                key: record
+                for key, record in files.items()
+                if key[0] in order["runIds"]
+            }
+        return orders
+
+    def downloadedFile(self, runId: int, index: str, outPath: Path) -> dict | None:
+        """
+        Returns the record of a file already downloaded by a run, if the file in
+        outPath still has the size and modification time recorded, otherwise None
+        """
+        if self._files is None:
+            self.orders()
+        with self._lock:
+            record = self._files.get((runId, str(index)))
+        if record is None:
+            return None
+        try:
+            stat = (outPath / record["file"]).stat()
+        except FileNotFoundError:
+            return None
+        if (stat.st_size, stat.st_mtime) != (record["size"], record.get("mtime")):
+            return None
+        return record
+
+    def _append(self, event: str, dpRequestId: int | None, **fields) -> dict:
+        record = {"event": event, "time": time(), "dpRequestId": dpRequestId, **fields}
+        line = json.dumps(record)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as journal:
+                journal.write(line + "\n")
+                journal.flush()
+                os.fsync(journal.fileno())
+        return record
+
+    def _compact(self):
+        """
+        Rewrites the journal without the lines of the completed orders, replacing
+        the file atomically
+        Must be called with the lock held
+        """
+        records = []
+        with open(self.path) as journal:
+            for line in journal:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # line cut short by a crash
+        completed = {r["dpRequestId"] for r in records if r["event"] == "complete"}
+        completedRuns = {
+            runId
+            for r in records
+            if r["event"] == "run" and r["dpRequestId"] in completed
+            for runId in r["runIds"]
+        }
+        kept = [
+            r
+            for r in records
+            if r["dpRequestId"] not in completed and r.get("runId") not in completedRuns
+        ]
+
+        tempPath = self.path.with_name(f"{self.path.name}.tmp")
+        with open(tempPath, "w") as journal:
+            journal.writelines(json.dumps(record) + "\n" for record in kept)
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(tempPath, self.path)
+        if self._files is not None:
+            for key in [key for key in self._files if key[0] in completedRuns]:
+                del self._files[key]
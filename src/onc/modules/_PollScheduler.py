@@ -0,0 +1,92 @@
+from time import sleep, time
+
+# Bounds of the delay between two polls [sec]
+_minPeriod = 0.5
+_maxPeriod = 30.0
+
+
+class _PollScheduler:
+    """
+    Decides how long to wait before polling a data product again
+    The delay starts at minPeriod, grows by factor while the status reported by
+    the server stays the same, up to maxPeriod, and starts over when it changes.
+    Until the estimated processing time is over, the delay is at least a tenth of
+    the remaining time, and the poll falls at the estimated end of the run.
+    """
+
+    def __init__(
+        self,
+        readyAt: float | None = None,
+        deadline: float | None = None,
+        minPeriod: float = _minPeriod,
+        maxPeriod: float = _maxPeriod,
+        factor: float = 1.5,
+    ):
+        """
+        @param readyAt: Epoch time the data product is estimated to be ready at
+        @param deadline: Epoch time after which polling raises a TimeoutError
+        """
+        self.readyAt = readyAt
+        self.deadline = deadline
+        self.minPeriod = minPeriod
+        self.maxPeriod = maxPeriod
+        self.factor = factor
+        self._status = None
+        self._backoff = minPeriod
+
+    def nextDelay(self, status: str) -> float:
+        """
+        Returns the seconds to wait before the next poll, after a poll that
+        returned status (the status or message of the run or download)
+        """
+        now = time()
+        if self.deadline is not None and now >= self.deadline:
+            raise TimeoutError(
+                f"The data product is not ready after the poll deadline (last status: {status})"  # noqa: E501
+            )
+
+        if status != self._status:
+            self._status = status
+            self._backoff = self.minPeriod
+        else:
+            self._backoff = min(self._backoff * self.factor, self.maxPeriod)
+
+        delay = self._backoff
+        if self.readyAt is not None and self.readyAt > now:
+            remaining = self.readyAt - now
+            delay = min(max(delay, 0.1 * remaining), remaining, self.maxPeriod)
+        delay = max(delay, self.minPeriod)
+
+        if self.deadline is not None:
+            delay = min(delay, self.deadline - now)
+        return delay
+
+    def wait(self, status: str) -> None:
+        """
+        Sleeps until the next poll
+        """
+        sleep(self.nextDelay(status))
+
+
+def _parseProcessingTime(response: dict) -> float | None:
+    """
+    Returns the estimated processing time of a data product request in seconds,
+    or None if the response has no estimate (e.g. archived data products) or its
+    unit is unknown
+    """
+    if "estimatedProcessingTime" not in response:
+        return None
+    parts = response["estimatedProcessingTime"].split(" ")
+    if len(parts) != 2:
+        return None
+    factors = {
+        **dict.fromkeys(["s", "sec", "secs", "second", "seconds"], 1),
+        **dict.fromkeys(["min", "mins", "minute", "minutes"], 60),
+        **dict.fromkeys(["hour", "hours"], 3600),
+    }
+    if parts[1] not in factors:
+        return None
+    try:
+        return float(parts[0]) * factors[parts[1]]
+    except ValueError:
+        return None
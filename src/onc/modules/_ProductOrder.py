@@ -0,0 +1,47 @@
+from time import time
+
+from ._PollScheduler import _PollScheduler
+
+
+class _ProductOrder:
+    """
+    The state of a data product order in a batch of orders
+    (see _OncDelivery.orderDataProducts)
+    """
+
+    def __init__(self, filters: dict):
+        """
+        @param filters: The filters of the data product request
+        """
+        self.filters = filters
+        self.scheduler = _PollScheduler()  # set once the product is requested
+        self.dpRequestId = None
+        self.status = "queued"
+        self.error = None
+        self.nextPoll = 0.0  # epoch time of the next poll of the run
+        self.start = time()
+        self.runData = {"runIds": [], "fileCount": 0, "runTime": 0, "requestCount": 0}
+        self.fileList = []
+
+    def fail(self, error: Exception):
+        self.status = "error"
+        self.error = str(error)
+
+    def update(self, data: list):
+        """
+        Updates the order with the response of the "run" method
+        Returns True if the status changed
+        """
+        status = data[0]["status"]
+        self.runData["requestCount"] += 1
+        self.runData["fileCount"] = data[0]["fileCount"]
+        self.runData["runIds"] = [run["dpRunId"] for run in data]
+        self.runData["runTime"] = time() - self.start
+        self.nextPoll = time() + self.scheduler.nextDelay(status)
+
+        changed = status != self.status
+        self.status = status
+        return changed
+
+    def isRunning(self) -> bool:
+        return self.status not in ("complete", "cancelled", "error")
@@ -0,0 +1,133 @@
+import os
+import threading
+from pathlib import Path
+
+_defaultBuckets = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class PrometheusExporter:
+    """
+    A request hook aggregating request metrics in the Prometheus/OpenMetrics text format.
+
+    Pass it to ``ONC`` or ``AsyncONC`` with ``hooks=[exporter]``. It counts the requests per service, method and status,
+    and keeps a histogram of the request durations per service (``totalTime`` of the events, including retries),
+    so latency percentiles per endpoint can be computed with ``histogram_quantile``, e.g.
+    ``histogram_quantile(0.95, rate(onc_request_duration_seconds_bucket[5m]))``.
+
+    The metrics are returned by ``render``, or written by ``write`` to a file read by the node exporter
+    textfile collector. One exporter can be shared by several clients and threads.
+
+    Parameters
+    ----------
+    buckets : tuple of float, default (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+        Upper bounds in seconds of the duration histogram buckets.
+    prefix : str, default "onc"
+        Prefix of the metric names.
+
+    Examples
+    --------
+    >>> from onc import ONC, PrometheusExporter
+    >>> exporter = PrometheusExporter()
+    >>> onc = ONC("YOUR_TOKEN_HERE", hooks=[exporter])  # doctest: +SKIP
+    >>> onc.getLocations({"locationCode": "FGPD"})  # doctest: +SKIP
+    >>> exporter.write("/var/lib/node_exporter/onc.prom")  # doctest: +SKIP
+    """  # noqa: E501
+
+    def __init__(self, buckets: tuple = _defaultBuckets, prefix: str = "onc"):
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+
+        self._lock = threading.Lock()
+        self._requests = {}  # (service, method, status) -> count
+        self._durations = {}  # service -> {"buckets": counts, "sum": s, "count": n}
+        self._bytes = {}  # service -> bytes received
+        self._retries = {}  # service -> retries
+
+    def __call__(self, event: dict) -> None:
+        service = event["service"]
+        status = str(event["status"]) if event["status"] is not None else "error"
+        duration = event["totalTime"]
+
+        with self._lock:
+            key = (service, event["method"], status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+            histogram = self._durations.setdefault(
+                service, {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            )
+            for i, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["sum"] += duration
+            histogram["count"] += 1
+
+            self._bytes[service] = self._bytes.get(service, 0) + (event["bytes"] or 0)
+            self._retries[service] = self._retries.get(service, 0) + event["retries"]
+
+    def render(self) -> str:
+        """
+        Return the metrics in the OpenMetrics text format.
+        """
+        name = self.prefix
+        lines = []
+        with self._lock:
+            lines += [
+                f"# TYPE {name}_requests counter",
+                f"# HELP {name}_requests Requests sent to the Oceans 3.0 API.",
+            ]
+            for (service, method, status), count in sorted(self._requests.items()):
+                labels = _labels(service=service, method=method, status=status)
+                lines.append(f"{name}_requests_total{{{labels}}} {count}")
+
+            lines += [
+                f"# TYPE {name}_request_duration_seconds histogram",
+                f"# HELP {name}_request_duration_seconds Duration of the requests, including retries.",  # noqa: E501
+            ]
+            for service, histogram in sorted(self._durations.items()):
+                metric = f"{name}_request_duration_seconds"
+                for bound, count in zip(
+                    self.buckets, histogram["buckets"], strict=True
+                ):
+                    labels = _labels(service=service, le=repr(float(bound)))
+                    lines.append(f"{metric}_bucket{{{labels}}} {count}")
+                labels = _labels(service=service, le="+Inf")
+                lines.append(f"{metric}_bucket{{{labels}}} {histogram['count']}")
+                labels = _labels(service=service)
+                lines.append(f"{metric}_sum{{{labels}}} {histogram['sum']}")
+                lines.append(f"{metric}_count{{{labels}}} {histogram['count']}")
+
+            counters = [
+                ("response_bytes", "Body bytes received, compressed.", self._bytes),
+                ("retries", "Retries of failed requests.", self._retries),
+            ]
+            for metric, description, values in counters:
+                lines += [
+                    f"# TYPE {name}_{metric} counter",
+                    f"# HELP {name}_{metric} {description}",
+                ]
+                for service, value in sorted(values.items()):
+                    labels = _labels(service=service)
+                    lines.append(f"{name}_{metric}_total{{{labels}}} {value}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str | Path) -> None:
+        """
+        Write the metrics to a file, replacing it atomically.
+        """
+        path = Path(path)
+        tempPath = path.with_name(f"{path.name}.tmp")
+        tempPath.write_text(self.render())
+        os.replace(tempPath, path)
+
+
+def _labels(**labels) -> str:
+    """
+    Returns the labels of a metric sample, e.g. service="devices",method="GET"
+    """
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
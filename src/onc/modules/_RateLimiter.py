@@ -0,0 +1,196 @@
+import asyncio
+import json
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # fcntl is only available on POSIX systems
+    fcntl = None
+
+# Seconds between two tries to take an in-flight slot shared with other processes
+_minPollDelay = 0.005
+_maxPollDelay = 0.1
+
+
+class RateLimiter:
+    """
+    A client-side rate limiter and concurrency governor.
+
+    Every request sent by an ``ONC`` object sharing this limiter (including retries, data product polls
+    and file downloads) first takes a token from a token bucket that refills at ``rate`` requests per second,
+    up to ``burst`` tokens, and waits if the bucket is empty. With ``maxInFlight``, at most that many requests
+    are sent at the same time, and the others wait for a free slot.
+
+    A limiter can be shared by several ``ONC`` objects and threads. With ``lockFile``, the token bucket
+    and the in-flight slots are also shared by all the processes using the same file (POSIX only),
+    e.g. the workers of a multi-process host.
+
+    Parameters
+    ----------
+    rate : float | None, default None
+        Maximum sustained number of requests per second, greater than 0. Not limited if None.
+    burst : int | None, default None
+        Maximum number of requests sent at once before the rate applies, at least 1. ``max(1, int(rate))`` if None.
+    maxInFlight : int | None, default None
+        Maximum number of concurrent requests, at least 1. Not limited if None.
+    lockFile : str | Path | None, default None
+        A file coordinating the limits across processes. Slot files ``<lockFile>.slot<n>`` are created next to it.
+
+    Examples
+    --------
+    >>> from onc import ONC, RateLimiter
+    >>> limiter = RateLimiter(rate=5, maxInFlight=4, lockFile="/tmp/onc-rate.lock")  # doctest: +SKIP
+    >>> onc = ONC("YOUR_TOKEN_HERE", rateLimiter=limiter)  # doctest: +SKIP
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: int | None = None,
+        maxInFlight: int | None = None,
+        lockFile: str | Path | None = None,
+    ):
+        if lockFile is not None and fcntl is None:
+            raise ValueError("lockFile is only supported on POSIX systems.")
+        if rate is not None and not rate > 0:
+            raise ValueError(f"rate must be greater than 0, not {rate}.")
+        if burst is not None and burst < 1:
+            raise ValueError(f"burst must be at least 1, not {burst}.")
+        if maxInFlight is not None and maxInFlight < 1:
+            raise ValueError(f"maxInFlight must be at least 1, not {maxInFlight}.")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate or 1))
+        self.maxInFlight = maxInFlight
+        self.lockFile = None if lockFile is None else Path(lockFile)
+
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = time.time()
+        self._inFlight = (
+            threading.BoundedSemaphore(maxInFlight)
+            if maxInFlight is not None and lockFile is None
+            else None
+        )
+
+    def reserve(self) -> float:
+        """
+        Take a token from the bucket, and return the seconds to wait before sending the request.
+
+        The bucket can go into debt, so concurrent callers are spaced out instead of racing for the next token.
+        """  # noqa: E501
+        if self.rate is None:
+            return 0.0
+
+        with self._lock:
+            if self.lockFile is None:
+                self._tokens, self._updated, wait = self._take(
+                    self._tokens, self._updated
+                )
+                return wait
+
+            with open(self.lockFile, "a+") as file:
+                fcntl.flock(file, fcntl.LOCK_EX)
+                try:
+                    file.seek(0)
+                    state = json.loads(file.read() or "{}")
+                    tokens, updated, wait = self._take(
+                        state.get("tokens", float(self.burst)),
+                        state.get("updated", time.time()),
+                    )
+                    file.seek(0)
+                    file.truncate()
+                    file.write(json.dumps({"tokens": tokens, "updated": updated}))
+                    file.flush()
+                finally:
+                    fcntl.flock(file, fcntl.LOCK_UN)
+            return wait
+
+    @contextmanager
+    def limit(self):
+        """
+        Wait for a token and an in-flight slot, and hold the slot in the context.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+        if self.maxInFlight is None:
+            yield
+        elif self.lockFile is None:
+            with self._inFlight:
+                yield
+        else:
+            delay = _minPollDelay
+            while (slot := self._tryAcquireSlot()) is None:
+                time.sleep(delay)
+                delay = min(2 * delay, _maxPollDelay)
+            try:
+                yield
+            finally:
+                _releaseSlot(slot)
+
+    @asynccontextmanager
+    async def limitAsync(self):
+        """
+        Asynchronous equivalent of ``limit``, which waits without blocking the event loop.
+        """  # noqa: E501
+        # the lock file is locked and read in a thread, not on the event loop
+        wait = (
+            self.reserve()
+            if self.lockFile is None
+            else await asyncio.to_thread(self.reserve)
+        )
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        if self.maxInFlight is None:
+            yield
+            return
+
+        delay = _minPollDelay
+        while (slot := self._tryAcquireSlot()) is None:
+            await asyncio.sleep(delay)
+            delay = min(2 * delay, _maxPollDelay)
+        try:
+            yield
+        finally:
+            _releaseSlot(slot)
+
+    def _take(self, tokens: float, updated: float) -> tuple[float, float, float]:
+        """
+        Refill the bucket since the last update and take a token.
+        Return the new (tokens, updated) state and the seconds to wait.
+        """
+        now = time.time()
+        tokens = min(float(self.burst), tokens + (now - updated) * self.rate) - 1
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        return tokens, now, wait
+
+    def _tryAcquireSlot(self):
+        """
+        Take an in-flight slot without waiting.
+        Return the semaphore or the locked slot file, or None if all slots are taken.
+        """
+        if self.lockFile is None:
+            return self._inFlight if self._inFlight.acquire(blocking=False) else None
+
+        for n in range(self.maxInFlight):
+            slot = open(f"{self.lockFile}.slot{n}", "a")  # noqa: SIM115
+            try:
+                fcntl.flock(slot, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                slot.close()
+            else:
+                return slot
+        return None
+
+
+def _releaseSlot(slot) -> None:
+    if isinstance(slot, threading.BoundedSemaphore):
+        slot.release()
+    else:
+        fcntl.flock(slot, fcntl.LOCK_UN)
+        slot.close()
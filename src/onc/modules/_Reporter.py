@@ -0,0 +1,174 @@
+import logging
+import threading
+from collections.abc import Callable
+
+try:
+    from tqdm.auto import tqdm
+except ImportError:  # tqdm is an optional dependency
+    tqdm = None
+
+
+class Reporter:
+    """
+    Where the progress of the ONC methods goes. This base class discards it.
+
+    The ONC methods call ``report(event, message, **fields)`` with a human-readable message
+    and the structured fields of the event:
+
+    - "message": A progress or summary message, e.g. the request id of a data product.
+    - "page": A page of a paginated result is being downloaded.
+      Fields: service, page, pageEstimate (None if unknown) and rowCount (rows downloaded so far).
+    - "file": A file was downloaded, or skipped because it already exists.
+      Fields: file, index, total (None if unknown) and status ("downloaded" or "skipped").
+    - "poll": A data product was polled. Fields: status, and repeated (True if the status didn't change).
+    - "done": The end of a sequence of "page", "file" or "poll" events. Fields: task ("pages", "files" or "poll").
+
+    Subclass it, or use one of ``PrintReporter`` (the default of ``ONC``), ``LoggingReporter``,
+    ``TqdmReporter`` and ``CallbackReporter``.
+
+    Examples
+    --------
+    >>> from onc import ONC
+    >>> onc = ONC("YOUR_TOKEN_HERE", reporter="silent")  # doctest: +SKIP
+    >>> onc = ONC("YOUR_TOKEN_HERE", reporter="logging")  # doctest: +SKIP
+    >>> onc = ONC("YOUR_TOKEN_HERE", reporter=lambda event: print(event["event"], event))  # doctest: +SKIP
+    """  # noqa: E501
+
+    def report(self, event: str, message: str, **fields) -> None:
+        pass
+
+
+class PrintReporter(Reporter):
+    """
+    Print the progress to the console.
+
+    Repeated data product statuses are printed as dots on the same line.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sameLine = False  # True after printing a poll status without a newline
+
+    def report(self, event: str, message: str, **fields) -> None:
+        with self._lock:
+            if event == "poll":
+                print(
+                    "." if fields["repeated"] else f"\n   {message}", end="", flush=True
+                )
+                self._sameLine = True
+            elif self._sameLine:
+                print("")
+                self._sameLine = False
+                if event != "done":
+                    print(message)
+            elif event != "done":
+                print(message)
+
+
+class LoggingReporter(Reporter):
+    """
+    Log the progress, with the fields of the events in the ``onc`` attribute of the log records.
+
+    Parameters
+    ----------
+    logger : logging.Logger | None, default None
+        The logger of the messages. ``logging.getLogger("onc")`` if None.
+    level : int, default logging.INFO
+        The level of the messages.
+    """  # noqa: E501
+
+    def __init__(self, logger: logging.Logger | None = None, level: int = logging.INFO):
+        self.logger = logger if logger is not None else logging.getLogger("onc")
+        self.level = level
+
+    def report(self, event: str, message: str, **fields) -> None:
+        if event == "done" or (event == "poll" and fields["repeated"]):
+            return
+        fields["event"] = event
+        self.logger.log(self.level, message.strip(), extra={"onc": fields})
+
+
+class TqdmReporter(Reporter):
+    """
+    Show progress bars of the pages and the files downloaded, with tqdm.
+
+    Requires tqdm. Other messages are written above the bars.
+    """
+
+    def __init__(self):
+        if tqdm is None:
+            raise ImportError(
+                "TqdmReporter requires tqdm. "
+                "Install it with 'pip install onc[progress]'."
+            )
+        self._lock = threading.Lock()
+        self._bars = {}  # task -> progress bar
+
+    def report(self, event: str, message: str, **fields) -> None:
+        with self._lock:
+            if event == "page":
+                bar = self._bar("pages", fields["pageEstimate"], fields["service"])
+                bar.n = fields["page"] - 1
+                bar.set_postfix(rows=fields["rowCount"])
+            elif event == "file":
+                self._bar("files", fields["total"], "files").update(1)
+            elif event == "poll":
+                bar = self._bar("poll", None, "data product")
+                bar.set_postfix_str(fields["status"])
+            elif event == "done":
+                bar = self._bars.pop(fields["task"], None)
+                if bar is not None:
+                    if fields["task"] == "pages":
+                        bar.n = bar.total or bar.n + 1
+                    bar.close()
+            elif message.strip():
+                tqdm.write(message.strip())
+
+    def _bar(self, task: str, total: int | None, description: str):
+        if task not in self._bars:
+            unit = "poll" if task == "poll" else task[:-1]
+            self._bars[task] = tqdm(total=total, desc=description, unit=unit)
+        return self._bars[task]
+
+
+class CallbackReporter(Reporter):
+    """
+    Pass each event to a function, as a dict with the keys "event", "message" and the fields of the event.
+
+    Parameters
+    ----------
+    callback : Callable[[dict], None]
+        The function called with each event.
+    """  # noqa: E501
+
+    def __init__(self, callback: Callable[[dict], None]):
+        self.callback = callback
+
+    def report(self, event: str, message: str, **fields) -> None:
+        self.callback({"event": event, "message": message.strip(), **fields})
+
+
+def _reporter(reporter: str | Reporter | Callable) -> Reporter:
+    """
+    Returns the reporter of an ONC object
+    @param reporter: "print", "silent", "logging", "tqdm", a Reporter, or a function
+                     called with each event (see CallbackReporter)
+    """
+    if isinstance(reporter, Reporter):
+        return reporter
+    if callable(reporter):
+        return CallbackReporter(reporter)
+
+    reporters = {
+        "print": PrintReporter,
+        "silent": Reporter,
+        "logging": LoggingReporter,
+        "tqdm": TqdmReporter,
+    }
+    if reporter not in reporters:
+        raise ValueError(
+            f"Invalid reporter '{reporter}'. "
+            "Supported values are 'print', 'silent', 'logging', 'tqdm', "
+            "a Reporter or a function."
+        )
+    return reporters[reporter]()
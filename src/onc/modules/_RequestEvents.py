@@ -0,0 +1,111 @@
+import logging
+from collections.abc import Callable, Iterable
+from time import time
+from urllib import parse
+
+
+def _requestEvent(
+    method: str,
+    url: str,
+    start: float,
+    status: int | None = None,
+    ttfb: float | None = None,
+    connectTime: float | None = None,
+    bytesReceived: int | None = None,
+    retries: int = 0,
+    page: int | None = None,
+    error: str | None = None,
+) -> dict:
+    """
+    Returns the event passed to the request hooks
+    @param url: The requested url, the token is removed from the query
+    @param start: Epoch time the first attempt was sent at
+    @param ttfb: Seconds between sending the last attempt and receiving its headers
+    @param connectTime: Seconds to open the connection of the last attempt, or None
+                        if a pooled connection was reused
+    @param bytesReceived: Body bytes received (before decompression), or None if
+                          the body is streamed and its length is unknown
+    @param error: Name of the exception raised instead of a response, if any
+    """
+    return {
+        "timestamp": start,
+        "method": method,
+        "service": _serviceName(url),
+        "url": _redactToken(url),
+        "status": status,
+        "connectTime": connectTime,
+        "ttfb": ttfb,
+        "totalTime": time() - start,
+        "bytes": bytesReceived,
+        "retries": retries,
+        "page": page,
+        "error": error,
+    }
+
+
+def _runHooks(hooks: Iterable[Callable[[dict], None]], event: dict) -> None:
+    """
+    Pass the event to each hook
+    A failing hook is logged, and doesn't fail the request
+    """
+    for hook in hooks:
+        try:
+            hook(event)
+        except Exception as error:
+            logging.warning(f"Request hook {hook!r} failed: {error!r}")
+
+
+def _serviceName(url: str) -> str:
+    """
+    Returns the API service of the url, e.g. "scalardata/device"
+    """
+    path = parse.urlsplit(url).path
+    return path.split("/api/", 1)[1] if "/api/" in path else path
+
+
+def _redactToken(url: str) -> str:
+    """
+    Returns the url without its token parameter
+    """
+    parts = parse.urlsplit(url)
+    query = [
+        (key, value)
+        for key, value in parse.parse_qsl(parts.query, keep_blank_values=True)
+        if key != "token"
+    ]
+    return parse.urlunsplit(parts._replace(query=parse.urlencode(query)))
+
+
+class _HttpxTrace:
+    """
+    Collects the connection timings of an httpx request, as its "trace" extension
+    """
+
+    def __init__(self):
+        self.times = {}
+
+    async def __call__(self, name: str, info: dict) -> None:
+        # e.g. "connection.connect_tcp.started", "http11.send_request_headers.started"
+        self.times[name.split(".", 1)[1]] = time()
+
+    def clear(self) -> None:
+        self.times.clear()
+
+    def connectTime(self) -> float | None:
+        """
+        Returns the seconds to open the connection (TCP and TLS handshakes),
+        or None if a pooled connection was reused
+        """
+        start = self.times.get("connect_tcp.started")
+        end = self.times.get(
+            "start_tls.complete", self.times.get("connect_tcp.complete")
+        )
+        return end - start if start is not None and end is not None else None
+
+    def ttfb(self) -> float | None:
+        """
+        Returns the seconds between sending the request and receiving the headers
+        """
+        start = self.times.get("send_request_headers.started")
+        end = self.times.get("receive_response_headers.complete")
+        return end - start if start is not None and end is not None else None
@@ -0,0 +1,205 @@
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from time import time
+
+
+class ResponseCache:
+    """
+    A cache for the responses of the discovery services.
+
+    Discovery metadata (locations, devices, deployments, etc.) changes rarely,
+    so repeated calls with the same filters can be answered locally.
+    Responses are kept in an in-memory LRU tier and, optionally, in an on-disk SQLite tier
+    that is shared across processes and survives restarts.
+
+    Entries are keyed on the service and the normalized filters, excluding the token.
+    Once an entry expires, it is revalidated with a conditional request
+    (``If-None-Match`` / ``If-Modified-Since``) if the server sent an ``ETag`` or ``Last-Modified`` header,
+    so an unchanged response costs a "304 Not Modified" instead of a full download.
+
+    Parameters
+    ----------
+    path : str | Path | None, default None
+        The SQLite database file of the on-disk tier. The in-memory tier is used alone if None.
+    ttl : float | dict, default 3600
+        Seconds a response stays fresh. A dict sets a TTL per service (e.g. ``{"deployments": 600}``),
+        with the key "default" for the other services. A TTL of 0 disables caching for a service.
+    maxEntries : int, default 256
+        Maximum number of responses kept in memory. The least recently used ones are evicted first.
+
+    Examples
+    --------
+    >>> from onc import ONC, ResponseCache
+    >>> cache = ResponseCache("onc-cache.sqlite", ttl={"default": 86400, "deployments": 3600})  # doctest: +SKIP
+    >>> onc = ONC("YOUR_TOKEN_HERE", cache=cache)  # doctest: +SKIP
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        ttl: float | dict = 3600,
+        maxEntries: int = 256,
+    ):
+        self.path = None if path is None else Path(path)
+        self.ttl = ttl
+        self.maxEntries = maxEntries
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+    def ttlFor(self, service: str) -> float:
+        """
+        Return the TTL in seconds of a service.
+        """
+        if isinstance(self.ttl, dict):
+            return self.ttl.get(service, self.ttl.get("default", 3600))
+        return self.ttl
+
+    def key(self, service: str, filters: dict, baseUrl: str = "") -> str:
+        """
+        Return the cache key of a request, ignoring the token and the order of the filters.
+        """  # noqa: E501
+        normalized = sorted(
+            (name, str(value)) for name, value in filters.items() if name != "token"
+        )
+        return json.dumps([service, baseUrl, normalized], separators=(",", ":"))
+
+    def get(self, key: str) -> dict | None:
+        """
+        Return the cache entry of a key, fresh or expired, or None if there is none.
+
+        An entry is a dict with the keys "body" (the JSON text of the response),
+        "expires" (a timestamp), "etag" and "lastModified".
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+
+            entry = self._dbGet(key)
+            if entry is not None:
+                self._remember(key, entry)
+            return entry
+
+    def set(
+        self,
+        key: str,
+        service: str,
+        body: str,
+        etag: str | None = None,
+        lastModified: str | None = None,
+    ) -> None:
+        """
+        Store the JSON text of a response, fresh for the TTL of the service.
+        """
+        entry = {
+            "body": body,
+            "expires": time() + self.ttlFor(service),
+            "etag": etag,
+            "lastModified": lastModified,
+        }
+        with self._lock:
+            self._remember(key, entry)
+            self._dbSet(key, service, entry)
+
+    def refresh(self, key: str, service: str) -> None:
+        """
+        Mark an expired entry as fresh again after a successful revalidation.
+        """
+        with self._lock:
+            entry = self._memory.get(key) or self._dbGet(key)
+            if entry is None:
+                return
+            entry["expires"] = time() + self.ttlFor(service)
+            self._remember(key, entry)
+            self._dbSet(key, service, entry)
+
+    def clear(self, service: str | None = None) -> None:
+        """
+        Remove all the entries, or only the entries of a service.
+        """
+        with self._lock:
+            if service is None:
+                self._memory.clear()
+            else:
+                prefix = json.dumps([service])[:-1] + ","
+                for key in [k for k in self._memory if k.startswith(prefix)]:
+                    del self._memory[key]
+
+            db = self._connect()
+            if db is not None:
+                with db:
+                    if service is None:
+                        db.execute("DELETE FROM responses")
+                    else:
+                        db.execute(
+                            "DELETE FROM responses WHERE service = ?", (service,)
+                        )
+
+    def close(self) -> None:
+        """
+        Close the SQLite database, if any.
+        """
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key: str, entry: dict) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxEntries:
+            self._memory.popitem(last=False)
+
+    def _connect(self):
+        if self.path is None:
+            return None
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            with self._db:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, service TEXT, body TEXT, "
+                    "expires REAL, etag TEXT, lastModified TEXT)"
+                )
+        return self._db
+
+    def _dbGet(self, key: str) -> dict | None:
+        db = self._connect()
+        if db is None:
+            return None
+        row = db.execute(
+            "SELECT body, expires, etag, lastModified FROM responses WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "body": row[0],
+            "expires": row[1],
+            "etag": row[2],
+            "lastModified": row[3],
+        }
+
+    def _dbSet(self, key: str, service: str, entry: dict) -> None:
+        db = self._connect()
+        if db is None:
+            return
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    service,
+                    entry["body"],
+                    entry["expires"],
+                    entry["etag"],
+                    entry["lastModified"],
+                ),
+            )
@@ -0,0 +1,103 @@
+import logging
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+class RetryPolicy:
+    """
+    A retry policy for transient HTTP failures.
+
+    Requests that fail with one of ``statusCodes`` or with a connection error or timeout are sent again,
+    up to ``maxAttempts`` attempts in total. Before retry ``n`` (starting at 1) the client waits a random delay
+    between 0 and ``min(backoffCap, backoffBase * 2 ** (n - 1))`` seconds ("full jitter"),
+    or the delay requested by the server in a ``Retry-After`` header if there is one.
+
+    It applies to every request of an ``ONC`` object: discovery, pages of paginated results,
+    data product polls and file downloads. Only idempotent methods (GET and HEAD) are retried.
+
+    Parameters
+    ----------
+    maxAttempts : int, default 4
+        Maximum number of attempts of a request, including the first one. 1 disables retries.
+    statusCodes : tuple of int, default (429, 500, 502, 503, 504)
+        HTTP status codes that are retried.
+    backoffBase : float, default 0.5
+        Seconds of the maximum delay before the first retry, doubled for each further retry.
+    backoffCap : float, default 30.0
+        Upper bound in seconds of the backoff delay.
+    retryConnectionErrors : bool, default True
+        Whether connection errors and timeouts are retried.
+    maxRetryAfter : float, default 300.0
+        Upper bound in seconds of the delay requested with ``Retry-After``.
+
+    Examples
+    --------
+    >>> from onc import ONC, RetryPolicy
+    >>> onc = ONC("YOUR_TOKEN_HERE", retryPolicy=RetryPolicy(maxAttempts=6, backoffCap=60))  # doctest: +SKIP
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        maxAttempts: int = 4,
+        statusCodes: tuple = (429, 500, 502, 503, 504),
+        backoffBase: float = 0.5,
+        backoffCap: float = 30.0,
+        retryConnectionErrors: bool = True,
+        maxRetryAfter: float = 300.0,
+    ):
+        self.maxAttempts = maxAttempts
+        self.statusCodes = tuple(statusCodes)
+        self.backoffBase = backoffBase
+        self.backoffCap = backoffCap
+        self.retryConnectionErrors = retryConnectionErrors
+        self.maxRetryAfter = maxRetryAfter
+
+    def shouldRetry(self, method: str, attempt: int, status: int | None = None) -> bool:
+        """
+        Return True if an attempt that failed with status (or a connection error
+        if status is None) should be retried.
+        """
+        if attempt >= self.maxAttempts or method.upper() not in ("GET", "HEAD"):
+            return False
+        if status is None:
+            return self.retryConnectionErrors
+        return status in self.statusCodes
+
+    def delay(self, attempt: int, retryAfter: str | None = None) -> float:
+        """
+        Return the seconds to wait before retrying an attempt.
+        """
+        seconds = _parseRetryAfter(retryAfter)
+        if seconds is not None:
+            return min(seconds, self.maxRetryAfter)
+        return random.uniform(
+            0, min(self.backoffCap, self.backoffBase * 2 ** (attempt - 1))
+        )
+
+    def _logRetry(self, target: str, delay: float, reason: str, attempt: int) -> None:
+        """
+        Log the retry of a failed attempt at target (a URL or file).
+        """
+        logging.info(
+            f"Retrying {target} in {delay:.2f} seconds after {reason}"
+            f" (attempt {attempt + 1} of {self.maxAttempts})"
+        )
+
+
+def _parseRetryAfter(retryAfter: str | None) -> float | None:
+    """
+    Return the seconds of a Retry-After header (delay-seconds or HTTP-date), or None.
+    """
+    if not retryAfter:
+        return None
+    retryAfter = retryAfter.strip()
+    if retryAfter.isdigit():
+        return float(retryAfter)
+    try:
+        date = parsedate_to_datetime(retryAfter)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0.0)
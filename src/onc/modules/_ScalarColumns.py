@@ -0,0 +1,149 @@
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+
+# dtype of each scalardata column, any other data key holds values
+_columnTypes = {
+    "sampleTimes": "datetime64[ms]",
+    "qaqcFlags": "int8",
+}
+
+# Value of the int8 flag rows missing from a page (QAQC flags are 0 to 9)
+_missingFlag = -1
+
+
+class _ScalarColumns:
+    """
+    Accumulates scalardata pages into typed NumPy column buffers, per sensor
+
+    Columns are stored in growable buffers that double their capacity when full,
+    so appending a page is amortized O(rows in the page)
+    """
+
+    def __init__(self):
+        if np is None:
+            raise ImportError(
+                "The columnar result mode requires numpy. "
+                "Install it with 'pip install onc[columnar]'."
+            )
+        # sensorCode -> {"count": int, "columns": {dataKey: np.ndarray}, "meta": dict}
+        self._sensors = {}
+
+    def append(self, response: dict) -> "_ScalarColumns":
+        """
+        Converts the sensor data of a scalardata page and appends it to the buffers
+        Sensors that were not in the previous pages get their own buffers
+        Rows of a column missing from a page, or from the pages before the column
+        first appeared, hold a missing value (NaN, NaT, -1 for flags, or None)
+        """
+        for sensor in response.get("sensorData") or []:
+            buffer = self._sensors.get(sensor["sensorCode"])
+            if buffer is None:
+                meta = {key: v for key, v in sensor.items() if key != "data"}
+                buffer = {"count": 0, "columns": {}, "meta": meta}
+                self._sensors[sensor["sensorCode"]] = buffer
+
+            data = sensor["data"]
+            n = len(data["sampleTimes"])
+            count = buffer["count"]
+            for key, rows in data.items():
+                column = buffer["columns"].get(key)
+                converted = _toArray(key, rows)
+                if column is None:
+                    # the rows of the previous pages are missing
+                    column = _missing(max(count + n, 1), converted.dtype)
+                elif column.dtype != converted.dtype:
+                    # e.g. a text column that could not be stored as float64
+                    column = column.astype(object)
+                if count + n > len(column):
+                    column = _grow(column, count + n)
+                column[count : count + n] = converted
+                buffer["columns"][key] = column
+
+            for key, column in buffer["columns"].items():
+                if key not in data:
+                    if count + n > len(column):
+                        column = _grow(column, count + n)
+                    column[count : count + n] = _missingValue(column.dtype)
+                    buffer["columns"][key] = column
+            buffer["count"] = count + n
+
+        return self
+
+    def rowCount(self) -> int:
+        """
+        Returns the number of rows of the first sensor
+        """
+        for buffer in self._sensors.values():
+            return buffer["count"]
+        return 0
+
+    def toResponse(self, response: dict) -> dict:
+        """
+        Replaces the sensor data lists of the response with the accumulated columns
+        Sensors only present in later pages are appended to response["sensorData"]
+        """
+        sensorData = response.get("sensorData") or []
+        known = {sensor["sensorCode"] for sensor in sensorData}
+        for sensorCode, buffer in self._sensors.items():
+            if sensorCode not in known:
+                sensorData.append(dict(buffer["meta"]))
+
+        for sensor in sensorData:
+            buffer = self._sensors.get(sensor["sensorCode"])
+            if buffer is None:
+                continue
+            count = buffer["count"]
+            sensor["data"] = {
+                key: column[:count] for key, column in buffer["columns"].items()
+            }
+
+        if sensorData:
+            response["sensorData"] = sensorData
+        return response
+
+
+def _toArray(key: str, rows: list):
+    """
+    Converts a list of JSON values into a typed array
+    Times become datetime64, flags int8, and values float64 (None becomes NaN)
+    """
+    if key == "sampleTimes":
+        # numpy doesn't parse the "Z" UTC designator
+        return np.array(
+            [t[:-1] if t.endswith("Z") else t for t in rows],
+            dtype=_columnTypes[key],
+        )
+    try:
+        return np.array(rows, dtype=_columnTypes.get(key, "float64"))
+    except (TypeError, ValueError):
+        return np.array(rows, dtype=object)
+
+
+def _grow(column, required: int):
+    """
+    Returns a copy of column with at least the required capacity
+    """
+    grown = _missing(max(2 * len(column), required), column.dtype)
+    grown[: len(column)] = column
+    return grown
+
+
+def _missing(size: int, dtype):
+    """
+    Returns a column of size rows holding the missing value of dtype
+    """
+    return np.full(size, _missingValue(dtype), dtype=dtype)
+
+
+def _missingValue(dtype):
+    dtype = np.dtype(dtype)
+    if dtype.kind == "f":
+        return np.nan
+    if dtype.kind == "M":
+        return np.datetime64("NaT")
+    if dtype.kind == "i":
+        return _missingFlag
+    return None
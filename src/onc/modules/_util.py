@@ -1,6 +1,9 @@
+import hashlib
 import os
+import re
 import time
 from datetime import timedelta
+from importlib.util import find_spec
 from pathlib import Path
 
 import humanize
@@ -8,28 +11,244 @@ import requests
 
 
 def saveAsFile(
-    response: requests.Response, outPath: Path, fileName: str, overwrite: bool
-) -> tuple[int, float]:
+    response: requests.Response,
+    outPath: Path,
+    fileName: str,
+    overwrite: bool,
+    chunkSize: int = 1024 * 1024,
+) -> dict:
     """
     Saves the file downloaded in the response object, in the outPath, with filename
     If overwrite, will overwrite files with the same name
-    Return the file size and download time
+    The response body is streamed to a temporary ".part" file in chunks of chunkSize
+    bytes, which is renamed to the final name once the download is complete
+    If the response is a partial content (206) response to a Range request, the body
+    is appended to the existing ".part" file instead
+    The ".part" file is kept if the download fails, so it can be resumed later
+    Return a dict with the file size, the bytes received before decompression,
+    the offset the download resumed from, the download time and throughput (bytes/s),
+    and the SHA-256 hex digest of the file
+    """
+    try:
+        filePath, offset, expectedSize = _startSave(
+            response, outPath, fileName, overwrite
+        )
+    except (FileExistsError, requests.ConnectionError):
+        response.close()
+        raise
+
+    start = time.time()
+    try:
+        with _PartFile(filePath, offset, chunkSize) as part:
+            for chunk in response.iter_content(chunk_size=chunkSize):
+                part.write(chunk)
+        transferSize = _transferSize(response)
+    finally:
+        response.close()
+
+    return _finishSave(response, part, transferSize, expectedSize, start)
+
+
+def _startSave(
+    response, outPath: Path, fileName: str, overwrite: bool
+) -> tuple[Path, int, int | None]:
+    """
+    Checks the response of a download to save as fileName in outPath, from its
+    status and headers only, so the requests and httpx responses are saved alike
+    Returns the file path, the offset the download resumes from, and the expected
+    size of the body (None if unknown)
+    Raises FileExistsError if the file is saved and not overwritten, and
+    ConnectionError if the download can't be resumed from the partial file
     """
     filePath = outPath / fileName
     outPath.mkdir(parents=True, exist_ok=True)
 
-    # Save/Overwrite file in outPath if the file doesn't exist yet
-    # or it is there but with 0 file size
-    if not overwrite and Path.exists(filePath) and os.path.getsize(filePath) != 0:
+    if not overwrite and _isSaved(filePath):
         raise FileExistsError(filePath)
 
-    start = time.time()
-    size = len(response.content)
-    with open(filePath, "wb") as file:
-        file.write(response.content)
+    offset = 0
+    expectedSize = None
+    if response.status_code == 206:
+        offset, expectedSize = _parseContentRange(
+            response.headers.get("Content-Range", "")
+        )
+        if offset > _partialSize(outPath, fileName):
+            _discardPartial(outPath, fileName)
+            raise requests.ConnectionError(
+                f"Cannot resume {fileName}: the server sent bytes from offset {offset}"
+            )
+    elif "Content-Length" in response.headers:
+        expectedSize = int(response.headers["Content-Length"])
+    return filePath, offset, expectedSize
+
+
+class _PartFile:
+    """
+    The ".part" file a download of filePath is written to, from offset
+    Keeps the size and SHA-256 digest of the whole file, including the bytes
+    downloaded before the download was interrupted
+    """
+
+    def __init__(self, filePath: Path, offset: int, chunkSize: int = 1024 * 1024):
+        self.filePath = filePath
+        self.offset = offset
+        self.size = offset
+        self.digest = hashlib.sha256()
+        mode = "r+b" if offset > 0 else "wb"
+        self._file = open(_partPath(filePath), mode)  # noqa: SIM115 (see close)
+        try:
+            remaining = offset
+            while remaining > 0:
+                chunk = self._file.read(min(chunkSize, remaining))
+                if not chunk:
+                    break
+                self.digest.update(chunk)
+                remaining -= len(chunk)
+            self._file.seek(offset)
+            self._file.truncate()
+        except BaseException:
+            self._file.close()
+            raise
+
+    def write(self, chunk: bytes):
+        self._file.write(chunk)
+        self.digest.update(chunk)
+        self.size += len(chunk)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _finishSave(
+    response, part: _PartFile, transferSize: int, expectedSize: int | None, start: float
+) -> dict:
+    """
+    Checks that the whole body of the response was written to the closed part
+    file, and renames it to the file name
+    Returns the result of saveAsFile
+    """
+    received = part.size
+    if response.status_code != 206 and _isEncoded(response):
+        # Content-Length counts the compressed bytes
+        received = transferSize
+    if expectedSize is not None and received != expectedSize:
+        raise requests.ConnectionError(
+            f"Incomplete download of {part.filePath.name}: "
+            f"received {received} of {expectedSize} bytes"
+        )
+    os.replace(_partPath(part.filePath), part.filePath)
 
     downloadTime = time.time() - start
-    return (size, round(downloadTime, 3))
+    return {
+        "size": part.size,
+        "transferSize": transferSize,
+        "resumedFrom": part.offset,
+        "downloadTime": round(downloadTime, 3),
+        "throughput": (
+            (part.size - part.offset) / downloadTime if downloadTime > 0 else 0.0
+        ),
+        "sha256": part.digest.hexdigest(),
+    }
+
+
+def _isSaved(filePath: Path) -> bool:
+    """
+    Returns True if the file was already saved, so it is not overwritten
+    An empty file left in place of the file is downloaded again
+    """
+    return filePath.exists() and os.path.getsize(filePath) != 0
+
+
+def _partialSize(outPath: Path, fileName: str) -> int:
+    """
+    Returns the size of the partial ".part" file left by an interrupted download
+    of fileName in outPath, or 0 if there is none
+    """
+    partPath = _partPath(outPath / fileName)
+    return partPath.stat().st_size if partPath.exists() else 0
+
+
+def _hasPartials(outPath: Path) -> bool:
+    """
+    Returns True if outPath has partial ".part" files left by interrupted downloads,
+    listed with a single directory scan
+    """
+    try:
+        with os.scandir(outPath) as entries:
+            return any(entry.name.endswith(".part") for entry in entries)
+    except FileNotFoundError:
+        return False
+
+
+def _discardPartial(outPath: Path, fileName: str) -> None:
+    """
+    Deletes the partial ".part" file of fileName in outPath, if any
+    """
+    _partPath(outPath / fileName).unlink(missing_ok=True)
+
+
+def _rangeHeaders(offset: int) -> dict | None:
+    """
+    Returns the headers of a request resuming a download from offset (in bytes)
+    Byte ranges of a compressed body can't be appended to the decompressed
+    partial file, so the body is requested without compression
+    """
+    if offset == 0:
+        return None
+    return {"Range": f"bytes={offset}-", "Accept-Encoding": "identity"}
+
+
+def _acceptEncoding(compression: bool) -> str:
+    """
+    Returns the Accept-Encoding header value of the requests
+    Brotli is only accepted if a brotli decoder is installed
+    """
+    if not compression:
+        return "identity"
+    encodings = ["gzip", "deflate"]
+    if find_spec("brotli") or find_spec("brotlicffi"):
+        encodings.append("br")
+    return ", ".join(encodings)
+
+
+def _isEncoded(response: requests.Response) -> bool:
+    """
+    Returns True if the body of the response is compressed
+    """
+    return response.headers.get("Content-Encoding", "identity") != "identity"
+
+
+def _transferSize(response: requests.Response) -> int:
+    """
+    Returns the number of body bytes received for a consumed response, before
+    decompression
+    """
+    try:
+        return response.raw.tell()
+    except AttributeError:
+        return len(response.content)
+
+
+def _partPath(filePath: Path) -> Path:
+    return filePath.with_name(filePath.name + ".part")
+
+
+def _parseContentRange(txtRange: str) -> tuple[int, int | None]:
+    """
+    Returns the first byte offset and the complete size of a 206 response
+    from its "Content-Range: bytes start-end/total" header
+    """
+    match = re.fullmatch(r"bytes (\d+)-\d+/(\d+|\*)", txtRange.strip())
+    if match is None:
+        raise requests.ConnectionError(f"Invalid Content-Range header: {txtRange}")
+    total = match.group(2)
+    return int(match.group(1)), None if total == "*" else int(total)
 
 
 def _formatSize(size: float) -> str:
@@ -2,13 +2,20 @@ import datetime
 import json
 import os
 import re
+from collections.abc import Callable
 from pathlib import Path
 
 from dateutil import parser
+from onc.modules._JsonDecoder import _jsonDecoder
 from onc.modules._OncArchive import _OncArchive
 from onc.modules._OncDelivery import _OncDelivery
 from onc.modules._OncDiscovery import _OncDiscovery
 from onc.modules._OncRealTime import _OncRealTime
+from onc.modules._OncSession import _OncSession
+from onc.modules._RateLimiter import RateLimiter
+from onc.modules._Reporter import Reporter, _reporter
+from onc.modules._ResponseCache import ResponseCache
+from onc.modules._RetryPolicy import RetryPolicy
 
 
 class ONC:
@@ -40,6 +47,85 @@ class ONC:
         The directory will be created if it does not exist during the download.
     timeout : int, default 60
         Number of seconds before a request to the API is canceled due to a timeout.
+    poolConnections : int, default 10
+        Number of per-host connection pools kept by the shared HTTP session.
+    poolMaxsize : int, default 10
+        Maximum number of connections kept open to a single host.
+        It should be at least the number of concurrent downloads.
+    poolBlock : bool, default False
+        Whether a request waits for a free connection when ``poolMaxsize`` connections to the host are in use.
+        If False, an extra connection is opened, and closed after the request instead of being kept in the pool.
+    keepAlive : bool, default True
+        Whether connections are kept alive and reused between requests.
+        All requests made by this object (pages, polls and file downloads) share one pooled session,
+        which saves a new TCP and TLS handshake for every request.
+    chunkSize : int, default 1048576
+        Size in bytes of the chunks in which downloaded files are streamed to disk.
+        Files are never held in memory as a whole, and are written to a temporary ``.part`` file
+        that is renamed once the download is complete.
+    cache : ResponseCache | None, default None
+        A cache for the responses of the discovery methods (``getLocations``, ``getDevices``, ``getDeployments``, etc.).
+        See ``ResponseCache`` for the in-memory and on-disk tiers and the TTL per service.
+        Discovery responses are not cached if None.
+    retryPolicy : RetryPolicy | None, default None
+        How requests failing with a transient error (HTTP 429, 500, 502, 503, 504, connection errors and timeouts)
+        are retried, with exponential backoff, full jitter and support for ``Retry-After``.
+        It applies to every request, including the pages of paginated results and file downloads.
+        ``RetryPolicy()`` (up to 4 attempts) if None. Use ``RetryPolicy(maxAttempts=1)`` to disable retries.
+    rateLimiter : RateLimiter | None, default None
+        A token-bucket rate limit and a maximum number of concurrent requests applied to every request,
+        including retries, polls and file downloads. A limiter can be shared by several ONC objects and threads,
+        and by several processes through a lock file. See ``RateLimiter``. Requests are not limited if None.
+    compression : bool, default True
+        Whether compressed responses (gzip, deflate, and br if brotli is installed) are accepted.
+        Scalar data JSON typically compresses several times. The bytes received for each request
+        and after decompression are logged when showInfo is True.
+    jsonDecoder : str | Callable, default "auto"
+        The JSON decoder of the responses: "orjson", "msgspec", "json" (the standard library),
+        or a function decoding bytes. "auto" uses orjson or msgspec if installed, which decode large pages
+        several times faster, and falls back to the standard library otherwise.
+        Documents rejected by orjson or msgspec (e.g. with NaN values) are decoded by the standard library.
+    hooks : list of Callable | None, default None
+        Functions called with an event dict after every request (including polls and file downloads), with the keys:
+
+        - timestamp: Epoch time the request was sent at.
+        - method, service (e.g. "scalardata/device"), url (without the token), status (None on a connection error).
+        - connectTime: Seconds to open a new connection (DNS lookup, TCP and TLS handshakes), or None if a pooled one was reused.
+        - ttfb: Seconds until the response headers were received. totalTime: Seconds including retries.
+        - bytes: Body bytes received before decompression (the Content-Length for streamed downloads).
+        - retries, page (page number of paginated results, or None), error (exception name, or None).
+
+        ``PrometheusExporter`` and ``JsonLinesExporter`` are ready-made hooks. More hooks can be appended to ``onc.hooks``.
+    reporter : str | Reporter | Callable, default "print"
+        Where the progress messages of paginated results, data product orders and file downloads go:
+
+        - "print": Print them to the console.
+        - "silent": Discard them.
+        - "logging": Log them to the "onc" logger (see ``LoggingReporter``).
+        - "tqdm": Show progress bars of the pages and files (requires tqdm, see ``TqdmReporter``).
+        - A function: Called with a dict of the structured fields of each event (see ``CallbackReporter``).
+        - A ``Reporter`` object.
+    pollTimeout : float | None, default None
+        Maximum number of seconds waiting for a data product run or file to be ready, after which a ``TimeoutError``
+        is raised (``orderDataProducts`` returns it as the error of the order). Waits are not limited if None.
+        Data products are polled with a capped exponential backoff, reset when the status reported by the server
+        changes, and timed around the estimated processing time of the request.
+    orderJournal : bool | str | Path, default False
+        Whether data product orders are recorded in a journal, so they can be continued with ``resumeOrders``
+        after a crash or a restart instead of being ordered and generated again. The journal is a JSON-lines file
+        recording the request id, the run ids and the size, modification time and checksum of each file downloaded
+        of every order. The lines of an order are removed once it is complete.
+
+        - True: Use the file "onc-orders.jsonl" in outPath.
+        - A path: Use this file.
+        - False: Don't record the orders.
+    archiveManifest : bool, default False
+        Whether ``downloadArchivefile`` and ``downloadDirectArchivefile`` keep an index of the files downloaded in outPath
+        (".onc-manifest.json"), with the size, modification time, SHA-256 and source URL of each file. The index is loaded
+        once and replaced atomically after the downloads of ``downloadDirectArchivefile``, or when the ONC object is closed
+        for the files of ``downloadArchivefile``. Whether a file was already downloaded is looked up in it, with a single
+        scan of outPath instead of checking the size of every file. Files missing from the index are still looked for
+        in outPath, and added to it. Files deleted from outPath are removed from it.
 
     Examples
     --------
@@ -57,6 +143,21 @@ class ONC:
         showWarning: bool = True,
         outPath: str | Path = "output",
         timeout: int = 60,
+        poolConnections: int = 10,
+        poolMaxsize: int = 10,
+        poolBlock: bool = False,
+        keepAlive: bool = True,
+        chunkSize: int = 1024 * 1024,
+        cache: ResponseCache | None = None,
+        retryPolicy: RetryPolicy | None = None,
+        rateLimiter: RateLimiter | None = None,
+        compression: bool = True,
+        jsonDecoder: str | Callable = "auto",
+        hooks: list[Callable[[dict], None]] | None = None,
+        reporter: str | Reporter | Callable = "print",
+        pollTimeout: float | None = None,
+        orderJournal: bool | str | Path = False,
+        archiveManifest: bool = False,
     ):
         if token is None or token == "":
             token = os.environ.get("ONC_TOKEN")
@@ -71,6 +172,25 @@ class ONC:
         self.timeout = timeout
         self.production = production
         self.outPath = outPath
+        self.chunkSize = chunkSize
+        self.cache = cache
+        self.jsonDecoder = _jsonDecoder(jsonDecoder)
+        self.reporter = _reporter(reporter)
+        self.pollTimeout = pollTimeout
+        self.orderJournal = orderJournal
+        self.archiveManifest = archiveManifest
+
+        # One pooled session shared by all service objects
+        self.session = _OncSession(
+            poolConnections,
+            poolMaxsize,
+            poolBlock,
+            keepAlive,
+            retryPolicy,
+            rateLimiter,
+            compression,
+            hooks,
+        )
 
         # Create service objects
         self.discovery = _OncDiscovery(self)
@@ -107,6 +227,35 @@ class ONC:
         else:
             self.baseUrl = "https://qa.oceannetworks.ca/"
 
+    @property
+    def hooks(self) -> list:
+        """
+        Return the list of request hooks, which can be modified to add or remove hooks.
+        """
+        return self.session.requestHooks
+
+    def close(self) -> None:
+        """
+        Close the pooled HTTP session and release its connections.
+
+        The index of the archived files downloaded by ``downloadArchivefile`` is saved first (see ``archiveManifest``).
+
+        The ONC object can also be used as a context manager, which closes the session on exit.
+
+        Examples
+        --------
+        >>> with ONC("YOUR_TOKEN_HERE") as onc:  # doctest: +SKIP
+        ...     onc.getLocations({"locationCode": "FGPD"})
+        """  # noqa: E501
+        self.archive._saveManifest()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def print(self, obj, filename: str = "") -> None:
         """
         Pretty print a collection to the console or a file.
@@ -874,11 +1023,116 @@ class ONC:
         downloadResultsOnly: bool = False,
         includeMetadataFile: bool = True,
         overwrite: bool = False,
+        maxWorkers: int = 4,
     ):
         return self.delivery.orderDataProduct(
-            filters, maxRetries, downloadResultsOnly, includeMetadataFile, overwrite
+            filters,
+            maxRetries,
+            downloadResultsOnly,
+            includeMetadataFile,
+            overwrite,
+            maxWorkers,
+        )
+
+    def orderDataProducts(
+        self,
+        filtersList: list[dict],
+        maxRetries: int = 0,
+        downloadResultsOnly: bool = False,
+        includeMetadataFile: bool = True,
+        overwrite: bool = False,
+        maxWorkers: int = 4,
+    ):
+        """
+        Order several data products, and download their files as soon as each one is complete.
+
+        All the products are requested first, then a single loop polls the runs of the products
+        that are not complete. The files of a product start downloading, in a pool of ``maxWorkers`` threads,
+        as soon as its run is complete, while the other products are still polled.
+        An order that fails doesn't stop the others; its error is returned in its result.
+
+        Parameters
+        ----------
+        filtersList : list of dict
+            The filters of each data product, as passed to ``orderDataProduct``.
+        maxRetries : int, default 0
+            As in ``orderDataProduct``.
+        downloadResultsOnly : bool, default False
+            As in ``orderDataProduct``.
+        includeMetadataFile : bool, default True
+            As in ``orderDataProduct``.
+        overwrite : bool, default False
+            As in ``orderDataProduct``.
+        maxWorkers : int, default 4
+            Number of products requested, or downloaded, at the same time.
+
+        Returns
+        -------
+        list of dict
+            One result per filters, in the same order, with the keys of the ``orderDataProduct`` result and:
+
+            - dpRequestId: int | None
+            - status: str ("complete", "cancelled" or "error")
+            - error: str | None
+
+        Examples
+        --------
+        >>> filtersList = [
+        ...     {
+        ...         "dataProductCode": "TSSP",
+        ...         "extension": "png",
+        ...         "dateFrom": f"2019-0{month}-01",
+        ...         "dateTo": f"2019-0{month + 1}-01",
+        ...         "locationCode": "CRIP.C1",
+        ...         "deviceCategoryCode": "CTD",
+        ...         "dpo_qualityControl": "1",
+        ...         "dpo_resample": "none",
+        ...     }
+        ...     for month in range(1, 7)
+        ... ]
+        >>> results = onc.orderDataProducts(filtersList)  # doctest: +SKIP
+        """  # noqa: E501
+        return self.delivery.orderDataProducts(
+            filtersList,
+            maxRetries,
+            downloadResultsOnly,
+            includeMetadataFile,
+            overwrite,
+            maxWorkers,
         )
 
+    def resumeOrders(
+        self, maxRetries: int = 0, overwrite: bool = False, maxWorkers: int = 4
+    ):
+        """
+        Continue the data product orders of the journal that are not complete.
+
+        Requires ``orderJournal``. The orders are resumed with their dpRequestId and runs, so the data products
+        are not requested nor generated again, and the files already downloaded are skipped if their size and
+        modification time match the journal. The data products are run if the order stopped before running them.
+        An order that fails is returned with its error, and stays in the journal to be resumed again.
+
+        Parameters
+        ----------
+        maxRetries : int, default 0
+            As in ``orderDataProduct``.
+        overwrite : bool, default False
+            As in ``orderDataProduct``.
+        maxWorkers : int, default 4
+            As in ``orderDataProduct``.
+
+        Returns
+        -------
+        list of dict
+            One result per order resumed, in the format of ``orderDataProducts``.
+
+        Examples
+        --------
+        >>> onc = ONC("YOUR_TOKEN_HERE", orderJournal=True)  # doctest: +SKIP
+        >>> results = onc.resumeOrders()  # doctest: +SKIP
+        """  # noqa: E501
+        return self.delivery.resumeOrders(maxRetries, overwrite, maxWorkers)
+
     def requestDataProduct(self, filters: dict):
         return self.delivery.requestDataProduct(filters)
 
@@ -963,14 +1217,27 @@ class ONC:
         downloadResultsOnly: bool = False,
         includeMetadataFile: bool = True,
         overwrite: bool = False,
+        maxWorkers: int = 4,
     ):
         return self.delivery.downloadDataProduct(
-            runId, maxRetries, downloadResultsOnly, includeMetadataFile, overwrite
+            runId,
+            maxRetries,
+            downloadResultsOnly,
+            includeMetadataFile,
+            overwrite,
+            maxWorkers,
         )
 
     # Real-time methods
 
-    def getScalardataByLocation(self, filters: dict = None, allPages: bool = False):
+    def getScalardataByLocation(
+        self,
+        filters: dict = None,
+        allPages: bool = False,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+        columnar: bool = False,
+    ):
         """
         Return scalar data in JSON format by given location code and device category code.
 
@@ -1007,17 +1274,38 @@ class ONC:
 
         allPages : bool, default False
             Whether the response concatenates data on all pages if there are more than one page due to rowLimit.
+        shardBy : str, optional
+            Split the dateFrom/dateTo range into time shards of a "day", "week", "month" or "year",
+            and download the pages of all shards concurrently. The shards are merged in time order
+            into the same response structure. Only used when allPages is True,
+            and requires absolute dateFrom and dateTo filters.
+        maxWorkers : int, default 4
+            Number of shards downloaded at the same time when shardBy is provided.
+        columnar : bool, default False
+            Return the data of each sensor as typed NumPy arrays instead of lists:
+            ``sampleTimes`` as ``datetime64[ms]``, ``values`` as ``float64`` (missing values are NaN)
+            and ``qaqcFlags`` as ``int8``. With allPages, pages are appended into growable array buffers.
+            Requires numpy (``pip install onc[columnar]``) and the default outputFormat "array".
 
         Returns
         -------
         dict
             API response.
         """  # noqa: E501
-        return self.realTime.getScalardataByLocation(filters, allPages)
+        return self.realTime.getScalardataByLocation(
+            filters, allPages, shardBy, maxWorkers, columnar
+        )
 
     getDirectByLocation = getScalardataByLocation
 
-    def getScalardataByDevice(self, filters: dict = None, allPages: bool = False):
+    def getScalardataByDevice(
+        self,
+        filters: dict = None,
+        allPages: bool = False,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+        columnar: bool = False,
+    ):
         """
         Return scalar data in JSON format by given device code.
 
@@ -1051,17 +1339,38 @@ class ONC:
 
         allPages : bool, default False
             Whether the response concatenates data on all pages if there are more than one page due to rowLimit.
+        shardBy : str, optional
+            Split the dateFrom/dateTo range into time shards of a "day", "week", "month" or "year",
+            and download the pages of all shards concurrently. The shards are merged in time order
+            into the same response structure. Only used when allPages is True,
+            and requires absolute dateFrom and dateTo filters.
+        maxWorkers : int, default 4
+            Number of shards downloaded at the same time when shardBy is provided.
+        columnar : bool, default False
+            Return the data of each sensor as typed NumPy arrays instead of lists:
+            ``sampleTimes`` as ``datetime64[ms]``, ``values`` as ``float64`` (missing values are NaN)
+            and ``qaqcFlags`` as ``int8``. With allPages, pages are appended into growable array buffers.
+            Requires numpy (``pip install onc[columnar]``) and the default outputFormat "array".
 
         Returns
         -------
         dict
             API response.
         """  # noqa: E501
-        return self.realTime.getScalardataByDevice(filters, allPages)
+        return self.realTime.getScalardataByDevice(
+            filters, allPages, shardBy, maxWorkers, columnar
+        )
 
     getDirectByDevice = getScalardataByDevice
 
-    def getScalardata(self, filters: dict = None, allPages: bool = False):
+    def getScalardata(
+        self,
+        filters: dict = None,
+        allPages: bool = False,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+        columnar: bool = False,
+    ):
         """
         Return scalar data in JSON format by given query parameters.
 
@@ -1079,6 +1388,18 @@ class ONC:
             for more information.
         allPages : bool, default False
             Whether the response concatenates data on all pages if there are more than one page due to rowLimit.
+        shardBy : str, optional
+            Split the dateFrom/dateTo range into time shards of a "day", "week", "month" or "year",
+            and download the pages of all shards concurrently. The shards are merged in time order
+            into the same response structure. Only used when allPages is True,
+            and requires absolute dateFrom and dateTo filters.
+        maxWorkers : int, default 4
+            Number of shards downloaded at the same time when shardBy is provided.
+        columnar : bool, default False
+            Return the data of each sensor as typed NumPy arrays instead of lists:
+            ``sampleTimes`` as ``datetime64[ms]``, ``values`` as ``float64`` (missing values are NaN)
+            and ``qaqcFlags`` as ``int8``. With allPages, pages are appended into growable array buffers.
+            Requires numpy (``pip install onc[columnar]``) and the default outputFormat "array".
 
         Returns
         -------
@@ -1086,9 +1407,51 @@ class ONC:
             API response.
 
         """  # noqa: E501
-        return self.realTime.getScalardata(filters, allPages)
+        return self.realTime.getScalardata(
+            filters, allPages, shardBy, maxWorkers, columnar
+        )
+
+    def iterScalardata(self, filters: dict = None, columnar: bool = False):
+        """
+        Return a generator that yields each page of scalar data as soon as it is downloaded.
+
+        A memory-friendly alternative to ``getScalardata(filters, allPages=True)``.
+        Pages are not concatenated, so each page can be processed and discarded before the next one is requested.
+        Whether it is by device or by location is inferred from the keys in the given query parameters.
+
+        Parameters
+        ----------
+        filters : dict, optional
+            Query string parameters in the API request. See ``getScalardataByLocation`` and ``getScalardataByDevice``
+            for more information.
+        columnar : bool, default False
+            Convert the data of each sensor in each page to typed NumPy arrays. See ``getScalardata``.
+
+        Yields
+        ------
+        dict
+            API response of each page, with the same structure as the one returned by ``getScalardata``.
+
+        Examples
+        --------
+        >>> params = {
+        ...     "deviceCode": "BPR-Folger-59",
+        ...     "dateFrom": "2019-11-23T00:00:00.000Z",
+        ...     "dateTo": "2019-11-24T00:00:00.000Z",
+        ...     "rowLimit": 1000,
+        ... }  # doctest: +SKIP
+        >>> for page in onc.iterScalardata(params):  # doctest: +SKIP
+        ...     process(page["sensorData"])
+        """  # noqa: E501
+        return self.realTime.iterScalardata(filters, columnar)
 
-    def getRawdataByLocation(self, filters: dict = None, allPages: bool = False):
+    def getRawdataByLocation(
+        self,
+        filters: dict = None,
+        allPages: bool = False,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+    ):
         """
         Return the raw data at a given location for the given device category.
 
@@ -1122,17 +1485,32 @@ class ONC:
 
         allPages : bool, default False
             Whether the response concatenates data on all pages if there are more than one page due to rowLimit.
+        shardBy : str, optional
+            Split the dateFrom/dateTo range into time shards of a "day", "week", "month" or "year",
+            and download the pages of all shards concurrently. The shards are merged in time order
+            into the same response structure. Only used when allPages is True,
+            and requires absolute dateFrom and dateTo filters.
+        maxWorkers : int, default 4
+            Number of shards downloaded at the same time when shardBy is provided.
 
         Returns
         -------
         dict
             API response.
         """  # noqa: E501
-        return self.realTime.getRawdataByLocation(filters, allPages)
+        return self.realTime.getRawdataByLocation(
+            filters, allPages, shardBy, maxWorkers
+        )
 
     getDirectRawByLocation = getRawdataByLocation
 
-    def getRawdataByDevice(self, filters: dict = None, allPages: bool = False):
+    def getRawdataByDevice(
+        self,
+        filters: dict = None,
+        allPages: bool = False,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+    ):
         """
         Return the raw data for a given device.
 
@@ -1165,17 +1543,30 @@ class ONC:
 
         allPages : bool, default False
             Whether the response concatenates data on all pages if there are more than one page due to rowLimit.
+        shardBy : str, optional
+            Split the dateFrom/dateTo range into time shards of a "day", "week", "month" or "year",
+            and download the pages of all shards concurrently. The shards are merged in time order
+            into the same response structure. Only used when allPages is True,
+            and requires absolute dateFrom and dateTo filters.
+        maxWorkers : int, default 4
+            Number of shards downloaded at the same time when shardBy is provided.
 
         Returns
         -------
         dict
             API response.
         """  # noqa: E501
-        return self.realTime.getRawdataByDevice(filters, allPages)
+        return self.realTime.getRawdataByDevice(filters, allPages, shardBy, maxWorkers)
 
     getDirectRawByDevice = getRawdataByDevice
 
-    def getRawdata(self, filters: dict = None, allPages: bool = False):
+    def getRawdata(
+        self,
+        filters: dict = None,
+        allPages: bool = False,
+        shardBy: str | None = None,
+        maxWorkers: int = 4,
+    ):
         """
         Return the raw data by given query parameters.
 
@@ -1193,13 +1584,41 @@ class ONC:
             for more information.
         allPages : bool, default False
             Whether the response concatenates data on all pages if there are more than one page due to rowLimit.
+        shardBy : str, optional
+            Split the dateFrom/dateTo range into time shards of a "day", "week", "month" or "year",
+            and download the pages of all shards concurrently. The shards are merged in time order
+            into the same response structure. Only used when allPages is True,
+            and requires absolute dateFrom and dateTo filters.
+        maxWorkers : int, default 4
+            Number of shards downloaded at the same time when shardBy is provided.
 
         Returns
         -------
         dict
             API response.
         """  # noqa: E501
-        return self.realTime.getRawdata(filters, allPages)
+        return self.realTime.getRawdata(filters, allPages, shardBy, maxWorkers)
+
+    def iterRawdata(self, filters: dict = None):
+        """
+        Return a generator that yields each page of raw data as soon as it is downloaded.
+
+        A memory-friendly alternative to ``getRawdata(filters, allPages=True)``.
+        Pages are not concatenated, so each page can be processed and discarded before the next one is requested.
+        Whether it is by device or by location is inferred from the keys in the given query parameters.
+
+        Parameters
+        ----------
+        filters : dict, optional
+            Query string parameters in the API request. See ``getRawdataByLocation`` and ``getRawdataByDevice``
+            for more information.
+
+        Yields
+        ------
+        dict
+            API response of each page, with the same structure as the one returned by ``getRawdata``.
+        """  # noqa: E501
+        return self.realTime.iterRawdata(filters)
 
     def getSensorCategoryCodes(self, filters: dict):
         """
@@ -1384,6 +1803,27 @@ class ONC:
         """  # noqa: E501
         return self.archive.getArchivefile(filters, allPages)
 
+    def iterArchivefile(self, filters: dict = None):
+        """
+        Return a generator that yields each page of the archive file list as soon as it is downloaded.
+
+        A memory-friendly alternative to ``getArchivefile(filters, allPages=True)``.
+        Pages are not concatenated, so each page can be processed and discarded before the next one is requested.
+        Whether it is by device or by location is inferred from the keys in the given query parameters.
+
+        Parameters
+        ----------
+        filters : dict, optional
+            Query string parameters in the API request.
+            See ``getArchivefileByLocation`` and ``getArchivefileByDevice`` for more information.
+
+        Yields
+        ------
+        dict
+            API response of each page, with the same structure as the one returned by ``getArchivefile``.
+        """  # noqa: E501
+        return self.archive.iterArchivefile(filters)
+
     def getArchivefileUrls(
         self,
         filters: dict = None,
@@ -1460,6 +1900,9 @@ class ONC:
             Whether to overwrite the file if it exists. 0 size file is treated as non-existent,
             meaning it gets overwritten even when overwrite=False.
 
+            If a previous download was interrupted, the partial ``.part`` file left behind is resumed
+            with an HTTP Range request instead of downloading the file again from the start.
+
         Returns
         -------
         dict | None
@@ -1471,7 +1914,11 @@ class ONC:
     getFile = downloadArchivefile
 
     def downloadDirectArchivefile(
-        self, filters: dict = None, overwrite: bool = False, allPages: bool = False
+        self,
+        filters: dict = None,
+        overwrite: bool = False,
+        allPages: bool = False,
+        maxWorkers: int = 1,
     ):
         """
         Download files from Oceans 3.0 Archiving System by given query parameters.
@@ -1491,12 +1938,70 @@ class ONC:
             Whether to overwrite the file if it exists.
         allPages : bool, default False
             Whether the response concatenates data on all pages if there are more than one page due to rowLimit.
+        maxWorkers : int, default 1
+            Number of files downloaded concurrently. Downloading many small files is mostly bound by latency,
+            so a few workers can speed it up considerably. Keep it at most ``poolMaxsize``.
 
         Returns
         -------
         dict
             A dict showing download results.
+            ``downloadResults`` lists the result of each file in the same order as the file list.
+            ``stats`` has the total size, the summed download time of all files (``downloadTime``),
+            the elapsed wall-clock time (``wallTime``) and the number of downloaded files (``fileCount``).
         """  # noqa: E501
-        return self.archive.downloadDirectArchivefile(filters, overwrite, allPages)
+        return self.archive.downloadDirectArchivefile(
+            filters, overwrite, allPages, maxWorkers
+        )
 
     getDirectFiles = downloadDirectArchivefile
+
+    def syncArchivefiles(
+        self,
+        filters: dict,
+        since: str | None = None,
+        prune: bool = False,
+        maxWorkers: int = 4,
+    ):
+        """
+        Mirror the files of the Oceans 3.0 Archiving System that match the query parameters into outPath.
+
+        Like rsync, only the files that are new or changed since the last sync are downloaded.
+        The files are listed with ``getArchivefile`` (``returnOptions="all"``, all pages), and compared by filename,
+        size and dateFrom with the manifest of outPath (see ``archiveManifest``, which is always used by this method).
+        Files found in outPath with the listed size are added to the manifest instead of being downloaded again.
+        outPath is scanned once per sync, so files deleted from it are downloaded again, without checking each file on disk.
+
+        The latest dateFrom listed is saved as a high-water mark per filters (in ".onc-sync.json" in outPath),
+        and the next sync with the same filters lists the files from there, so only the new time window is listed.
+        Files archived later with an earlier dateFrom are not listed again unless ``since`` is given.
+
+        Parameters
+        ----------
+        filters : dict
+            Query string parameters in the API request, as in ``getArchivefile``.
+            ``dateTo`` defaults to the current time.
+        since : str | None, default None
+            The dateFrom of the files listed, e.g. "2020-01-01T00:00:00.000Z".
+            The high-water mark of the last sync with the same filters if None, or the ``dateFrom`` of the filters
+            on the first sync.
+        prune : bool, default False
+            Whether the files synced before in the listed time window, but not listed anymore, are deleted.
+        maxWorkers : int, default 4
+            Number of files downloaded concurrently.
+
+        Returns
+        -------
+        dict
+            ``downloadResults`` lists the result of each file downloaded, and ``pruned`` the names of the files deleted.
+            ``stats`` has the total size, the summed download time (``downloadTime``), the elapsed time (``wallTime``),
+            the number of files downloaded (``fileCount``) and unchanged (``skipped``), and the time window listed
+            (``dateFrom`` and ``dateTo``).
+
+        Examples
+        --------
+        >>> filters = {"deviceCode": "BPR-Folger-59", "dateFrom": "2019-11-23T00:00:00.000Z"}
+        >>> result = onc.syncArchivefiles(filters)  # doctest: +SKIP
+        >>> result = onc.syncArchivefiles(filters)  # Only lists the files since the first sync # doctest: +SKIP
+        """  # noqa: E501
+        return self.archive.syncArchivefiles(filters, since, prune, maxWorkers)
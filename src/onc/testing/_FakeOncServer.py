@@ -0,0 +1,646 @@
+"""
+A local stand-in for the Oceans 3.0 API.
+
+It serves synthetic but structurally faithful responses for the endpoints used by
+the client library, so that the client can be tested and benchmarked offline.
+"""
+
+import argparse
+import contextlib
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import parse
+
+_dateFormat = "%Y-%m-%dT%H:%M:%S.%f"
+_defaultDateFrom = datetime(2020, 1, 1)
+
+
+def _parseDate(value: str | None, default: datetime) -> datetime:
+    if not value:
+        return default
+    value = value.rstrip("Z")
+    for fmt in (_dateFormat, "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(value)
+
+
+def _formatDate(date: datetime) -> str:
+    return date.strftime(_dateFormat)[:-3] + "Z"
+
+
+class FakeOncServer:
+    """
+    A local stand-in for the Oceans 3.0 API, served over HTTP on localhost.
+
+    Data is generated on the fly from the query parameters: one sample every
+    ``sampleInterval`` seconds for scalardata and rawdata, and one archive file every
+    ``fileInterval`` seconds, between ``dateFrom`` and ``dateTo``.
+    Responses longer than ``rowLimit`` are paginated with a ``next`` object like the real API.
+
+    Data product orders answer the "run" and "download" methods with
+    status 202 a configurable number of times before they complete.
+
+    Parameters
+    ----------
+    host : str, default "127.0.0.1"
+        Interface to bind to.
+    port : int, default 0
+        Port to bind to. 0 picks a free port.
+    latency : float, default 0.0
+        Seconds to wait before answering each request.
+    failureRate : float, default 0.0
+        Probability (0 to 1) of answering a request with ``failureStatus`` instead.
+    failureStatus : int, default 503
+        HTTP status used for injected failures.
+    sensorCount : int, default 3
+        Number of sensors in scalardata responses.
+    sampleInterval : float, default 1.0
+        Seconds between two scalardata or rawdata samples.
+    fileInterval : float, default 3600.0
+        Seconds between two archive files.
+    fileSize : int, default 4096
+        Size in bytes of archive and data product files.
+    productFileCount : int, default 3
+        Number of files generated for each data product order (excluding the metadata).
+    runPolls : int, default 2
+        Number of 202 responses returned by the "run" method before the product is complete.
+    downloadPolls : int, default 1
+        Number of 202 responses returned for each data product file before it is ready.
+    compression : bool, default True
+        Whether JSON responses are gzip-compressed for clients that accept it.
+
+    The server can also be run as a separate process with ``python -m onc.testing --port 8321``.
+
+    Examples
+    --------
+    >>> from onc import ONC
+    >>> from onc.testing import FakeOncServer
+    >>> with FakeOncServer(latency=0.01) as server:  # doctest: +SKIP
+    ...     onc = ONC("FAKE_TOKEN")
+    ...     onc.baseUrl = server.url
+    ...     onc.getScalardata({"deviceCode": "FAKE", "rowLimit": 100}, allPages=True)
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        failureRate: float = 0.0,
+        failureStatus: int = 503,
+        sensorCount: int = 3,
+        sampleInterval: float = 1.0,
+        fileInterval: float = 3600.0,
+        fileSize: int = 4096,
+        productFileCount: int = 3,
+        runPolls: int = 2,
+        downloadPolls: int = 1,
+        compression: bool = True,
+    ):
+        self.latency = latency
+        self.failureRate = failureRate
+        self.failureStatus = failureStatus
+        self.sensorCount = sensorCount
+        self.sampleInterval = sampleInterval
+        self.fileInterval = fileInterval
+        self.fileSize = fileSize
+        self.productFileCount = productFileCount
+        self.runPolls = runPolls
+        self.downloadPolls = downloadPolls
+        self.compression = compression
+
+        # (method, path, params) of every request received
+        self.requestLog = []
+        # number of TCP connections accepted
+        self.connectionCount = 0
+        self._failNext = []
+        self._lock = threading.Lock()
+        self._random = random.Random(0)
+        self._products = {}
+        self._runs = {}
+        self._downloads = {}
+        self._nextRequestId = 1000
+
+        server = self
+
+        class Handler(_FakeOncHandler):
+            fake = server
+
+        self._httpd = _FakeOncHTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """
+        Return the base URL of the server, to be used as ``ONC.baseUrl``.
+        """
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "FakeOncServer":
+        """
+        Start serving in a background thread.
+        """
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop serving and release the port.
+        """
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def serveForever(self) -> None:
+        """
+        Serve in the calling thread until interrupted.
+        """
+        self._httpd.serve_forever()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def failNext(self, count: int = 1, status: int = 503, headers: dict = None):
+        """
+        Answer the next ``count`` requests with ``status``.
+        """
+        with self._lock:
+            self._failNext.extend([(status, headers or {})] * count)
+
+    def requestCount(self, path: str = "") -> int:
+        """
+        Return the number of requests received whose path starts with ``path``.
+        """
+        return sum(1 for _, p, _ in self.requestLog if p.startswith(path))
+
+    # Failure injection
+
+    def _injectedFailure(self):
+        with self._lock:
+            if self._failNext:
+                return self._failNext.pop(0)
+            if self.failureRate > 0 and self._random.random() < self.failureRate:
+                return (self.failureStatus, {})
+        return None
+
+    # Discovery
+
+    def discovery(self, service: str, params: dict):
+        if service == "locations/tree":
+            return 200, [
+                {
+                    "locationName": "Fake Location",
+                    "children": None,
+                    "description": "",
+                    "hasDeviceData": True,
+                    "locationCode": params.get("locationCode", "FAKE"),
+                    "hasPropertyData": False,
+                }
+            ]
+        if service == "dataAvailability/dataproducts":
+            return 200, {"availableDataProducts": [], "messages": [], "next": None}
+
+        row = {
+            "locationCode": params.get("locationCode", "FAKE"),
+            "deviceCode": params.get("deviceCode", "FAKE-DEVICE"),
+            "deviceCategoryCode": params.get("deviceCategoryCode", "CTD"),
+            "propertyCode": params.get("propertyCode", "seawatertemperature"),
+            "dataProductCode": params.get("dataProductCode", "TSSD"),
+            "hasDeviceData": "true",
+            "hasPropertyData": "false",
+        }
+        return 200, [row]
+
+    # Scalar and raw data
+
+    def _sampleTimes(self, params: dict):
+        """
+        Return the sample times of a page, and the dateFrom of the next page (or None).
+        """
+        dateFrom = _parseDate(params.get("dateFrom"), _defaultDateFrom)
+        dateTo = _parseDate(
+            params.get("dateTo"),
+            dateFrom + timedelta(seconds=100 * self.sampleInterval),
+        )
+        rowLimit = int(params.get("rowLimit", 100000))
+        step = timedelta(seconds=self.sampleInterval)
+
+        times = []
+        t = dateFrom
+        while t < dateTo and len(times) < rowLimit:
+            times.append(t)
+            t += step
+        nextFrom = t if t < dateTo else None
+        return times, nextFrom, dateTo
+
+    def _next(self, service: str, params: dict, nextFrom, dateTo):
+        if nextFrom is None:
+            return None
+        nextParams = dict(params)
+        nextParams["dateFrom"] = _formatDate(nextFrom)
+        nextParams["dateTo"] = _formatDate(dateTo)
+        query = parse.urlencode(nextParams)
+        return {
+            "parameters": nextParams,
+            "url": f"{self.url}api/{service}?{query}",
+        }
+
+    def scalardata(self, service: str, params: dict):
+        times, nextFrom, dateTo = self._sampleTimes(params)
+        sampleTimes = [_formatDate(t) for t in times]
+        sensorData = None
+        if times:
+            sensorData = []
+            for i in range(self.sensorCount):
+                values = [
+                    round(10 + i + ((t.timestamp() % 600) / 100.0), 4) for t in times
+                ]
+                sensorData.append(
+                    {
+                        "actualSamples": len(times),
+                        "data": {
+                            "qaqcFlags": [1] * len(times),
+                            "sampleTimes": list(sampleTimes),
+                            "values": values,
+                        },
+                        "outputFormat": "array",
+                        "propertyCode": f"property{i}",
+                        "sensorCategoryCode": f"sensor{i}",
+                        "sensorCode": f"Sensor{i}",
+                        "sensorName": f"Sensor {i}",
+                        "unitOfMeasure": "C",
+                    }
+                )
+        return 200, {
+            "citations": [],
+            "messages": [],
+            "next": self._next(service, params, nextFrom, dateTo),
+            "parameters": params,
+            "queryUrl": "",
+            "sensorData": sensorData,
+        }
+
+    def rawdata(self, service: str, params: dict):
+        times, nextFrom, dateTo = self._sampleTimes(params)
+        return 200, {
+            "citations": [],
+            "data": {
+                "lineTypes": [" "] * len(times),
+                "readings": [f"reading {t.timestamp():.0f}" for t in times],
+                "times": [_formatDate(t) for t in times],
+            },
+            "messages": [],
+            "metadata": {"dataMetadata": {}, "queryMetadata": {}},
+            "next": self._next(service, params, nextFrom, dateTo),
+            "outputFormat": "array",
+            "queryUrl": "",
+        }
+
+    # Archive files
+
+    def archivefileList(self, service: str, params: dict):
+        dateFrom = _parseDate(params.get("dateFrom"), _defaultDateFrom)
+        dateTo = _parseDate(params.get("dateTo"), dateFrom + timedelta(days=1))
+        rowLimit = int(params.get("rowLimit", 100000))
+        device = params.get("deviceCode") or (
+            f"{params.get('locationCode', 'FAKE')}-{params.get('deviceCategoryCode', 'DEV')}"  # noqa: E501
+        )
+        extension = params.get("fileExtension", "txt")
+        step = timedelta(seconds=self.fileInterval)
+
+        # align the first file to the interval grid
+        epoch = datetime(1970, 1, 1)
+        offset = (dateFrom - epoch).total_seconds() % self.fileInterval
+        t = (
+            dateFrom
+            if offset == 0
+            else dateFrom + timedelta(seconds=self.fileInterval - offset)
+        )
+
+        files = []
+        while t < dateTo and len(files) < rowLimit:
+            filename = f"{device}_{t.strftime('%Y%m%dT%H%M%S')}.000Z.{extension}"
+            if params.get("returnOptions") == "all":
+                files.append(
+                    {
+                        "archivedDate": _formatDate(t + step),
+                        "archiveLocation": "/archive",
+                        "compression": None,
+                        "dataProductCode": "LF",
+                        "dateFrom": _formatDate(t),
+                        "dateTo": _formatDate(t + step),
+                        "deviceCode": device,
+                        "fileSize": self.fileSize,
+                        "filename": filename,
+                        "modifyDate": _formatDate(t + step),
+                        "uncompressedFileSize": self.fileSize,
+                    }
+                )
+            else:
+                files.append(filename)
+            t += step
+
+        nextFrom = t if t < dateTo else None
+        return 200, {
+            "files": files,
+            "messages": [],
+            "next": self._next(service, params, nextFrom, dateTo),
+            "queryUrl": "",
+        }
+
+    def fileContent(self, name: str) -> bytes:
+        """
+        Return the deterministic content of an archive or data product file.
+        """
+        seed = hashlib.sha256(name.encode()).digest()
+        line = (seed.hex() + "\n").encode()
+        return (line * (self.fileSize // len(line) + 1))[: self.fileSize]
+
+    # Data product delivery
+
+    def productRequest(self, params: dict):
+        with self._lock:
+            self._nextRequestId += 1
+            dpRequestId = self._nextRequestId
+            self._products[dpRequestId] = {
+                "params": params,
+                "polls": 0,
+                "status": "queued",
+                "runId": dpRequestId * 10,
+            }
+        return 200, {
+            "dpRequestId": dpRequestId,
+            "compressedFileSize": self.fileSize * self.productFileCount,
+            "estimatedFileSize": f"{self.fileSize * self.productFileCount} B",
+            "estimatedProcessingTime": f"{max(self.runPolls, 1)} s",
+            "messages": [],
+        }
+
+    def productRun(self, params: dict):
+        product = self._products.get(int(params.get("dpRequestId", -1)))
+        if product is None:
+            return 400, _apiError(127, "Invalid dpRequestId", "dpRequestId")
+
+        with self._lock:
+            product["polls"] += 1
+            if product["status"] == "cancelled":
+                status = "cancelled"
+            elif product["polls"] > self.runPolls:
+                product["status"] = "complete"
+                status = "complete"
+            else:
+                product["status"] = "data product running"
+                status = "data product running"
+            self._runs[product["runId"]] = product
+
+        fileCount = self.productFileCount if status == "complete" else 0
+        body = [
+            {
+                "dpRunId": product["runId"],
+                "fileCount": fileCount,
+                "status": status,
+                "queuePosition": 0,
+            }
+        ]
+        return (200 if status in ("complete", "cancelled") else 202), body
+
+    def productStatus(self, params: dict):
+        product = self._products.get(int(params.get("dpRequestId", -1)))
+        if product is None:
+            return 400, _apiError(127, "Invalid dpRequestId", "dpRequestId")
+        return 200, {"searchHdrId": product["runId"], "status": product["status"]}
+
+    def productCancel(self, params: dict, restart: bool = False):
+        product = self._products.get(int(params.get("dpRequestId", -1)))
+        if product is None:
+            return 400, _apiError(127, "Invalid dpRequestId", "dpRequestId")
+        with self._lock:
+            if restart:
+                product["status"] = "queued"
+                product["polls"] = 0
+            else:
+                product["status"] = "cancelled"
+        return 200, [{"dpRunId": product["runId"], "status": product["status"]}]
+
+    def productDownload(self, params: dict):
+        """
+        Return (status, body, filename) for a data product file.
+        """
+        runId = int(params.get("dpRunId", -1))
+        index = params.get("index", "1")
+        product = self._runs.get(runId)
+        if product is None:
+            return 400, _apiError(127, "Invalid dpRunId", "dpRunId"), None
+        if index != "meta" and (
+            not index.isdigit() or not 1 <= int(index) <= self.productFileCount
+        ):
+            return 404, {"message": "File not found"}, None
+
+        with self._lock:
+            polls = self._downloads.get((runId, index), 0) + 1
+            self._downloads[(runId, index)] = polls
+        if polls <= self.downloadPolls:
+            return 202, {"message": "Running", "status": "running"}, None
+
+        if index == "meta":
+            filename = f"FAKE_{runId}_meta.xml"
+        else:
+            filename = f"FAKE_{runId}_{index}.txt"
+        return 200, None, filename
+
+
+_discoveryServices = (
+    "locations",
+    "locations/tree",
+    "deployments",
+    "devices",
+    "deviceCategories",
+    "properties",
+    "dataProducts",
+    "dataAvailability/dataproducts",
+)
+
+
+def _apiError(code: int, message: str, parameter: str) -> dict:
+    return {
+        "errors": [{"errorCode": code, "errorMessage": message, "parameter": parameter}]
+    }
+
+
+class _FakeOncHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # clients closing a connection early (e.g. an interrupted download) is expected
+        pass
+
+
+class _FakeOncHandler(BaseHTTPRequestHandler):
+    fake: FakeOncServer = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.fake._lock:
+            self.fake.connectionCount += 1
+
+    def do_HEAD(self):
+        self._handle(head=True)
+
+    def do_GET(self):
+        self._handle(head=False)
+
+    def _handle(self, head: bool):
+        fake = self.fake
+        url = parse.urlsplit(self.path)
+        params = dict(parse.parse_qsl(url.query, keep_blank_values=True))
+        path = url.path
+        fake.requestLog.append((self.command, path, params))
+
+        if fake.latency > 0:
+            time.sleep(fake.latency)
+
+        failure = fake._injectedFailure()
+        if failure is not None:
+            status, headers = failure
+            return self._sendJson(
+                status, {"message": "Injected failure"}, headers, head
+            )
+
+        if not path.startswith("/api/"):
+            return self._sendJson(404, {"message": "Not found"}, head=head)
+        service = path[len("/api/") :]
+
+        if not params.pop("token", ""):
+            return self._sendJson(401, {"message": "Unauthorized"}, head=head)
+
+        if service in _discoveryServices:
+            status, body = fake.discovery(service, params)
+            payload = json.dumps(body).encode()
+            etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            return self._sendJson(status, body, {"ETag": etag}, head)
+        elif service.startswith("scalardata/"):
+            status, body = fake.scalardata(service, params)
+        elif service.startswith("rawdata/"):
+            status, body = fake.rawdata(service, params)
+        elif service in ("archivefile/device", "archivefile/location"):
+            status, body = fake.archivefileList(service, params)
+        elif service == "archivefile/download":
+            return self._sendFile(params.get("filename", ""), head)
+        elif service == "dataProductDelivery/request":
+            status, body = fake.productRequest(params)
+        elif service == "dataProductDelivery/run":
+            status, body = fake.productRun(params)
+        elif service == "dataProductDelivery/status":
+            status, body = fake.productStatus(params)
+        elif service == "dataProductDelivery/cancel":
+            status, body = fake.productCancel(params)
+        elif service == "dataProductDelivery/restart":
+            status, body = fake.productCancel(params, restart=True)
+        elif service == "dataProductDelivery/download":
+            status, body, filename = fake.productDownload(params)
+            if status == 200:
+                return self._sendFile(filename, head)
+        else:
+            status, body = 404, {"message": "Not found"}
+
+        self._sendJson(status, body, head=head)
+
+    def _sendJson(self, status: int, body, headers: dict = None, head: bool = False):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        acceptEncoding = self.headers.get("Accept-Encoding", "")
+        if self.fake.compression and "gzip" in acceptEncoding and len(payload) > 1024:
+            payload = gzip.compress(payload, compresslevel=5)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, str(value))
+        self.end_headers()
+        if not head:
+            self.wfile.write(payload)
+
+    def _sendFile(self, filename: str, head: bool):
+        if not filename:
+            return self._sendJson(
+                400, _apiError(127, "Invalid filename", "filename"), head=head
+            )
+        content = self.fake.fileContent(filename)
+        total = len(content)
+        status = 200
+        start = 0
+
+        rangeHeader = self.headers.get("Range", "")
+        if rangeHeader.startswith("bytes="):
+            start = int(rangeHeader[len("bytes=") :].split("-")[0] or 0)
+            if start >= total:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{total}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            status = 206
+
+        body = content[start:]
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Disposition", f"attachment; filename={filename}")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{total - 1}/{total}")
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+
+def main(argv: list[str] | None = None) -> None:
+    argParser = argparse.ArgumentParser(
+        description="Run a local stand-in for the Oceans 3.0 API."
+    )
+    argParser.add_argument("--host", default="127.0.0.1")
+    argParser.add_argument("--port", type=int, default=8321)
+    argParser.add_argument("--latency", type=float, default=0.0)
+    argParser.add_argument("--failure-rate", type=float, default=0.0)
+    argParser.add_argument("--failure-status", type=int, default=503)
+    argParser.add_argument("--sensor-count", type=int, default=3)
+    argParser.add_argument("--file-size", type=int, default=4096)
+    args = argParser.parse_args(argv)
+
+    server = FakeOncServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        failureRate=args.failure_rate,
+        failureStatus=args.failure_status,
+        sensorCount=args.sensor_count,
+        fileSize=args.file_size,
+    )
+    print(f"Serving a fake Oceans 3.0 API at {server.url}")
+    with contextlib.suppress(KeyboardInterrupt):
+        server.serveForever()
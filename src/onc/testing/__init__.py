@@ -0,0 +1,3 @@
+from ._FakeOncServer import FakeOncServer
+
+__all__ = ["FakeOncServer"]
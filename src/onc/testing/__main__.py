@@ -0,0 +1,3 @@
+from ._FakeOncServer import main
+
+main()
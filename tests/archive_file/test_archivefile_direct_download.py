@@ -40,3 +40,20 @@ def test_valid_params_overwrite_zero_file_size(
     assert (
         os.path.getsize(file_path) != 0
     ), "0-size file should be overwritten even if overwrite is False"
+
+
+def test_valid_params_multiple_pages_concurrent(
+    requester, params_location_multiple_pages, util
+):
+    result = requester.downloadDirectArchivefile(
+        params_location_multiple_pages, allPages=True, maxWorkers=4
+    )
+
+    data = requester.getArchivefile(params_location_multiple_pages, allPages=True)
+
+    assert util.get_download_files_num(requester) == len(data["files"])
+
+    assert [r["file"] for r in result["downloadResults"]] == data["files"]
+
+    assert result["stats"]["fileCount"] == len(data["files"])
+    assert result["stats"]["wallTime"] > 0
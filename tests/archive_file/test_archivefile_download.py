@@ -46,3 +46,24 @@ def test_valid_params_overwrite_zero_file_size(requester):
     assert (
         os.path.getsize(file_path) != 0
     ), "0-size file should be overwritten even if overwrite is False"
+
+
+def test_valid_params_resume_partial_file(requester, util):
+    filename = "BPR-Folger-59_20191123T000000.000Z.txt"
+
+    file_path = requester.outPath / filename
+    part_path = requester.outPath / f"{filename}.part"
+
+    requester.downloadArchivefile(filename)
+    content = file_path.read_bytes()
+
+    # Case when downloading was interrupted halfway, leaving a partial file behind
+    part_path.write_bytes(content[: len(content) // 2])
+    file_path.unlink()
+
+    result = requester.downloadArchivefile(filename)
+
+    assert file_path.read_bytes() == content
+    assert not part_path.exists()
+    assert result["size"] == len(content)
+    assert util.get_download_files_num(requester) == 1
@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+
+from onc import ONC
+
+
+def test_archive_manifest(fake_filters, fake_server, tmp_path):
+    onc = ONC("FAKE_TOKEN", outPath=tmp_path, reporter="silent", archiveManifest=True)
+    onc.baseUrl = fake_server.url
+    filters = fake_filters | {"dateTo": "2020-01-01T05:00:00.000Z"}
+    first = "FAKE_20200101T000000.000Z.txt"
+    onc.downloadArchivefile(first)
+    (tmp_path / "FAKE_20200101T010000.000Z.txt").write_bytes(
+        fake_server.fileContent("FAKE_20200101T010000.000Z.txt")
+    )
+
+    # A single download is added to the manifest, saved when the client is closed
+    assert not (tmp_path / ".onc-manifest.json").exists()
+    onc.close()
+    manifest = json.loads((tmp_path / ".onc-manifest.json").read_text())
+    assert list(manifest) == [first]
+
+    result = onc.downloadDirectArchivefile(filters)
+
+    # The file found in outPath is added to the manifest, without a checksum
+    assert result["stats"]["fileCount"] == 3
+    manifest = json.loads((tmp_path / ".onc-manifest.json").read_text())
+    assert len(manifest) == 5
+    for filename, entry in manifest.items():
+        content = fake_server.fileContent(filename)
+        assert entry["size"] == len(content)
+        assert "token" not in entry["url"]
+        if entry["sha256"] is not None:
+            assert entry["sha256"] == hashlib.sha256(content).hexdigest()
+    assert sum(entry["sha256"] is None for entry in manifest.values()) == 1
+
+    # A file of the manifest deleted from outPath is downloaded again
+    (tmp_path / first).unlink()
+    onc = ONC("FAKE_TOKEN", outPath=tmp_path, reporter="silent", archiveManifest=True)
+    onc.baseUrl = fake_server.url
+    result = onc.downloadDirectArchivefile(filters)
+
+    assert result["stats"]["fileCount"] == 1
+    assert (tmp_path / first).read_bytes() == fake_server.fileContent(first)
+    manifest = json.loads((tmp_path / ".onc-manifest.json").read_text())
+    assert len(manifest) == 5
+
+
+def test_archive_manifest_skips_without_stat(
+    fake_filters, fake_server, tmp_path, monkeypatch
+):
+    filters = fake_filters | {"dateTo": "2020-01-01T05:00:00.000Z"}
+    with ONC("FAKE_TOKEN", outPath=tmp_path, archiveManifest=True) as onc:
+        onc.baseUrl = fake_server.url
+        onc.downloadDirectArchivefile(filters)
+
+        def noStat(function):
+            def checked(path):
+                assert not str(path).startswith(str(tmp_path)), "file checked on disk"
+                return function(path)
+
+            return checked
+
+        monkeypatch.setattr(os.path, "getsize", noStat(os.path.getsize))
+        monkeypatch.setattr(os.path, "exists", noStat(os.path.exists))
+        result = onc.downloadDirectArchivefile(filters)
+
+    assert result["stats"]["fileCount"] == 0
@@ -0,0 +1,84 @@
+import hashlib
+
+import pytest
+import requests
+from onc import ONC
+from onc.modules._util import saveAsFile
+
+
+def test_archivefile_download(fake_filters, fake_requester, fake_server, util):
+    filters = fake_filters | {"dateTo": "2020-01-01T05:00:00.000Z"}
+
+    result = fake_requester.downloadDirectArchivefile(filters)
+
+    assert result["stats"]["fileCount"] == 5
+    assert util.get_download_files_num(fake_requester) == 5
+    file = result["downloadResults"][0]["file"]
+    assert (fake_requester.outPath / file).read_bytes() == fake_server.fileContent(file)
+
+
+def get_file(onc: ONC, filename: str):
+    return onc.session.get(
+        onc.archive._serviceUrl("archivefile/download"),
+        params={"filename": filename, "token": onc.token},
+        stream=True,
+    )
+
+
+def test_save_as_file(fake_requester, fake_server, tmp_path):
+    filename = "FAKE_20200101T000000.000Z.txt"
+    content = fake_server.fileContent(filename)
+
+    saved = saveAsFile(
+        get_file(fake_requester, filename), tmp_path, filename, False, chunkSize=100
+    )
+
+    assert (tmp_path / filename).read_bytes() == content
+    assert saved["size"] == len(content)
+    assert saved["sha256"] == hashlib.sha256(content).hexdigest()
+    assert list(tmp_path.glob("*.part")) == []
+
+
+def test_save_as_file_incomplete(fake_requester, fake_server, tmp_path):
+    filename = "FAKE_20200101T000000.000Z.txt"
+    content = fake_server.fileContent(filename)
+    response = get_file(fake_requester, filename)
+    response.headers["Content-Length"] = str(len(content) + 10)
+
+    with pytest.raises(requests.ConnectionError, match="Incomplete download"):
+        saveAsFile(response, tmp_path, filename, False)
+
+    # The partial file is kept to resume the download, and removed once it is done
+    assert not (tmp_path / filename).exists()
+    assert (tmp_path / f"{filename}.part").read_bytes() == content
+
+    fake_requester.downloadArchivefile(filename)
+
+    assert (tmp_path / filename).read_bytes() == content
+    assert list(tmp_path.glob("*.part")) == []
+
+
+def test_save_as_file_exists(fake_requester, tmp_path):
+    filename = "FAKE_20200101T000000.000Z.txt"
+    (tmp_path / filename).write_text("old")
+    response = get_file(fake_requester, filename)
+
+    with pytest.raises(FileExistsError):
+        saveAsFile(response, tmp_path, filename, False)
+
+    assert (tmp_path / filename).read_text() == "old"
+    assert list(tmp_path.glob("*.part")) == []
+
+
+def test_download_archivefile_exists(fake_requester, fake_server, tmp_path):
+    filename = "FAKE_20200101T000000.000Z.txt"
+    (tmp_path / filename).write_text("old")
+    (tmp_path / f"{filename}.part").write_text("partial")
+    fake_server.requestLog.clear()
+
+    with pytest.raises(FileExistsError):
+        fake_requester.downloadArchivefile(filename)
+
+    # The file is checked before a (range) request is sent
+    assert fake_server.requestCount("/api/archivefile/download") == 0
+    assert (tmp_path / filename).read_text() == "old"
@@ -0,0 +1,67 @@
+import json
+import os
+from pathlib import Path
+
+from onc import ONC
+from onc.testing import FakeOncServer
+
+
+def test_sync_archivefiles(fake_filters, tmp_path):
+    with FakeOncServer() as server:
+        onc = ONC("FAKE_TOKEN", outPath=tmp_path, reporter="silent")
+        onc.baseUrl = server.url
+        filters = fake_filters | {"dateTo": "2020-01-01T05:00:00.000Z"}
+
+        result = onc.syncArchivefiles(filters)
+        assert (result["stats"]["fileCount"], result["stats"]["skipped"]) == (5, 0)
+
+        # The next sync lists the files from the last one listed
+        filters["dateTo"] = "2020-01-01T08:00:00.000Z"
+        result = onc.syncArchivefiles(filters)
+        assert result["stats"]["dateFrom"] == "2020-01-01T04:00:00.000Z"
+        assert (result["stats"]["fileCount"], result["stats"]["skipped"]) == (3, 1)
+        assert len(list(tmp_path.glob("*.txt"))) == 8
+
+        # Deleted files are downloaded again
+        (tmp_path / "FAKE_20200101T000000.000Z.txt").unlink()
+        result = onc.syncArchivefiles(filters, since=fake_filters["dateFrom"])
+        assert (result["stats"]["fileCount"], result["stats"]["skipped"]) == (1, 7)
+
+        # Changed files are downloaded again
+        server.fileSize = 1000
+        since = fake_filters["dateFrom"]
+        result = onc.syncArchivefiles(filters, since=since)
+        assert result["stats"]["fileCount"] == 8
+        file = result["downloadResults"][0]["file"]
+        assert (tmp_path / file).read_bytes() == server.fileContent(file)
+
+        # Files not listed anymore are pruned
+        server.fileInterval = 7200
+        result = onc.syncArchivefiles(filters, since=since, prune=True)
+        assert (result["stats"]["fileCount"], result["stats"]["skipped"]) == (0, 4)
+        assert len(result["pruned"]) == 4
+        assert len(list(tmp_path.glob("*.txt"))) == 4
+        manifest = json.loads((tmp_path / ".onc-manifest.json").read_text())
+        assert sorted(manifest) == sorted(p.name for p in tmp_path.glob("*.txt"))
+
+
+def test_sync_archivefiles_without_stat(
+    fake_filters, fake_server, tmp_path, monkeypatch
+):
+    onc = ONC("FAKE_TOKEN", outPath=tmp_path, reporter="silent")
+    onc.baseUrl = fake_server.url
+    filters = fake_filters | {"dateTo": "2020-01-01T05:00:00.000Z"}
+    onc.syncArchivefiles(filters)
+
+    def noStat(function):
+        def checked(path, *args, **kwargs):
+            assert not str(path).endswith(".txt"), "file checked on disk"
+            return function(path, *args, **kwargs)
+
+        return checked
+
+    monkeypatch.setattr(Path, "stat", noStat(Path.stat))
+    monkeypatch.setattr(os.path, "exists", noStat(os.path.exists))
+    result = onc.syncArchivefiles(filters, since=fake_filters["dateFrom"])
+
+    assert (result["stats"]["fileCount"], result["stats"]["skipped"]) == (0, 5)
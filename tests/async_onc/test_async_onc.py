@@ -0,0 +1,295 @@
+import asyncio
+import json
+import subprocess
+import sys
+
+import pytest
+import requests
+from onc import AsyncONC, RateLimiter
+from onc.testing import FakeOncServer
+
+pytest.importorskip("httpx")
+
+
+def run(fake_server, tmp_path, method: str, *args, **kwargs):
+    async def main():
+        async with AsyncONC("FAKE_TOKEN", outPath=tmp_path) as onc:
+            onc.baseUrl = fake_server.url
+            return await getattr(onc, method)(*args, **kwargs)
+
+    return asyncio.run(main())
+
+
+def test_discovery_gather(fake_server):
+    async def main():
+        async with AsyncONC("FAKE_TOKEN") as onc:
+            onc.baseUrl = fake_server.url
+            return await asyncio.gather(
+                *(onc.getDevices({"deviceCode": f"FAKE{i}"}) for i in range(5))
+            )
+
+    results = asyncio.run(main())
+
+    assert [r[0]["deviceCode"] for r in results] == [f"FAKE{i}" for i in range(5)]
+    assert results[0][0]["hasDeviceData"] is True
+
+
+def test_scalardata_all_pages_sharded(fake_filters, fake_server, tmp_path):
+    filters = fake_filters | {"dateTo": "2020-01-03T00:00:00.000Z", "rowLimit": 50000}
+
+    data = run(
+        fake_server, tmp_path, "getScalardata", filters, allPages=True, shardBy="day"
+    )
+
+    assert data["next"] is None
+    sampleTimes = data["sensorData"][0]["data"]["sampleTimes"]
+    assert len(sampleTimes) == 2 * 86400
+    assert sampleTimes == sorted(sampleTimes)
+
+
+def test_rawdata_iter_pages(fake_filters, fake_server):
+    async def main():
+        async with AsyncONC("FAKE_TOKEN") as onc:
+            onc.baseUrl = fake_server.url
+            return [
+                len(page["data"]["readings"])
+                async for page in onc.iterRawdata(fake_filters | {"rowLimit": 250})
+            ]
+
+    assert asyncio.run(main()) == [250, 250, 100]
+
+
+def test_download_direct_archivefile(fake_filters, fake_server, tmp_path):
+    filters = fake_filters | {
+        "dateTo": "2020-01-01T05:00:00.000Z",
+        "returnOptions": "all",
+    }
+
+    result = run(fake_server, tmp_path, "downloadDirectArchivefile", filters)
+
+    # the filters of the caller are not modified
+    assert filters["returnOptions"] == "all"
+
+    assert result["stats"]["fileCount"] == 5
+    assert [r["status"] for r in result["downloadResults"]] == ["completed"] * 5
+    assert len(list(tmp_path.iterdir())) == 5
+
+    result = run(
+        fake_server, tmp_path, "downloadDirectArchivefile", filters, maxWorkers=4
+    )
+
+    assert [r["status"] for r in result["downloadResults"]] == ["skipped"] * 5
+
+
+def test_download_archivefile_exists(fake_server, tmp_path):
+    (tmp_path / "file.txt").write_text("saved")
+    fake_server.requestLog.clear()
+
+    with pytest.raises(FileExistsError):
+        run(fake_server, tmp_path, "downloadArchivefile", "file.txt")
+    assert fake_server.requestCount() == 0
+
+
+def test_import_onc_without_httpx():
+    code = "import sys, onc; assert 'httpx' not in sys.modules; onc.AsyncONC"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_order_data_product(fake_filters, fake_server, tmp_path):
+    result = run(
+        fake_server,
+        tmp_path,
+        "orderDataProduct",
+        {"dataProductCode": "TSSD", "extension": "csv"} | fake_filters,
+    )
+
+    assert len(result["downloadResults"]) == fake_server.productFileCount + 1
+    assert len(list(tmp_path.iterdir())) == fake_server.productFileCount + 1
+
+
+def test_order_data_product_reporter(fake_filters, fake_server, tmp_path):
+    events, decoded = [], []
+
+    def decoder(content: bytes):
+        decoded.append(content)
+        return json.loads(content)
+
+    async def main():
+        async with AsyncONC(
+            "FAKE_TOKEN",
+            outPath=tmp_path,
+            reporter=lambda event: events.append(event),
+            jsonDecoder=decoder,
+        ) as onc:
+            onc.baseUrl = fake_server.url
+            dpRequestId = (
+                await onc.requestDataProduct(
+                    {"dataProductCode": "TSSD", "extension": "csv"} | fake_filters
+                )
+            )["dpRequestId"]
+            runData = await onc.runDataProduct(dpRequestId)
+            # maxWorkers is the last positional parameter, as in ONC
+            return await onc.downloadDataProduct(
+                runData["runIds"][0], 0, False, True, False, 2
+            )
+
+    fileList = asyncio.run(main())
+
+    assert len(fileList) == fake_server.productFileCount + 1
+    assert len(decoded) >= 2
+    assert {"poll", "file", "done"} <= {event["event"] for event in events}
+
+
+def test_order_data_products(fake_filters, fake_server, tmp_path):
+    fake_server.failNext(status=403)
+    results = run(
+        fake_server,
+        tmp_path,
+        "orderDataProducts",
+        [{"dataProductCode": "TSSD", "extension": "csv"} | fake_filters] * 3,
+    )
+
+    assert sorted(r["status"] for r in results) == ["complete", "complete", "error"]
+    for result in results:
+        if result["status"] == "complete":
+            assert len(result["downloadResults"]) == fake_server.productFileCount + 1
+    assert len(list(tmp_path.iterdir())) == 2 * (fake_server.productFileCount + 1)
+
+
+def test_count_product_files(fake_filters, fake_server):
+    async def main():
+        async with AsyncONC("FAKE_TOKEN") as onc:
+            onc.baseUrl = fake_server.url
+            request = await onc.requestDataProduct(
+                fake_filters | {"dataProductCode": "TSSD"}
+            )
+            run = await onc.runDataProduct(request["dpRequestId"])
+            return await onc.downloadDataProduct(
+                run["runIds"][0], downloadResultsOnly=True
+            )
+
+    result = asyncio.run(main())
+
+    indexes = [info["index"] for info in result]
+    assert indexes == [str(i) for i in range(1, fake_server.productFileCount + 1)] + [
+        "meta"
+    ]
+
+
+def test_error_status(fake_server, tmp_path):
+    fake_server.failNext(status=403)
+
+    with pytest.raises(requests.HTTPError):
+        run(fake_server, tmp_path, "getDeployments", {"deviceCode": "FAKE"})
+
+
+def test_compression(fake_filters, fake_server):
+    async def main():
+        async with AsyncONC("FAKE_TOKEN") as onc:
+            onc.baseUrl = fake_server.url
+            url = onc._realTime._serviceUrl("scalardata/device")
+            filters = fake_filters | {"rowLimit": 1000}
+            return await onc._doRequest(url, filters, getTime=True)
+
+    _, timing = asyncio.run(main())
+
+    assert timing["transferSize"] < timing["size"]
+
+
+def test_request_hooks(fake_filters, fake_server):
+    events = []
+
+    async def main():
+        async with AsyncONC("FAKE_TOKEN", hooks=[events.append]) as onc:
+            onc.baseUrl = fake_server.url
+            return await onc.getScalardata(
+                fake_filters | {"rowLimit": 100}, allPages=True
+            )
+
+    asyncio.run(main())
+
+    assert [event["page"] for event in events] == [1, 2, 3, 4, 5, 6]
+    assert events[0]["connectTime"] is not None
+    assert all(event["ttfb"] > 0 for event in events)
+
+
+def test_rate_limiter_streamed_responses(fake_server):
+    async def main():
+        limiter = RateLimiter(maxInFlight=1)
+        async with AsyncONC("FAKE_TOKEN", rateLimiter=limiter) as onc:
+            onc.baseUrl = fake_server.url
+            url = f"{fake_server.url}api/archivefile/download"
+            filters = {"filename": "FAKE_20200101T000000.000Z.txt", "token": "T"}
+            first = await onc._get(url, filters, stream=True)
+            second = asyncio.ensure_future(onc._get(url, filters, stream=True))
+            await asyncio.sleep(0.2)
+            # the slot is held until the body of the first response is read
+            waiting = not second.done()
+            await first.aread()
+            response = await second
+            await response.aclose()
+            return waiting
+
+    assert asyncio.run(main())
+
+
+def test_resume_data_product_file(fake_filters, tmp_path):
+    with FakeOncServer(productFileCount=1, runPolls=0, downloadPolls=0) as server:
+
+        async def main():
+            async with AsyncONC("FAKE_TOKEN", outPath=tmp_path) as onc:
+                onc.baseUrl = server.url
+                dpRequestId = (
+                    await onc.requestDataProduct(
+                        fake_filters | {"dataProductCode": "TSSD"}
+                    )
+                )["dpRequestId"]
+                runId = (await onc.runDataProduct(dpRequestId))["runIds"][0]
+                filename = f"FAKE_{runId}_1.txt"
+                (tmp_path / f"{filename}.part").write_bytes(
+                    server.fileContent(filename)[:100]
+                )
+                await onc.downloadDataProduct(runId, includeMetadataFile=False)
+                return filename
+
+        filename = asyncio.run(main())
+        requests1 = [
+            method
+            for method, path, params in server.requestLog
+            if path.endswith("/download") and params["index"] == "1"
+        ]
+
+    # a HEAD request learns the file name, then the GET resumes it
+    assert requests1 == ["HEAD", "GET"]
+    assert (tmp_path / filename).read_bytes() == server.fileContent(filename)
+
+
+def test_download_data_product_files_after_gap(fake_filters, tmp_path, monkeypatch):
+    with FakeOncServer(productFileCount=5, runPolls=0, downloadPolls=0) as server:
+
+        async def main():
+            async with AsyncONC("FAKE_TOKEN", outPath=tmp_path) as onc:
+                onc.baseUrl = server.url
+                dpRequestId = (
+                    await onc.requestDataProduct(
+                        fake_filters | {"dataProductCode": "TSSD"}
+                    )
+                )["dpRequestId"]
+                runId = (await onc.runDataProduct(dpRequestId))["runIds"][0]
+
+                # index 3 is not found, while 4 and 5 in the same batch are saved
+                retryProductFile = onc._retryProductFile
+
+                async def missingIndex3(runId, index, *args):
+                    if index == "3":
+                        return {"index": index, "status": "not found"}
+                    return await retryProductFile(runId, index, *args)
+
+                monkeypatch.setattr(onc, "_retryProductFile", missingIndex3)
+                return await onc.downloadDataProduct(
+                    runId, includeMetadataFile=False, maxWorkers=4
+                )
+
+        result = asyncio.run(main())
+
+    assert [info["index"] for info in result] == ["1", "2", "4", "5"]
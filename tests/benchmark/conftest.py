@@ -0,0 +1,83 @@
+import io
+
+import pytest
+import requests
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.pluginmanager.hasplugin("benchmark"):
+        return
+    skip = pytest.mark.skip(reason="requires pytest-benchmark")
+    for item in items:
+        if "benchmark" in getattr(item, "fixturenames", ()):
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def payloads():
+    return Payloads
+
+
+class Payloads:
+    @staticmethod
+    def scalardata_page(rows: int, sensors: int = 10, start: int = 0) -> dict:
+        times = [f"2020-01-01T00:00:{i % 60:02d}.{start + i:06d}Z" for i in range(rows)]
+        return {
+            "next": None,
+            "sensorData": [
+                {
+                    "sensorCode": f"Sensor{s}",
+                    "actualSamples": rows,
+                    "data": {
+                        "qaqcFlags": [1] * rows,
+                        "sampleTimes": list(times),
+                        "values": [float(start + i) for i in range(rows)],
+                    },
+                }
+                for s in range(sensors)
+            ],
+        }
+
+    @staticmethod
+    def rawdata_page(rows: int, start: int = 0) -> dict:
+        return {
+            "next": None,
+            "data": {
+                "lineTypes": [" "] * rows,
+                "readings": [f"reading {start + i}" for i in range(rows)],
+                "times": [f"2020-01-01T00:00:00.{start + i:06d}Z" for i in range(rows)],
+            },
+        }
+
+    @staticmethod
+    def archivefile_list(files: int, returnOptions: bool = False) -> dict:
+        extensions = ["txt", "mat", "png", "zip"]
+        names = [
+            f"FAKE_{i:08d}T000000.000Z.{extensions[i % len(extensions)]}"
+            for i in range(files)
+        ]
+        if returnOptions:
+            return {"files": [{"filename": name, "fileSize": 100} for name in names]}
+        return {"files": names}
+
+    @staticmethod
+    def discovery_tree(depth: int, width: int) -> list:
+        def node(level: int) -> dict:
+            return {
+                "locationCode": f"L{level}",
+                "hasDeviceData": "true",
+                "hasPropertyData": "false",
+                "children": (
+                    [node(level + 1) for _ in range(width)] if level < depth else None
+                ),
+            }
+
+        return [node(0) for _ in range(width)]
+
+    @staticmethod
+    def download_response(size: int) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["Content-Length"] = str(size)
+        response.raw = io.BytesIO(b"x" * size)
+        return response
@@ -0,0 +1,14 @@
+import json
+
+import pytest
+from onc.modules._JsonDecoder import _jsonDecoder
+
+
+@pytest.mark.parametrize("decoder", ["json", "orjson", "msgspec"])
+def test_decode_scalardata(benchmark, payloads, decoder):
+    pytest.importorskip(decoder)
+    content = json.dumps(payloads.scalardata_page(100000, sensors=3)).encode()
+
+    result = benchmark(_jsonDecoder(decoder), content)
+
+    assert len(result["sensorData"][0]["data"]["values"]) == 100000
@@ -0,0 +1,56 @@
+import copy
+
+from onc.modules._MultiPage import _MultiPage
+
+
+def test_catenate_scalardata(benchmark, fake_requester, payloads):
+    pages = [payloads.scalardata_page(10000, start=10000 * i) for i in range(10)]
+    multiPage = _MultiPage(fake_requester.realTime)
+
+    def merge(pages):
+        response = pages[0]
+        sensorIndex = {}
+        for page in pages[1:]:
+            multiPage._catenateData(response, page, "scalardata/device", sensorIndex)
+        return response
+
+    result = benchmark.pedantic(
+        merge, setup=lambda: ((copy.deepcopy(pages),), {}), rounds=5
+    )
+
+    assert len(result["sensorData"][0]["data"]["values"]) == 100000
+
+
+def test_catenate_rawdata(benchmark, fake_requester, payloads):
+    pages = [payloads.rawdata_page(10000, start=10000 * i) for i in range(10)]
+    multiPage = _MultiPage(fake_requester.realTime)
+
+    def merge(pages):
+        response = pages[0]
+        for page in pages[1:]:
+            multiPage._catenateData(response, page, "rawdata/device")
+        return response
+
+    result = benchmark.pedantic(
+        merge, setup=lambda: ((copy.deepcopy(pages),), {}), rounds=5
+    )
+
+    assert len(result["data"]["readings"]) == 100000
+
+
+def test_get_all_pages_scalardata(benchmark, fake_requester):
+    filters = {
+        "deviceCode": "FAKE",
+        "dateFrom": "2020-01-01T00:00:00.000Z",
+        "dateTo": "2020-01-01T02:00:00.000Z",
+        "rowLimit": 1000,
+    }
+
+    result = benchmark.pedantic(
+        fake_requester.getScalardata,
+        args=(filters,),
+        kwargs={"allPages": True},
+        rounds=3,
+    )
+
+    assert len(result["sensorData"][0]["data"]["values"]) == 7200
@@ -0,0 +1,60 @@
+import copy
+import subprocess
+import sys
+
+import pytest
+from onc.modules._util import saveAsFile
+
+
+@pytest.mark.parametrize("returnOptions", [False, True])
+def test_filter_by_extension(benchmark, fake_requester, payloads, returnOptions):
+    results = payloads.archivefile_list(100000, returnOptions)
+
+    filtered = benchmark(
+        lambda: fake_requester.archive._filterByExtension(dict(results), "txt")
+    )
+
+    assert len(filtered["files"]) == 25000
+
+
+def test_sanitize_booleans(benchmark, fake_requester, payloads):
+    tree = payloads.discovery_tree(depth=4, width=5)
+
+    trees = []
+
+    def setup():
+        trees.append(copy.deepcopy(tree))
+        return (trees[-1],), {}
+
+    # sanitizes the tree in place
+    benchmark.pedantic(
+        fake_requester.discovery._sanitizeBooleans, setup=setup, rounds=10
+    )
+
+    assert trees[-1][0]["hasDeviceData"] is True
+
+
+@pytest.mark.parametrize("chunkSize", [64 * 1024, 1024 * 1024])
+def test_save_as_file(benchmark, payloads, tmp_path, chunkSize):
+    size = 64 * 1024 * 1024
+
+    result = benchmark.pedantic(
+        saveAsFile,
+        setup=lambda: (
+            (payloads.download_response(size), tmp_path, "file.bin", True, chunkSize),
+            {},
+        ),
+        rounds=5,
+    )
+
+    assert result["size"] == size
+    benchmark.extra_info["throughput"] = result["throughput"]
+
+
+def test_import_onc(benchmark):
+    benchmark.pedantic(
+        subprocess.run,
+        args=([sys.executable, "-c", "import onc"],),
+        kwargs={"check": True},
+        rounds=5,
+    )
@@ -4,6 +4,7 @@ from pathlib import Path
 import pytest
 from dotenv import load_dotenv
 from onc import ONC
+from onc.testing import FakeOncServer
 
 load_dotenv(override=True)
 is_prod = os.getenv("ONC_ENV", "PROD") == "PROD"
@@ -19,6 +20,28 @@ def requester(tmp_path) -> ONC:
     return ONC(production=is_prod, outPath=tmp_path)
 
 
+@pytest.fixture(scope="module")
+def fake_server():
+    with FakeOncServer(runPolls=1, downloadPolls=0) as server:
+        yield server
+
+
+@pytest.fixture
+def fake_requester(fake_server, tmp_path) -> ONC:
+    onc = ONC("FAKE_TOKEN", outPath=tmp_path)
+    onc.baseUrl = fake_server.url
+    return onc
+
+
+@pytest.fixture
+def fake_filters() -> dict:
+    return {
+        "deviceCode": "FAKE",
+        "dateFrom": "2020-01-01T00:00:00.000Z",
+        "dateTo": "2020-01-01T00:10:00.000Z",
+    }
+
+
 @pytest.fixture(scope="session")
 def util():
     return Util
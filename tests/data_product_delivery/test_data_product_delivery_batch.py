@@ -0,0 +1,55 @@
+from onc import ONC
+from onc.testing import FakeOncServer
+
+
+def test_order_data_product(fake_filters, fake_requester, fake_server, util):
+    result = fake_requester.orderDataProduct(
+        {"dataProductCode": "TSSD", "extension": "csv"} | fake_filters
+    )
+
+    assert len(result["downloadResults"]) == fake_server.productFileCount + 1
+    assert util.get_download_files_num(fake_requester) == (
+        fake_server.productFileCount + 1
+    )
+
+
+def test_order_data_products(fake_filters, tmp_path):
+    with FakeOncServer(productFileCount=2, runPolls=0, downloadPolls=0) as server:
+        onc = ONC("FAKE_TOKEN", outPath=tmp_path, reporter="silent")
+        onc.baseUrl = server.url
+        filtersList = [
+            fake_filters | {"dataProductCode": "TSSD", "extension": f"ext{i}"}
+            for i in range(5)
+        ]
+        results = onc.orderDataProducts(filtersList, maxWorkers=3)
+
+    assert [r["status"] for r in results] == ["complete"] * 5
+    assert len({r["dpRequestId"] for r in results}) == 5
+    for result in results:
+        assert result["error"] is None
+        assert len(result["downloadResults"]) == 3
+        assert all(r["downloaded"] for r in result["downloadResults"])
+    # Each result has the files of its own run
+    runs = [
+        {r["file"].split("_")[1] for r in result["downloadResults"]}
+        for result in results
+    ]
+    assert all(len(run) == 1 for run in runs)
+    assert len(set.union(*runs)) == 5
+    assert len(list(tmp_path.iterdir())) == 5 * 3
+
+
+def test_order_data_products_failure(fake_filters, tmp_path):
+    with FakeOncServer(productFileCount=1, runPolls=1, downloadPolls=0) as server:
+        onc = ONC("FAKE_TOKEN", outPath=tmp_path, reporter="silent")
+        onc.baseUrl = server.url
+        server.failNext(status=403)
+        results = onc.orderDataProducts(
+            [fake_filters | {"dataProductCode": "TSSD"}] * 2, maxWorkers=1
+        )
+
+    assert [r["status"] for r in results] == ["error", "complete"]
+    assert results[0]["dpRequestId"] is None
+    assert results[0]["error"]
+    assert results[0]["downloadResults"] == []
+    assert len(results[1]["downloadResults"]) == 2
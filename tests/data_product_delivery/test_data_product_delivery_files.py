@@ -0,0 +1,154 @@
+import time
+
+import pytest
+import requests
+from onc import ONC, RetryPolicy
+from onc.testing import FakeOncServer
+
+
+@pytest.mark.parametrize("maxWorkers", [1, 4])
+def test_download_data_product_files(fake_filters, tmp_path, maxWorkers):
+    with FakeOncServer(
+        productFileCount=6, latency=0.2, runPolls=0, downloadPolls=0
+    ) as server:
+        onc = ONC("FAKE_TOKEN", outPath=tmp_path, reporter="silent")
+        onc.baseUrl = server.url
+        runId = onc.requestDataProduct(fake_filters | {"dataProductCode": "TSSD"})[
+            "dpRequestId"
+        ]
+        runId = onc.runDataProduct(runId)["runIds"][0]
+
+        start = time.time()
+        result = onc.downloadDataProduct(runId, maxWorkers=maxWorkers)
+        elapsed = time.time() - start
+
+    files = [info["file"] for info in result]
+    assert files == [f"FAKE_{runId}_{i}.txt" for i in range(1, 7)] + [
+        f"FAKE_{runId}_meta.xml"
+    ]
+    # 7 files and a "not found" response, in 4 rounds instead of 8
+    if maxWorkers > 1:
+        assert elapsed < 7 * 0.2
+
+
+@pytest.mark.parametrize("productFileCount", [1, 7, 2000])
+def test_count_product_files(fake_filters, tmp_path, productFileCount):
+    with FakeOncServer(
+        productFileCount=productFileCount, runPolls=0, downloadPolls=0
+    ) as server:
+        onc = ONC("FAKE_TOKEN", outPath=tmp_path, reporter="silent")
+        onc.baseUrl = server.url
+        dpRequestId = onc.requestDataProduct(
+            fake_filters | {"dataProductCode": "TSSD"}
+        )["dpRequestId"]
+        runId = onc.runDataProduct(dpRequestId)["runIds"][0]
+
+        result = onc.downloadDataProduct(runId, downloadResultsOnly=True)
+        headCount = server.requestCount("/api/dataProductDelivery/download")
+        # the count is cached
+        onc.downloadDataProduct(runId, downloadResultsOnly=True)
+
+        assert server.requestCount("/api/dataProductDelivery/download") == headCount
+
+    assert len(result) == productFileCount + 1
+    assert result[-2]["index"] == str(productFileCount)
+    assert headCount <= 4 * 10
+
+
+def test_download_data_product_file_retry(
+    fake_filters, fake_requester, fake_server, monkeypatch
+):
+    import onc.modules._DataProductFile as dataProductFile
+
+    saveAsFile = dataProductFile.saveAsFile
+    failures = []
+
+    def interruptOnce(response, *args):
+        if not failures:
+            failures.append(response.url)
+            response.close()
+            raise requests.ConnectionError("Incomplete download")
+        return saveAsFile(response, *args)
+
+    monkeypatch.setattr(dataProductFile, "saveAsFile", interruptOnce)
+    fake_requester.session.retryPolicy = RetryPolicy(backoffBase=0.01)
+    download = dataProductFile._DataProductFile.download
+    schedulers = {}
+
+    def recordScheduler(dpf, timeout, poll, *args):
+        schedulers.setdefault(dpf._filters["index"], []).append(poll)
+        return download(dpf, timeout, poll, *args)
+
+    monkeypatch.setattr(dataProductFile._DataProductFile, "download", recordScheduler)
+
+    result = fake_requester.orderDataProduct(
+        {"dataProductCode": "TSSD", "extension": "csv"} | fake_filters
+    )
+
+    assert len(failures) == 1
+    # the retry keeps the backoff and deadline of the interrupted attempt
+    attempts = [polls for polls in schedulers.values() if len(polls) > 1]
+    assert len(attempts) == 1
+    assert attempts[0][0] is attempts[0][1]
+    assert len(result["downloadResults"]) == fake_server.productFileCount + 1
+
+
+def test_resume_data_product_file_not_ready(fake_filters, tmp_path):
+    with FakeOncServer(productFileCount=1, runPolls=0, downloadPolls=0) as server:
+        onc = ONC("FAKE_TOKEN", outPath=tmp_path, reporter="silent")
+        onc.baseUrl = server.url
+        dpRequestId = onc.requestDataProduct(
+            fake_filters | {"dataProductCode": "TSSD"}
+        )["dpRequestId"]
+        runId = onc.runDataProduct(dpRequestId)["runIds"][0]
+        filename = f"FAKE_{runId}_1.txt"
+        content = server.fileContent(filename)
+        (tmp_path / f"{filename}.part").write_bytes(content[:100])
+
+        # The range request to resume the file is answered with 202 once
+        request = onc.session.request
+        ranges = []
+
+        def notReadyOnce(method, url, *args, **kwargs):
+            if "Range" in (kwargs.get("headers") or {}):
+                if not ranges:
+                    server.failNext(status=202)
+                ranges.append(kwargs["headers"]["Range"])
+            return request(method, url, *args, **kwargs)
+
+        onc.session.request = notReadyOnce
+        result = onc.downloadDataProduct(runId, maxWorkers=1)
+
+    # The file name is learned with a HEAD request, so every GET resumes the file
+    assert ranges == ["bytes=100-", "bytes=100-"]
+    requests1 = [
+        method
+        for method, path, params in server.requestLog
+        if path.endswith("/download") and params["index"] == "1"
+    ]
+    assert requests1 == ["HEAD", "GET", "GET"]
+    assert result[0]["status"] == "complete"
+    assert (tmp_path / filename).read_bytes() == content
+
+
+def test_download_data_product_files_after_gap(fake_filters, tmp_path, monkeypatch):
+    with FakeOncServer(productFileCount=5, runPolls=0, downloadPolls=0) as server:
+        onc = ONC("FAKE_TOKEN", outPath=tmp_path, reporter="silent")
+        onc.baseUrl = server.url
+        dpRequestId = onc.requestDataProduct(
+            fake_filters | {"dataProductCode": "TSSD"}
+        )["dpRequestId"]
+        runId = onc.runDataProduct(dpRequestId)["runIds"][0]
+
+        # index 3 is not found, while 4 and 5 in the same batch are saved
+        downloadProductFile = onc.delivery._downloadProductFile
+
+        def missingIndex3(runId, index, *args):
+            if index == "3":
+                return None
+            return downloadProductFile(runId, index, *args)
+
+        monkeypatch.setattr(onc.delivery, "_downloadProductFile", missingIndex3)
+        result = onc.downloadDataProduct(runId, maxWorkers=4, includeMetadataFile=False)
+
+    assert [info["index"] for info in result] == ["1", "2", "4", "5"]
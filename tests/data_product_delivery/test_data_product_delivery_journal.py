@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+
+import pytest
+from onc import ONC
+from onc.testing import FakeOncServer
+
+
+def test_resume_orders(fake_filters, tmp_path, monkeypatch):
+    import onc.modules._DataProductFile as dataProductFile
+
+    saveAsFile = dataProductFile.saveAsFile
+    saved = []
+
+    def crashAfterFirstFile(response, *args):
+        if saved:
+            response.close()
+            raise KeyboardInterrupt
+        saved.append(response.url)
+        return saveAsFile(response, *args)
+
+    filters = fake_filters | {"dataProductCode": "TSSD"}
+    with FakeOncServer(productFileCount=3, runPolls=0, downloadPolls=0) as server:
+        onc = ONC("FAKE_TOKEN", outPath=tmp_path, reporter="silent", orderJournal=True)
+        onc.baseUrl = server.url
+        monkeypatch.setattr(dataProductFile, "saveAsFile", crashAfterFirstFile)
+        with pytest.raises(KeyboardInterrupt):
+            onc.orderDataProduct(filters, maxWorkers=1)
+        monkeypatch.undo()
+
+        # The file downloaded is recorded with the checksum computed while saving it
+        journal = tmp_path / "onc-orders.jsonl"
+        records = [json.loads(line) for line in journal.read_text().splitlines()]
+        files = [record for record in records if record["event"] == "file"]
+        assert len(files) == 1
+        content = (tmp_path / files[0]["file"]).read_bytes()
+        assert files[0]["sha256"] == hashlib.sha256(content).hexdigest()
+        assert files[0]["size"] == len(content)
+
+        # A new client continues the order from the journal
+        onc = ONC("FAKE_TOKEN", outPath=tmp_path, reporter="silent", orderJournal=True)
+        onc.baseUrl = server.url
+        downloads = server.requestCount("/api/dataProductDelivery/download")
+        results = onc.resumeOrders()
+        productRequests = server.requestCount("/api/dataProductDelivery/request")
+        runs = server.requestCount("/api/dataProductDelivery/run")
+        downloads = server.requestCount("/api/dataProductDelivery/download") - downloads
+
+        assert onc.resumeOrders() == []
+
+    assert (productRequests, runs) == (1, 1)
+    # Files 2, 3 and the metadata, but not file 1
+    assert downloads == 3
+    assert len(results) == 1
+    assert results[0]["status"] == "complete"
+    statuses = [file["status"] for file in results[0]["downloadResults"]]
+    assert statuses == ["skipped", "complete", "complete", "complete"]
+    # The lines of the completed order are removed
+    assert journal.read_text() == ""
+
+
+def test_resume_orders_without_journal(fake_requester):
+    with pytest.raises(ValueError):
+        fake_requester.resumeOrders()
+
+
+def test_order_journal_changed_file(fake_filters, tmp_path):
+    filters = fake_filters | {"dataProductCode": "TSSD"}
+    with FakeOncServer(productFileCount=2, runPolls=0, downloadPolls=0) as server:
+        onc = ONC("FAKE_TOKEN", outPath=tmp_path, reporter="silent", orderJournal=True)
+        onc.baseUrl = server.url
+        # A second order that is not complete keeps its lines
+        onc.orderDataProduct(filters)
+        dpRequestId = onc.requestDataProduct(filters)["dpRequestId"]
+        runId = onc.runDataProduct(dpRequestId)["runIds"][0]
+        onc.delivery._journal().request(dpRequestId, filters, {})
+        onc.delivery._journal().run(dpRequestId, [runId], 2)
+        onc.downloadDataProduct(runId)
+
+        journal = tmp_path / "onc-orders.jsonl"
+        records = [json.loads(line) for line in journal.read_text().splitlines()]
+        assert {record["dpRequestId"] for record in records} == {dpRequestId, None}
+        assert {record["runId"] for record in records if "runId" in record} == {runId}
+
+        # A file modified after its download is downloaded again, the others are
+        # skipped as they are unchanged
+        changed = tmp_path / f"FAKE_{runId}_1.txt"
+        changed.write_bytes(b"x" * changed.stat().st_size)
+        os.utime(changed, (0, 0))
+        result = onc.downloadDataProduct(runId, overwrite=True)
+
+    assert [info["status"] for info in result] == ["complete", "skipped", "skipped"]
+    assert changed.read_bytes() == server.fileContent(changed.name)
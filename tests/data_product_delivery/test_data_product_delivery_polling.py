@@ -0,0 +1,41 @@
+import time
+
+import pytest
+from onc import ONC
+from onc.modules._PollScheduler import _parseProcessingTime
+from onc.testing import FakeOncServer
+
+
+def test_poll_timeout(fake_filters, tmp_path):
+    with FakeOncServer(runPolls=100, downloadPolls=0) as server:
+        onc = ONC("FAKE_TOKEN", outPath=tmp_path, reporter="silent", pollTimeout=1)
+        onc.baseUrl = server.url
+        filters = fake_filters | {"dataProductCode": "TSSD"}
+        dpRequestId = onc.requestDataProduct(filters)["dpRequestId"]
+
+        start = time.time()
+        with pytest.raises(TimeoutError):
+            onc.runDataProduct(dpRequestId)
+        assert time.time() - start < 2
+
+        results = onc.orderDataProducts([filters])
+
+    assert results[0]["status"] == "error"
+    assert "deadline" in results[0]["error"]
+
+
+@pytest.mark.parametrize(
+    "estimate, seconds",
+    [
+        ("30 s", 30),
+        ("2 min", 120),
+        ("1.5 hours", 5400),
+        ("3 days", None),
+        ("2 minutes", 120),
+        ("soon", None),
+        ("a min", None),
+    ],
+)
+def test_parse_processing_time(estimate, seconds):
+    assert _parseProcessingTime({"estimatedProcessingTime": estimate}) == seconds
+    assert _parseProcessingTime({}) is None
@@ -0,0 +1,5 @@
+def test_discovery(fake_requester):
+    data = fake_requester.getDeployments({"deviceCode": "FAKE"})
+
+    assert data[0]["deviceCode"] == "FAKE"
+    assert data[0]["hasDeviceData"] is True
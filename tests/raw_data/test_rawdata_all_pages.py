@@ -0,0 +1,5 @@
+def test_rawdata_all_pages(fake_filters, fake_requester):
+    data = fake_requester.getRawdata(fake_filters | {"rowLimit": 250}, allPages=True)
+
+    assert data["next"] is None
+    assert len(data["data"]["readings"]) == 600
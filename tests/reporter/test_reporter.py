@@ -0,0 +1,43 @@
+import logging
+
+import pytest
+from onc import ONC
+
+
+def test_callback_reporter(fake_filters, fake_server, tmp_path, capsys):
+    events = []
+    onc = ONC("FAKE_TOKEN", outPath=tmp_path, reporter=events.append)
+    onc.baseUrl = fake_server.url
+
+    onc.getScalardata(fake_filters | {"rowLimit": 100}, allPages=True)
+    onc.downloadDirectArchivefile(fake_filters | {"dateTo": "2020-01-01T04:00:00.000Z"})
+
+    assert capsys.readouterr().out == ""
+    pages = [event for event in events if event["event"] == "page"]
+    assert [event["page"] for event in pages] == [2, 3, 4, 5, 6]
+    files = [event for event in events if event["event"] == "file"]
+    assert sorted(event["index"] for event in files) == [1, 2, 3, 4]
+    assert all(event["total"] == 4 for event in files)
+    assert [event["task"] for event in events if event["event"] == "done"] == [
+        "pages",
+        "files",
+    ]
+
+
+def test_logging_reporter(fake_filters, fake_server, tmp_path, caplog):
+    onc = ONC("FAKE_TOKEN", outPath=tmp_path, reporter="logging")
+    onc.baseUrl = fake_server.url
+
+    with caplog.at_level(logging.INFO, logger="onc"):
+        onc.orderDataProduct(
+            {"dataProductCode": "TSSD", "extension": "csv"} | fake_filters
+        )
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert any(message.startswith("Request Id:") for message in messages)
+    assert any(record.onc["event"] == "file" for record in caplog.records)
+
+
+def test_invalid_reporter():
+    with pytest.raises(ValueError):
+        ONC("FAKE_TOKEN", reporter="verbose")
@@ -0,0 +1,109 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+from onc import ONC, ResponseCache
+
+
+def cached_requester(server, tmp_path, cache: ResponseCache, events=None) -> ONC:
+    onc = ONC(
+        "FAKE_TOKEN",
+        outPath=tmp_path,
+        cache=cache,
+        hooks=[events.append] if events is not None else None,
+    )
+    onc.baseUrl = server.url
+    return onc
+
+
+def test_fresh_response(fake_server, tmp_path):
+    onc = cached_requester(fake_server, tmp_path, ResponseCache(ttl=60))
+    fake_server.requestLog.clear()
+
+    first = onc.getDeployments({"deviceCode": "FAKE"})
+    second = onc.getDeployments({"deviceCode": "FAKE"})
+
+    assert second == first
+    assert fake_server.requestCount("/api/deployments") == 1
+    # other filters are another entry
+    onc.getDeployments({"deviceCode": "FAKE2"})
+    assert fake_server.requestCount("/api/deployments") == 2
+
+
+def test_revalidate_expired_response(fake_server, tmp_path):
+    events = []
+    onc = cached_requester(fake_server, tmp_path, ResponseCache(ttl=0.1), events)
+
+    first = onc.getDeployments({"deviceCode": "FAKE"})
+    time.sleep(0.2)
+    second = onc.getDeployments({"deviceCode": "FAKE"})
+    # fresh again after the revalidation
+    third = onc.getDeployments({"deviceCode": "FAKE"})
+
+    assert second == third == first
+    # the 304 answers the If-None-Match header with the ETag of the first response
+    assert [event["status"] for event in events] == [200, 304]
+
+
+def test_sqlite_cache(fake_server, tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = ResponseCache(path, ttl=60)
+    first = cached_requester(fake_server, tmp_path, cache).getDevices(
+        {"deviceCode": "FAKE"}
+    )
+    cache.close()
+    fake_server.requestLog.clear()
+
+    # A new cache (e.g. in another process) reads the responses from the database
+    cache = ResponseCache(path, ttl=60)
+    second = cached_requester(fake_server, tmp_path, cache).getDevices(
+        {"deviceCode": "FAKE"}
+    )
+    cache.close()
+
+    assert second == first
+    assert fake_server.requestCount() == 0
+
+
+def test_cache_key_excludes_token(fake_server, tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = ResponseCache(path, ttl=60)
+    filters = {"deviceCode": "FAKE", "dateFrom": "2020-01-01"}
+
+    assert cache.key("devices", filters | {"token": "A"}) == cache.key(
+        "devices", {"token": "B", "dateFrom": "2020-01-01", "deviceCode": "FAKE"}
+    )
+
+    cached_requester(fake_server, tmp_path, cache).getDevices(dict(filters))
+    fake_server.requestLog.clear()
+    other = ONC("OTHER_TOKEN", outPath=tmp_path, cache=cache)
+    other.baseUrl = fake_server.url
+    other.getDevices(dict(filters))
+    cache.close()
+
+    # clients with another token share the entries
+    assert fake_server.requestCount() == 0
+    with sqlite3.connect(path) as db:
+        rows = db.execute("SELECT key, body FROM responses").fetchall()
+    assert len(rows) == 1
+    assert "TOKEN" not in "".join(rows[0])
+
+
+def test_async_onc_without_cache(fake_server):
+    pytest.importorskip("httpx")
+    from onc import AsyncONC
+
+    async def main():
+        async with AsyncONC("FAKE_TOKEN") as onc:
+            onc.baseUrl = fake_server.url
+            for _ in range(2):
+                await onc.getDeployments({"deviceCode": "FAKE"})
+            return onc.cache
+
+    fake_server.requestLog.clear()
+
+    assert asyncio.run(main()) is None
+    assert fake_server.requestCount("/api/deployments") == 2
+    with pytest.raises(TypeError):
+        AsyncONC("FAKE_TOKEN", cache=ResponseCache())
@@ -0,0 +1,46 @@
+from onc.modules._MultiPage import _MultiPage
+
+
+def test_scalardata_all_pages(fake_filters, fake_requester, fake_server):
+    fake_server.requestLog.clear()
+
+    data = fake_requester.getScalardata(fake_filters | {"rowLimit": 100}, allPages=True)
+
+    assert fake_server.requestCount("/api/scalardata/device") == 6
+    assert data["next"] is None
+    assert len(data["sensorData"]) == fake_server.sensorCount
+    assert len(data["sensorData"][0]["data"]["sampleTimes"]) == 600
+
+
+def test_catenate_sensors_change_between_pages(fake_requester):
+    def page(start: int, *sensorCodes: str) -> dict:
+        times = [f"2020-01-01T00:00:0{start + i}.000Z" for i in range(2)]
+        return {
+            "sensorData": [
+                {
+                    "sensorCode": sensorCode,
+                    "data": {"sampleTimes": times, "values": [start, start + 1]},
+                }
+                for sensorCode in sensorCodes
+            ]
+        }
+
+    multiPage = _MultiPage(fake_requester.realTime)
+    response = page(0, "Sensor0", "Sensor1")
+    sensorIndex = {}
+    # Sensor2 is missing from page 1, Sensor1 drops out on page 2
+    for nextResponse in [page(2, "Sensor0", "Sensor2"), page(4, "Sensor0", "Sensor2")]:
+        multiPage._catenateData(
+            response, nextResponse, "scalardata/device", sensorIndex
+        )
+
+    values = {
+        sensor["sensorCode"]: sensor["data"]["values"]
+        for sensor in response["sensorData"]
+    }
+    assert values == {
+        "Sensor0": [0, 1, 2, 3, 4, 5],
+        "Sensor1": [0, 1],
+        "Sensor2": [2, 3, 4, 5],
+    }
+    assert list(sensorIndex) == ["Sensor0", "Sensor1", "Sensor2"]
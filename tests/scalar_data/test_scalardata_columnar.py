@@ -0,0 +1,46 @@
+import pytest
+from onc.modules._ScalarColumns import _ScalarColumns
+
+np = pytest.importorskip("numpy")
+
+
+def page(sampleTimes: list, **data) -> dict:
+    return {
+        "sensorData": [
+            {
+                "sensorCode": "Sensor0",
+                "data": {"sampleTimes": sampleTimes} | data,
+            }
+        ]
+    }
+
+
+def test_column_appears_late():
+    columns = _ScalarColumns()
+    columns.append(page(["2020-01-01T00:00:00.000Z"] * 3, values=[1.0, 2.0, 3.0]))
+    columns.append(
+        page(["2020-01-01T00:00:03.000Z"] * 2, values=[4.0, 5.0], qaqcFlags=[1, 2])
+    )
+
+    data = columns.toResponse({})["sensorData"][0]["data"]
+
+    assert data["qaqcFlags"].tolist() == [-1, -1, -1, 1, 2]
+    assert data["values"].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_column_missing_from_page():
+    columns = _ScalarColumns()
+    columns.append(
+        page(["2020-01-01T00:00:00.000Z"] * 2, values=[1.0, 2.0], qaqcFlags=[1, 1])
+    )
+    # enough rows to grow the buffers
+    columns.append(page(["2020-01-01T00:00:02.000Z"] * 5))
+    columns.append(page(["2020-01-01T00:00:07.000Z"], values=[8.0], qaqcFlags=[2]))
+
+    data = columns.toResponse({})["sensorData"][0]["data"]
+
+    assert len(data["sampleTimes"]) == 8
+    assert data["qaqcFlags"].tolist() == [1, 1, -1, -1, -1, -1, -1, 2]
+    values = data["values"]
+    assert values[[0, 1, 7]].tolist() == [1.0, 2.0, 8.0]
+    assert np.isnan(values[2:7]).all()
@@ -62,5 +62,56 @@ def test_valid_params_multiple_pages(requester, params_multiple_pages):
     assert data["next"] is not None, "Test should return multiple pages."
 
 
+def test_valid_params_sharded_pages(requester, params_device, params_multiple_pages):
+    # The date range spans midnight, so it is split into two daily shards
+    date_range = {
+        "dateFrom": "2019-11-23T23:59:30.000Z",
+        "dateTo": "2019-11-24T00:00:30.000Z",
+    }
+    data = requester.getScalardata(params_device | date_range)
+    data_sharded = requester.getScalardata(
+        params_multiple_pages | date_range, allPages=True, shardBy="day"
+    )
+
+    assert (
+        data_sharded["sensorData"][0]["data"] == data["sensorData"][0]["data"]
+    ), "Test should merge rows of all shards in time order."
+
+    assert data_sharded["next"] is None, "Test should return only one page."
+
+
+def test_valid_params_iter_pages(requester, params_multiple_pages):
+    data_all_pages = requester.getScalardata(params_multiple_pages, allPages=True)
+    pages = list(requester.iterScalardata(params_multiple_pages))
+
+    assert len(pages) > 1, "Test should yield multiple pages."
+
+    assert all(
+        _get_row_num(page) <= params_multiple_pages["rowLimit"] for page in pages
+    ), "Test should yield at most `rowLimit` rows per page."
+
+    assert sum(_get_row_num(page) for page in pages) == _get_row_num(data_all_pages)
+
+    assert pages[-1]["next"] is None, "Test should stop after the last page."
+
+
+def test_valid_params_columnar(requester, params_device, params_multiple_pages):
+    np = pytest.importorskip("numpy")
+
+    data = requester.getScalardata(params_device)
+    data_columnar = requester.getScalardata(
+        params_multiple_pages, allPages=True, columnar=True
+    )
+
+    columns = data_columnar["sensorData"][0]["data"]
+    assert columns["sampleTimes"].dtype == np.dtype("datetime64[ms]")
+    assert columns["values"].dtype == np.float64
+    assert columns["qaqcFlags"].dtype == np.int8
+
+    assert np.array_equal(
+        columns["values"], np.array(data["sensorData"][0]["data"]["values"])
+    ), "Test should concatenate rows for all pages."
+
+
 def _get_row_num(data):
     return len(data["sensorData"][0]["data"]["values"])
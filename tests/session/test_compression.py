@@ -0,0 +1,17 @@
+import pytest
+from onc import ONC
+
+
+@pytest.mark.parametrize("compression", [True, False])
+def test_compression(fake_filters, fake_server, tmp_path, compression):
+    onc = ONC("FAKE_TOKEN", outPath=tmp_path, compression=compression)
+    onc.baseUrl = fake_server.url
+    url = onc.realTime._serviceUrl("scalardata/device")
+    filters = fake_filters | {"rowLimit": 1000}
+
+    _, timing = onc.realTime._doRequest(url, filters, getTime=True)
+
+    if compression:
+        assert timing["transferSize"] < timing["size"]
+    else:
+        assert timing["transferSize"] == timing["size"]
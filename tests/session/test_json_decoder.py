@@ -0,0 +1,18 @@
+import math
+
+import pytest
+from onc import ONC
+
+
+@pytest.mark.parametrize("jsonDecoder", ["json", "orjson", "msgspec"])
+def test_json_decoder(fake_filters, fake_server, tmp_path, jsonDecoder):
+    pytest.importorskip(jsonDecoder)
+    onc = ONC("FAKE_TOKEN", outPath=tmp_path, jsonDecoder=jsonDecoder)
+    onc.baseUrl = fake_server.url
+    reference = ONC("FAKE_TOKEN", outPath=tmp_path, jsonDecoder="json")
+    reference.baseUrl = fake_server.url
+    filters = fake_filters | {"rowLimit": 100}
+
+    assert onc.getScalardata(filters.copy()) == reference.getScalardata(filters.copy())
+    # NaN is not valid JSON, but accepted by the standard library
+    assert math.isnan(onc.jsonDecoder(b"[NaN]")[0])
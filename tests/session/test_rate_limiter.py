@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from onc import ONC, RateLimiter
+from onc.testing import FakeOncServer
+
+
+def test_rate_limiter(fake_requester, fake_server):
+    fake_requester.session.rateLimiter = RateLimiter(rate=20, burst=1)
+
+    start = time.time()
+    for _ in range(11):
+        fake_requester.getDeployments({"deviceCode": "FAKE"})
+
+    assert time.time() - start >= 0.5
+
+
+def test_rate_limiter_max_in_flight(fake_filters, tmp_path):
+    with FakeOncServer(latency=0.2) as server:
+        limiter = RateLimiter(maxInFlight=1)
+        onc = ONC("FAKE_TOKEN", outPath=tmp_path, rateLimiter=limiter)
+        onc.baseUrl = server.url
+        filters = fake_filters | {"dateTo": "2020-01-01T04:00:00.000Z"}
+
+        start = time.time()
+        onc.downloadDirectArchivefile(filters, maxWorkers=4)
+
+        # the list and the 4 files are requested one at a time
+        assert time.time() - start >= 5 * 0.2
+
+
+def test_rate_limiter_lock_file(tmp_path):
+    lockFile = tmp_path / "rate.lock"
+    limiters = [RateLimiter(rate=10, burst=1, lockFile=lockFile) for _ in range(2)]
+
+    # separate limiters (e.g. in separate processes) share the bucket
+    assert limiters[0].reserve() == 0
+    assert limiters[1].reserve() == pytest.approx(0.1, abs=0.02)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"rate": 0}, {"rate": -1}, {"rate": 1, "burst": 0}, {"maxInFlight": 0}],
+)
+def test_rate_limiter_invalid(options):
+    with pytest.raises(ValueError):
+        RateLimiter(**options)
+
+
+def test_rate_limiter_lock_file_async(tmp_path, monkeypatch):
+    limiter = RateLimiter(rate=10, burst=1, lockFile=tmp_path / "rate.lock")
+    reserve = limiter.reserve
+    threads = []
+
+    def recordThread():
+        threads.append(threading.current_thread())
+        return reserve()
+
+    monkeypatch.setattr(limiter, "reserve", recordThread)
+
+    async def send():
+        async with limiter.limitAsync():
+            pass
+
+    asyncio.run(send())
+
+    # the lock file is not locked on the event loop thread
+    assert threads and threads[0] is not threading.current_thread()
+
+
+def test_rate_limiter_streamed_responses(fake_requester, fake_server):
+    fake_requester.session.rateLimiter = RateLimiter(maxInFlight=2)
+    url = fake_requester.archive._serviceUrl("archivefile/download")
+    lock = threading.Lock()
+    reading = []
+    peak = []
+
+    def download(hour: int):
+        response = fake_requester.session.get(
+            url,
+            params={"filename": f"FAKE_20200101T{hour:02d}0000.000Z.txt", "token": "T"},
+            stream=True,
+        )
+        with lock:
+            reading.append(hour)
+            peak.append(len(reading))
+        # the body is read after the request returned
+        time.sleep(0.1)
+        content = response.content
+        with lock:
+            reading.remove(hour)
+        response.close()
+        return content
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        contents = list(executor.map(download, range(6)))
+
+    assert max(peak) == 2
+    assert all(len(content) == fake_server.fileSize for content in contents)
+    # every slot was released
+    limiter = fake_requester.session.rateLimiter
+    assert all(limiter._tryAcquireSlot() is not None for _ in range(2))
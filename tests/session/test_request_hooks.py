@@ -0,0 +1,82 @@
+import io
+import json
+
+import pytest
+import requests
+from onc import ONC, JsonLinesExporter, PrometheusExporter, RetryPolicy
+from onc.testing import FakeOncServer
+
+
+def test_request_hooks(fake_filters, fake_requester):
+    events = []
+    fake_requester.hooks.append(events.append)
+
+    fake_requester.getScalardata(fake_filters | {"rowLimit": 100}, allPages=True)
+
+    assert [event["page"] for event in events] == [1, 2, 3, 4, 5, 6]
+    event = events[0]
+    assert event["service"] == "scalardata/device"
+    assert event["status"] == 200
+    assert "token" not in event["url"]
+    assert event["bytes"] > 0
+    assert event["retries"] == 0
+    assert 0 < event["ttfb"] <= event["totalTime"]
+
+
+def test_request_hooks_retries(tmp_path):
+    with FakeOncServer(failureRate=1.0, failureStatus=503) as server:
+        events = []
+        onc = ONC(
+            "FAKE_TOKEN",
+            outPath=tmp_path,
+            retryPolicy=RetryPolicy(maxAttempts=3, backoffBase=0.01),
+            hooks=[events.append],
+        )
+        onc.baseUrl = server.url
+
+        with pytest.raises(requests.HTTPError):
+            onc.getDeployments({"deviceCode": "FAKE"})
+
+    assert len(events) == 1
+    assert events[0]["status"] == 503
+    assert events[0]["retries"] == 2
+
+
+def test_exporters(fake_server, tmp_path):
+    prometheus = PrometheusExporter()
+    stream = io.StringIO()
+    onc = ONC(
+        "FAKE_TOKEN",
+        outPath=tmp_path,
+        hooks=[prometheus, JsonLinesExporter(stream)],
+    )
+    onc.baseUrl = fake_server.url
+
+    onc.getDeployments({"deviceCode": "FAKE"})
+    onc.getDevices({"deviceCode": "FAKE"})
+
+    lines = stream.getvalue().splitlines()
+    assert [json.loads(line)["service"] for line in lines] == [
+        "deployments",
+        "devices",
+    ]
+    metrics = prometheus.render()
+    assert (
+        'onc_requests_total{service="devices",method="GET",status="200"} 1' in metrics
+    )
+    assert 'onc_request_duration_seconds_count{service="deployments"} 1' in metrics
+    assert metrics.endswith("# EOF\n")
+
+
+def test_request_hooks_connect_time(fake_server, tmp_path):
+    events = []
+    onc = ONC("FAKE_TOKEN", outPath=tmp_path, hooks=[events.append])
+    onc.baseUrl = fake_server.url
+
+    onc.getDeployments({"deviceCode": "FAKE"})
+    onc.getDevices({"deviceCode": "FAKE"})
+    onc.downloadArchivefile("FAKE_20200101T000000.000Z.txt")
+
+    # only the first request opened a connection
+    assert events[0]["connectTime"] > 0
+    assert [event["connectTime"] for event in events[1:]] == [None, None]
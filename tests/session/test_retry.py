@@ -0,0 +1,50 @@
+import time
+
+import pytest
+import requests
+from onc import ONC, RetryPolicy
+from onc.testing import FakeOncServer
+
+
+def test_injected_failure(fake_requester, fake_server):
+    fake_server.failNext(status=403)
+
+    with pytest.raises(requests.HTTPError):
+        fake_requester.getDeployments({"deviceCode": "FAKE"})
+
+    # Only the next request fails
+    assert fake_requester.getDeployments({"deviceCode": "FAKE"})
+
+
+def test_retry_transient_failures_in_pagination(fake_filters, tmp_path):
+    with FakeOncServer(failureRate=0.3, failureStatus=502) as server:
+        onc = ONC(
+            "FAKE_TOKEN",
+            outPath=tmp_path,
+            retryPolicy=RetryPolicy(10, backoffBase=0.01),
+        )
+        onc.baseUrl = server.url
+
+        data = onc.getScalardata(fake_filters | {"rowLimit": 100}, allPages=True)
+
+        assert len(data["sensorData"][0]["data"]["sampleTimes"]) == 600
+        # some pages were retried
+        assert server.requestCount("/api/scalardata") > 6
+
+
+def test_retry_after(fake_requester, fake_server):
+    fake_server.failNext(status=429, headers={"Retry-After": "1"})
+
+    start = time.time()
+    assert fake_requester.getDeployments({"deviceCode": "FAKE"})
+    assert time.time() - start >= 1
+
+
+def test_retry_exhausted(fake_requester, fake_server):
+    fake_requester.session.retryPolicy = RetryPolicy(maxAttempts=3, backoffBase=0.01)
+    fake_server.requestLog.clear()
+    fake_server.failNext(3, status=503)
+
+    with pytest.raises(requests.HTTPError, match="503"):
+        fake_requester.getDeployments({"deviceCode": "FAKE"})
+    assert fake_server.requestCount("/api/deployments") == 3
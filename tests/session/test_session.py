@@ -0,0 +1,40 @@
+import pytest
+from onc import ONC
+from onc.testing import FakeOncServer
+
+
+def test_shared_session(fake_filters, tmp_path):
+    with FakeOncServer(runPolls=2, downloadPolls=1) as server:
+        onc = ONC("FAKE_TOKEN", outPath=tmp_path, reporter="silent")
+        onc.baseUrl = server.url
+
+        onc.getScalardata(fake_filters | {"rowLimit": 100}, allPages=True)
+        onc.orderDataProduct(fake_filters | {"dataProductCode": "TSSD"}, maxWorkers=1)
+        onc.downloadArchivefile("FAKE_20200101T000000.000Z.txt")
+
+        # pages, polls and file downloads reuse the same connection
+        assert server.requestCount("/api/scalardata") == 6
+        # 4 files, each polled once before it is ready, and a "not found" response
+        assert server.requestCount("/api/dataProductDelivery/download") == 9
+        assert server.connectionCount == 1
+
+
+@pytest.mark.parametrize("poolBlock", [True, False])
+def test_pool_block(fake_filters, tmp_path, poolBlock):
+    with FakeOncServer(latency=0.1) as server:
+        onc = ONC(
+            "FAKE_TOKEN",
+            outPath=tmp_path,
+            reporter="silent",
+            poolMaxsize=1,
+            poolBlock=poolBlock,
+        )
+        onc.baseUrl = server.url
+        filters = fake_filters | {"dateTo": "2020-01-01T04:00:00.000Z"}
+
+        onc.downloadDirectArchivefile(filters, maxWorkers=4)
+
+        if poolBlock:
+            assert server.connectionCount == 1
+        else:
+            assert server.connectionCount > 1